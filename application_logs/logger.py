@@ -1,5 +1,124 @@
+import atexit
+import json
+import logging
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
 from datetime import datetime
 
+
+class LogFile:
+    """
+        This class is a lightweight handle of a log file, returned by App_Logger.open(). The handle is shared by
+        the whole process & the messages are written by the background writer, so close() does nothing.
+    """
+    def __init__(self, file_path):
+        self.name = file_path
+
+    def write(self, text):
+        _get_writer().put(self.name, text)
+
+    def flush(self):
+        _get_writer().flush()
+
+    def close(self):
+        pass # the shared file is closed (& flushed) on exit
+
+
+class _LogWriter:
+    """
+        Process-wide background writer: one cached file descriptor per log path, the queued records are
+        written in batches (one append per file per batch) & flushed on exit.
+    """
+    def __init__(self):
+        self.records = queue.Queue()
+        self.files = {} # {log path: file descriptor}
+        self.thread = threading.Thread(target=self._Run, name='log-writer', daemon=True)
+        self.thread.start()
+
+    def put(self, file_path, record):
+        self.records.put((file_path, record))
+
+    def flush(self):
+        self.records.join() # wait until every queued record is written
+
+    def close(self):
+        self.records.put(None)
+        self.thread.join()
+        for fd in self.files.values():
+            os.close(fd)
+        self.files.clear()
+
+    def _Write(self, batch):
+        lines = {}
+        for file_path, record in batch:
+            if isinstance(record, tuple): # (timestamp, level, message) from App_Logger.log
+                timestamp, level, message = record
+                record = json.dumps({'time': datetime.fromtimestamp(timestamp).isoformat(timespec='milliseconds'),
+                                     'pid': os.getpid(), 'level': level, 'message': message}) + '\n'
+            lines.setdefault(file_path, []).append(record)
+        for file_path, records in lines.items():
+            if file_path not in self.files:
+                os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+                self.files[file_path] = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self.files[file_path], ''.join(records).encode()) # complete lines in one append
+
+    def _Run(self):
+        while True:
+            batch = [self.records.get()] # block until the next record
+            while True: # take everything queued meanwhile
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._Write([item for item in batch if item is not None])
+            except Exception: # keep the writer alive, logging must never stop the pipeline
+                logging.getLogger(__name__).exception("log writer error")
+            finally:
+                for _ in batch:
+                    self.records.task_done()
+            if stop:
+                return
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _LogWriter()
+                multiprocessing.util.Finalize(None, _flush_writer, exitpriority=100) # worker processes exit without atexit,
+                # registered by the process which starts the writer (a forked worker clears the finalizers of its parent)
+    return _writer
+
+
+def _flush_writer():
+    if _writer is not None:
+        _writer.flush()
+
+
+def _close_writer():
+    if _writer is not None:
+        _writer.close()
+
+
+def _reset_writer_after_fork():
+    global _writer, _writer_lock
+    _writer, _writer_lock = None, threading.Lock() # the writer thread doesn't survive fork, the child starts its own
+
+
+atexit.register(_close_writer) # flush & close on normal exit
+os.register_at_fork(after_in_child=_reset_writer_after_fork)
+
+
 class App_Logger:
     """
         This package is responsible for log all the details with particular file.
@@ -7,17 +126,45 @@ class App_Logger:
     def __init__(self):
         pass
 
-    def log(self, file_object, log_message):
+    def open(self, file_path):
+        """
+            Method Name: open\n
+            Description: This method gives the shared handle of a log file, no file is opened per call\n
+            Output: log file handle.\n
+            On Failure: Raise Exception\n\n
+
+            :param file_path: log file path
+            :return: log file handle
+        """
+        return LogFile(file_path)
+
+    def flush(self):
+        """
+            Method Name: flush\n
+            Description: This method waits until all the queued messages are written\n
+            Output: None.\n
+            On Failure: Raise Exception\n\n
+
+            :return: None
+        """
+        _get_writer().flush()
+
+    def log(self, file_object, log_message, level='INFO'):
         """
             Method Name: log\n
-            Description: This method log the details\n
+            Description: This method log the details. For a handle from App_Logger.open(), the message is queued
+                         & written as a json record by the background writer, otherwise it is written directly\n
             Output: log the details.\n
             On Failure: Raise Exception\n\n
 
-            :param file_object: file name
+            :param file_object: log file handle (or file object)
             :param log_message: messages
+            :param level: log level
             :return: it's helps to log the messages.
         """
+        if isinstance(file_object, LogFile):
+            _get_writer().put(file_object.name, (time.time(), level, log_message)) # formatted in the writer thread
+            return
         self.now = datetime.now()
         self.date = self.now.date()
         self.current_time = self.now.strftime("%H:%M:%S")
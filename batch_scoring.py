@@ -0,0 +1,338 @@
+import io
+import os
+import queue
+import shutil
+import argparse
+import threading
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import utils.common_utils as common_utils
+from application_logs.logger import App_Logger
+from inference_engine.inferenceEngine import InferenceEngine
+
+
+_worker_engine = None # inference engine of the worker process, loaded once by InitWorker
+
+
+def InitWorker(config_path):
+    """
+        **Method Name:** InitWorker\n
+        **Description:** This method helps to load the model & fitted artifacts once per worker process (pool initializer).
+                         The model uses one thread, the parallelism comes from the processes\n
+        **Output:** None\n
+        **On Failure:** Raise Error.\n
+
+        :param config_path: params.yaml file
+        :return: None
+    """
+    global _worker_engine
+    _worker_engine = InferenceEngine(config_path=config_path)
+    if hasattr(_worker_engine.model, 'get_params') and 'n_jobs' in _worker_engine.model.get_params(): # RandomForest, XGBoost sklearn API
+        _worker_engine.model.set_params(n_jobs=1) # avoid oversubscribing the cores
+
+
+def ScoreShard(input_path, start, end, header, part_path, quarantine_part_path, write_header, include_proba=False):
+    """
+        **Method Name:** ScoreShard\n
+        **Description:** This method helps to score the rows in the byte range [start, end) of the input file & save them
+                         in a part file, the rows rejected by the schema contract go to a quarantine part file. It is a
+                         module level function, so it can run in a worker process\n
+        **Output:** part file path, no of rows, quarantine part file path, no of rejected rows\n
+        **On Failure:** Raise Error.\n
+
+        :param input_path: raw data path (csv)
+        :param start: first byte of the shard (start of a line)
+        :param end: end byte of the shard (start of a line, or end of file)
+        :param header: csv header line (bytes)
+        :param part_path: part file path
+        :param quarantine_part_path: quarantine part file path
+        :param write_header: write the header in the part files (first shard)
+        :param include_proba: add the positive class probability
+        :return: part file path, no of rows, quarantine part file path, no of rejected rows
+    """
+    with open(input_path, 'rb') as f:
+        f.seek(start)
+        shard = f.read(end - start)
+    data = pd.read_csv(io.BytesIO(header + shard), sep=',', dtype=_worker_engine.CategoricalDtypes())
+    data, rejects = _worker_engine.Validate(data)
+    data = data.assign(**_worker_engine.Score(data, include_proba=include_proba))
+    data.to_csv(part_path, index=False, header=write_header)
+    rejects.to_csv(quarantine_part_path, index=False, header=write_header)
+    return part_path, len(data), quarantine_part_path, len(rejects)
+
+
+class BatchScoring:
+    """
+        This class shall be used to score a large raw data file (csv) chunk by chunk. Each chunk is checked with the
+        schema contract, transformed with the fitted artifacts, predicted & appended to the output (the rejected rows
+        are appended to the quarantine file), so the memory stays bounded by the chunk size (and the queue size)
+        whatever the size of the input file.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, config_path):
+        self.config_path = config_path # keep the config path, the inference engine is created lazily
+        self.config = common_utils.read_params(config_path)  # read the information from params.yaml file as dict form
+        self.file_path = self.config['execution_logs']['predection']['log_files']['batch_scoring_logs']  # this file path help to log the details
+        self.logger = App_Logger()  # call the App_Logger() to log the details
+        self.common_utils = common_utils  # load the common utils
+        self.batch_scoring = self.config['batch_scoring'] # get the batch scoring details
+        self.engine = None # inference engine, created once on the first scoring
+        self.include_proba = self.config['predection_data']['include_proba'] # add the positive class probability
+
+    def GetEngine(self):
+        """
+            **Method Name:** GetEngine\n
+            **Description:** This method helps to get the warm inference engine, it loads the model only once\n
+            **Output:** inference engine\n
+            **On Failure:** Raise Error.\n
+
+            :return: inference engine
+        """
+        if self.engine is None:
+            self.engine = InferenceEngine(config_path=self.config_path) # load the model & fitted artifacts
+        return self.engine
+
+    def ReadChunks(self, input_path, chunk_size):
+        """
+            **Method Name:** ReadChunks\n
+            **Description:** This method helps to read the raw data file lazily, chunk by chunk (the encoded string columns
+                             as category)\n
+            **Output:** generator of data chunks\n
+            **On Failure:** Raise Error.\n
+
+            :param input_path: raw data path (csv)
+            :param chunk_size: no of rows per chunk
+            :return: generator of data chunks
+        """
+        with pd.read_csv(input_path, sep=',', chunksize=chunk_size, dtype=self.GetEngine().CategoricalDtypes()) as reader: # string columns as category
+            for chunk in reader:
+                yield chunk
+
+    def ScoreChunk(self, chunk):
+        """
+            **Method Name:** ScoreChunk\n
+            **Description:** This method helps to check one chunk with the schema contract & apply the fitted features
+                             engineering steps & the model on the valid rows\n
+            **Output:** valid rows with the outcome (& outcome_proba) column, rejected rows with the reject_reason column\n
+            **On Failure:** Raise Error.\n
+
+            :param chunk: raw data chunk
+            :return: scored rows, rejected rows
+        """
+        chunk, rejects = self.GetEngine().Validate(chunk)
+        return chunk.assign(**self.GetEngine().Score(chunk, include_proba=self.include_proba)), rejects
+
+    def WriteChunks(self, chunks, output_path, quarantine_path):
+        """
+            **Method Name:** WriteChunks\n
+            **Description:** This method helps to append the scored chunks to the output file & the rejected rows to the
+                             quarantine file (headers written once)\n
+            **Output:** no of chunks, rows & rejected rows written\n
+            **On Failure:** Raise Error.\n
+
+            :param chunks: iterable of (scored rows, rejected rows)
+            :param output_path: output data path (csv)
+            :param quarantine_path: quarantine data path (csv)
+            :return: no of chunks, no of rows, no of rejected rows
+        """
+        n_chunks, n_rows, n_rejects = 0, 0, 0
+        with open(output_path, 'w', newline='') as f, open(quarantine_path, 'w', newline='') as quarantine:
+            for chunk, rejects in chunks:
+                chunk.to_csv(f, index=False, header=n_chunks == 0) # append the chunk, keep the file handle open
+                rejects.to_csv(quarantine, index=False, header=n_chunks == 0)
+                n_chunks, n_rows, n_rejects = n_chunks + 1, n_rows + len(chunk), n_rejects + len(rejects)
+                self.logger.log(self.file, f"write chunk {n_chunks} ({len(chunk)} rows, {n_rows} rows in total, {len(rejects)} rejected rows)") # logs the details
+        return n_chunks, n_rows, n_rejects
+
+    def Prefetch(self, items, queue_size):
+        """
+            **Method Name:** Prefetch\n
+            **Description:** This method helps to consume an iterable in a background thread, so the producer runs while
+                             the caller works on the previous item. At most queue_size items wait in between, the errors
+                             are raised in the caller\n
+            **Output:** generator of items\n
+            **On Failure:** Raise Error.\n
+
+            :param items: iterable (generator)
+            :param queue_size: maximum no of items waiting in the queue
+            :return: generator of items
+        """
+        done = object()
+        buffer = queue.Queue(maxsize=queue_size)
+        stop = threading.Event() # set when the caller stops early (error in a later stage)
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for item in items:
+                    if not put(item):
+                        return
+                put(done)
+            except BaseException as ex:
+                put(ex)
+            finally:
+                if hasattr(items, 'close'):
+                    items.close() # release the upstream generator (file handle, its own thread)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def GetShards(self, input_path, shard_size):
+        """
+            **Method Name:** GetShards\n
+            **Description:** This method helps to split the input file into byte-range shards, every boundary is moved to
+                             the next line start (the csv must not have quoted newlines)\n
+            **Output:** header line, list of (start, end) byte ranges\n
+            **On Failure:** Raise Error.\n
+
+            :param input_path: raw data path (csv)
+            :param shard_size: approximate shard size in bytes
+            :return: header line, list of (start, end)
+        """
+        file_size = os.path.getsize(input_path)
+        with open(input_path, 'rb') as f:
+            header = f.readline() # repeated in front of every shard
+            boundaries = [f.tell()]
+            while boundaries[-1] < file_size:
+                f.seek(min(boundaries[-1] + shard_size, file_size))
+                f.readline() # move to the next line start
+                boundaries.append(min(f.tell(), file_size))
+        return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+    def ScoreSharded(self, input_path, output_path, quarantine_path, n_workers, shard_size):
+        """
+            **Method Name:** ScoreSharded\n
+            **Description:** This method helps to score the byte-range shards in a process pool (model loaded once per worker)
+                             & merge the part files (& quarantine part files) in input order\n
+            **Output:** no of shards, no of rows, no of rejected rows\n
+            **On Failure:** Raise Error.\n
+
+            :param input_path: raw data path (csv)
+            :param output_path: output data path (csv)
+            :param quarantine_path: quarantine data path (csv)
+            :param n_workers: no of worker processes
+            :param shard_size: approximate shard size in bytes
+            :return: no of shards, no of rows, no of rejected rows
+        """
+        header, shards = self.GetShards(input_path=input_path, shard_size=shard_size)
+        parts_dir = output_path + '.parts' # part files, removed after the merge
+        self.common_utils.clean_prev_dirs_if_exis(dir_path=parts_dir)
+        self.common_utils.create_dir(dirs=[parts_dir])
+        n_rows, n_rejects = 0, 0
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=InitWorker, initargs=(self.config_path,)) as executor, \
+                    open(output_path, 'wb') as output, open(quarantine_path, 'wb') as quarantine:
+                futures = [executor.submit(ScoreShard, input_path, start, end, header, os.path.join(parts_dir, f"part-{i:05d}.csv"),
+                                           os.path.join(parts_dir, f"quarantine-{i:05d}.csv"), i == 0, self.include_proba)
+                           for i, (start, end) in enumerate(shards)]
+                try:
+                    for i, future in enumerate(futures): # merge in input order, while the next shards are scored
+                        part_path, part_rows, quarantine_part_path, part_rejects = future.result()
+                        for path, merged in [(part_path, output), (quarantine_part_path, quarantine)]:
+                            with open(path, 'rb') as part:
+                                shutil.copyfileobj(part, merged)
+                            os.remove(path)
+                        n_rows, n_rejects = n_rows + part_rows, n_rejects + part_rejects
+                        self.logger.log(self.file, f"merge shard {i + 1}/{len(shards)} ({part_rows} rows, {n_rows} rows in total, {part_rejects} rejected rows)") # logs the details
+                except BaseException:
+                    for future in futures:
+                        future.cancel() # don't score the remaining shards
+                    raise
+        finally:
+            self.common_utils.clean_prev_dirs_if_exis(dir_path=parts_dir)
+        return len(shards), n_rows, n_rejects
+
+    def Score(self, input_path=None, output_path=None, quarantine_path=None, chunk_size=None, overlap=None, n_workers=None):
+        """
+            **Method Name:** Score\n
+            **Description:** This method helps to score the raw data file chunk by chunk & write the outcome incrementally.
+                             The defaults are in params.yaml, under batch_scoring\n
+            **Output:** output data path\n
+            **On Failure:** Raise Error.\n
+
+            :param input_path: raw data path (csv)
+            :param output_path: output data path (csv)
+            :param quarantine_path: quarantine data path (csv), rows rejected by the schema contract
+            :param chunk_size: no of rows per chunk
+            :param overlap: overlap read, transform/predict & write in separate threads
+            :param n_workers: no of worker processes, more than 1 scores byte-range shards in a process pool
+            :return: output data path
+        """
+        try:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.input_path = input_path or self.batch_scoring['input_path'] # mention the raw data path
+            self.output_path = output_path or self.batch_scoring['output_path'] # mention the output data path
+            self.quarantine_path = quarantine_path or self.batch_scoring['quarantine_path'] # mention the quarantine data path
+            self.chunk_size = chunk_size or self.batch_scoring['chunk_size'] # mention the chunk size
+            self.overlap = self.batch_scoring['overlap'] if overlap is None else overlap
+            self.queue_size = self.batch_scoring['queue_size'] # maximum chunks waiting between two stages
+            self.n_workers = n_workers or self.batch_scoring['n_workers'] # no of worker processes
+            self.common_utils.create_dir(dirs=[os.path.dirname(self.output_path) or '.', os.path.dirname(self.quarantine_path) or '.']) # create the output directories
+            if self.n_workers > 1:
+                self.shard_size = min(int(self.batch_scoring['shard_size_mb'] * 1024 ** 2), # approximate shard size in bytes,
+                                      os.path.getsize(self.input_path) // (4 * self.n_workers) + 1) # at least 4 shards per worker (load balance)
+                self.logger.log(self.file, f"score {self.input_path} in shards of {self.shard_size} bytes with {self.n_workers} worker processes") # logs the details
+                self.n_chunks, self.n_rows, self.n_rejects = self.ScoreSharded(input_path=self.input_path, output_path=self.output_path, quarantine_path=self.quarantine_path,
+                                                                               n_workers=self.n_workers, shard_size=self.shard_size)
+                self.logger.log(self.file, f"save the {self.n_rows} scored rows ({self.n_chunks} shards) in {self.output_path} & the {self.n_rejects} rejected rows in {self.quarantine_path}") # logs the details
+                self.file.close()
+                return self.output_path
+
+            self.engine = self.GetEngine() # load the model once, before the first chunk
+            self.logger.log(self.file, f"score {self.input_path} in chunks of {self.chunk_size} rows with {type(self.engine.model).__name__}, overlap: {self.overlap}") # logs the details
+
+            self.chunks = self.ReadChunks(input_path=self.input_path, chunk_size=self.chunk_size) # read lazily
+            if self.overlap:
+                self.chunks = self.Prefetch(items=self.chunks, queue_size=self.queue_size) # read in a background thread
+            self.scored_chunks = (self.ScoreChunk(chunk=chunk) for chunk in self.chunks) # transform & predict lazily
+            if self.overlap:
+                self.scored_chunks = self.Prefetch(items=self.scored_chunks, queue_size=self.queue_size) # predict in a background thread
+
+            self.n_chunks, self.n_rows, self.n_rejects = self.WriteChunks(chunks=self.scored_chunks, output_path=self.output_path,
+                                                                          quarantine_path=self.quarantine_path) # write in the current thread
+            self.logger.log(self.file, f"save the {self.n_rows} scored rows ({self.n_chunks} chunks) in {self.output_path} & the {self.n_rejects} rejected rows in {self.quarantine_path}") # logs the details
+            self.file.close()
+            return self.output_path
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="score a large csv file chunk by chunk with the trained model")
+    parser.add_argument('--config', default='params.yaml', help="params.yaml path")
+    parser.add_argument('--input', default=None, help="raw data path (csv), default batch_scoring.input_path")
+    parser.add_argument('--output', default=None, help="output path (csv), default batch_scoring.output_path")
+    parser.add_argument('--quarantine', default=None, help="quarantine path (csv) of the rejected rows, default batch_scoring.quarantine_path")
+    parser.add_argument('--chunk-size', type=int, default=None, help="no of rows per chunk, default batch_scoring.chunk_size")
+    parser.add_argument('--no-overlap', action='store_true', help="read, predict & write sequentially in one thread")
+    parser.add_argument('--workers', type=int, default=None, help="no of worker processes (shards), default batch_scoring.n_workers")
+    args = parser.parse_args()
+
+    batch = BatchScoring(config_path=args.config)
+    print(batch.Score(input_path=args.input, output_path=args.output, quarantine_path=args.quarantine, chunk_size=args.chunk_size,
+                      overlap=False if args.no_overlap else None, n_workers=args.workers))
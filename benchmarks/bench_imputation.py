@@ -0,0 +1,74 @@
+"""
+    Benchmark: wall time vs row count for each imputation mode.
+
+    The bundled DATA/adult_new.csv is encoded with the features transformer (fitted on the same data),
+    upsampled to the requested row counts and 5% of the values of each numeric column are set to NaN.
+    The sklearn KNNImputer (the previous implementation) is only run up to --knn-imputer-max-rows rows,
+    it is quadratic in rows.
+
+    Run from the project root:  python -m benchmarks.bench_imputation --rows 1000 4000 16000 64000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+from data_preprocessing.imputation import MissingValueImputer
+from training_features_engineering.featureEngineering import FeaturesTransformer
+
+
+def make_data(n_rows, config_path, data_path, missing_ratio=0.05, random_state=42):
+    """
+        encoded census features, upsampled to n_rows with missing values injected
+    """
+    raw = pd.read_csv(data_path, sep=',')
+    transformer = FeaturesTransformer(config_path=config_path).fit(raw)
+    data = transformer.transform(raw).drop(columns=transformer.output_col)
+    data = data.sample(n=n_rows, replace=True, random_state=random_state).reset_index(drop=True).astype(float)
+    rng = np.random.default_rng(random_state)
+    for col in data.columns.drop('sex'): # keep the group column complete
+        data.loc[rng.random(n_rows) < missing_ratio, col] = np.nan
+    return data
+
+
+def time_it(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 4000, 16000, 64000])
+    parser.add_argument('--knn-imputer-max-rows', type=int, default=16000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--config', default='params.yaml')
+    parser.add_argument('--data', default='DATA/adult_new.csv')
+    args = parser.parse_args()
+
+    modes = {
+        'sklearn KNNImputer': lambda train, test: KNNImputer(n_neighbors=3).fit(train).transform(test),
+        'median': lambda train, test: MissingValueImputer('median').fit(train).transform(test),
+        'group': lambda train, test: MissingValueImputer('group', group_col='sex').fit(train).transform(test),
+        'knn (chunked)': lambda train, test: MissingValueImputer('knn').fit(train).transform(test),
+        'no missing (skip)': lambda train, test: MissingValueImputer('median').fit(train).transform(train.fillna(0)),
+    }
+    print(f"{'rows':>8}  " + "  ".join(f"{mode:>18}" for mode in modes))
+    for n_rows in args.rows:
+        data = make_data(n_rows, args.config, args.data)
+        split = int(n_rows * 0.8)
+        train, test = data.iloc[:split], data.iloc[split:]
+        timings = []
+        for mode, fn in modes.items():
+            if mode == 'sklearn KNNImputer' and n_rows > args.knn_imputer_max_rows:
+                timings.append(f"{'skipped':>18}")
+                continue
+            timings.append(f"{time_it(lambda: fn(train, test), args.repeat):>17.4f}s")
+        print(f"{n_rows:>8}  " + "  ".join(timings))
+
+
+if __name__ == '__main__':
+    main()
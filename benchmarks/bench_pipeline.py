@@ -0,0 +1,314 @@
+"""
+    Benchmark suite: time & peak memory of each stage of the census pipeline, on the bundled DATA/adult_new.csv (scale 1)
+    and on synthetic census data of --scales times its rows (SyntheticCensus fitted on it, seeded by --seed):
+
+        load_split            load_split: read the raw csv, save it & split it to train & test
+        raw_data_validation   RawDataValidation: profile & checks of the train data
+        features_engineering  PreprocessingPipeline: fit on the train data (duplicates, outliers, encoding, scaling,
+                              imputation) & transform of the test data
+        borderline_smote      Rebalancer (borderline_smote, features_eng.rebalancing neighbours) on the encoded train data
+        knn_imputer           MissingValueImputer (knn) fitted on x_train, 5% of the x_test values missing
+        model_creation_*      ModelCreation fits of the XGBoost & RandomForest models
+        find_best_model       FindBestModel: all the candidates (model_selection) trained & the best one saved
+        predection            Predection: the saved pipeline & model score the test data
+
+    The stages run with the real classes on a copy of params.yaml where every artifact, model & log path is moved to a
+    temporary directory, so the project artifacts are never touched. The memory is the peak growth of the process RSS
+    during the stage (sampled every 5 ms, native allocations like XGBoost included, not the worker processes of
+    find_best_model). --tracemalloc also reports the tracemalloc peak (python & numpy allocations), it slows down the
+    python heavy stages (like the csv writing), so the times are then not comparable with a baseline run without it.
+
+    The results are written as json (--output). --save-baseline keeps them as the baseline, --compare checks them
+    against a baseline: a stage slower (or bigger) than the baseline by more than --tolerance, or a stage missing
+    from the baseline, is a regression (the exit code is 1).
+
+    Run from the project root:  python -m benchmarks.bench_pipeline --scales 1 10 100 --compare benchmarks/baseline_pipeline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost
+import yaml
+import utils.common_utils as common_utils
+from load_and_split_data.load_split import load_split
+from training_raw_data_validation.rawdataValidation import RawDataValidation
+from data_preprocessing.pipeline import PreprocessingPipeline
+from data_preprocessing.imputation import MissingValueImputer
+from data_preprocessing.rebalancing import Rebalancer
+from ml_model_creation.modelCreation import ModelCreation
+from find_best_model.findbestModel import FindBestModel
+from inference_engine.mappedArtifacts import ExportArtifacts
+from utils.schema_contract import SchemaContract
+from utils.synthetic_data import SyntheticCensus
+from predection import Predection
+
+STAGES = ['load_split', 'raw_data_validation', 'features_engineering', 'borderline_smote', 'knn_imputer',
+          'model_creation_xgboost', 'model_creation_random_forest', 'find_best_model', 'predection']
+
+
+def relocate(node, work_dir, log_files=False):
+    """
+        move (in place) the relative artifact, model & log paths of the config into work_dir
+    """
+    for key, value in node.items():
+        if isinstance(value, dict):
+            relocate(value, work_dir, log_files=key == 'log_files')
+        elif isinstance(value, str) and (log_files or key.endswith(('_dir', '_path')) or key == 'raw_local_data') \
+                and not os.path.isabs(value):
+            node[key] = os.path.join(work_dir, value)
+
+
+def isolated_config(config_path, work_dir, data_path):
+    """
+        params.yaml copy (in work_dir) which reads data_path & writes everything in work_dir
+    """
+    config = common_utils.read_params(config_path)
+    relocate(config, work_dir)
+    config['data_source']['local_path'] = os.path.abspath(data_path)
+    config['stage_cache']['enabled'] = False
+    path = os.path.join(work_dir, 'params.yaml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return path, config
+
+
+def write_data(raw, scale, seed, output_col, data_path):
+    """
+        raw data (scale 1) or scale x rows of synthetic census data (SyntheticCensus fitted on the raw data, streamed
+        to the csv chunk by chunk), no of rows
+    """
+    if scale == 1:
+        raw.to_csv(data_path, index=False)
+        return len(raw)
+    generator = SyntheticCensus(ycol=output_col, seed=seed).fit(raw)
+    return generator.Write(output_path=data_path, n_rows=len(raw) * scale)
+
+
+def rss_mb():
+    """
+        resident memory of the process (MB), the max RSS so far if /proc is not available
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # kB on linux
+
+
+class RssSampler(threading.Thread):
+    """
+        peak RSS of the process, sampled in the background while a stage runs
+    """
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss_mb()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.peak = max(self.peak, rss_mb())
+        return self.peak
+
+
+def run_stage(name, fn, results, scale, rows, trace=False):
+    """
+        time & memory of one stage, appended to results
+    """
+    start_rss = rss_mb()
+    sampler = RssSampler()
+    sampler.start()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        fn()
+        seconds = time.perf_counter() - start
+        traced_peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if trace else None
+    finally:
+        if trace:
+            tracemalloc.stop()
+        peak_rss = sampler.stop()
+    result = {'scale': scale, 'rows': rows, 'stage': name, 'seconds': round(seconds, 4),
+              'peak_mb': round(peak_rss - start_rss, 2), 'peak_rss_mb': round(peak_rss, 1)}
+    if trace:
+        result['traced_peak_mb'] = round(traced_peak, 2)
+    results.append(result)
+    print(f"{scale:>6}  {rows:>9}  {name:>28}  {seconds:>9.3f}s  {result['peak_mb']:>9.1f}  {peak_rss:>9.1f}"
+          + (f"  {traced_peak:>9.1f}" if trace else ''), flush=True)
+
+
+def run_scale(args, raw, scale, results):
+    """
+        all the stages on the data of scale times the raw rows
+    """
+    work_dir = tempfile.mkdtemp(prefix=f"bench_pipeline_x{scale}_", dir=args.work_dir)
+    try:
+        data_path = os.path.join(work_dir, 'data.csv')
+        config_path, config = isolated_config(args.config, work_dir, data_path)
+        rows = write_data(raw, scale, seed=args.seed, output_col=config['data']['output_col'], data_path=data_path)
+        output_col = config['data']['output_col']
+        state = {}
+
+        def load():
+            splitter = load_split(config_path=config_path)
+            splitter.load_and_save_data()
+            splitter.split_data()
+            state['train'] = common_utils.read_data(data_path=config['artifacts']['split_data']['train_path'])
+            state['test'] = common_utils.read_data(data_path=config['artifacts']['split_data']['test_path'])
+
+        def validate():
+            validation = RawDataValidation(config_path=config_path)
+            profile = validation.GetProfile(data=state['train'], ycol=output_col)
+            validation.GetNeumericalFeatures(data=state['train'], profile=profile)
+            validation.GetCatrgorycalFeatures(data=state['train'], profile=profile)
+            validation.GetLengthofData(data=state['train'], profile=profile)
+            validation.IsMissingValuePresent(data=state['train'], profile=profile)
+            validation.IsDataImbalanced(data=state['train'], ycol=output_col, profile=profile)
+            state['schema'] = SchemaContract(range_margin=config['schema']['range_margin'],
+                                             allow_nulls=config['schema']['allow_nulls']).fit(data=state['train'], ycol=output_col)
+
+        def features():
+            pipeline = PreprocessingPipeline(config_path=config_path)
+            pipeline.rebalancer = Rebalancer(strategy='none') # timed in its own stage
+            train = pipeline.fit_transform(data=state['train'])
+            test = pipeline.transform(data=state['test'])
+            state['pipeline'] = pipeline
+            state['x_train'], state['y_train'] = train.drop(columns=[output_col]), train[output_col]
+            state['x_test'], state['y_test'] = test[list(state['x_train'].columns)], test[output_col]
+            state['class_weights'] = Rebalancer.ClassWeights(state['y_train']) \
+                if config['features_eng']['rebalancing']['strategy'] == 'class_weight' else None
+
+        def smote():
+            rebalancing = config['features_eng']['rebalancing']
+            Rebalancer(strategy='borderline_smote', neighbors=rebalancing['neighbors'], k_neighbors=rebalancing['k_neighbors'],
+                       m_neighbors=rebalancing['m_neighbors'], max_reference_rows=rebalancing['max_reference_rows'],
+                       n_jobs=rebalancing['n_jobs'], random_state=config['base']['random_state']
+                       ).fit_resample(data=state['x_train'].assign(**{output_col: state['y_train']}), ycol=output_col)
+
+        def impute():
+            x_test = state['x_test'].astype(np.float64)
+            mask = np.random.default_rng(args.seed).random(x_test.shape) < 0.05 # 5% missing values
+            imputation = config['preProcessing']['imputation']
+            MissingValueImputer(strategy='knn', n_neighbors=imputation['n_neighbors'], chunk_size=imputation['chunk_size'],
+                                max_reference_rows=imputation['max_reference_rows'], random_state=config['base']['random_state']
+                                ).fit(state['x_train']).transform(x_test.mask(mask))
+
+        def fit(algo):
+            creation = ModelCreation(config_path=config_path)
+            fit_fn = creation.ApplyXGBoost if algo == 'xgboost' else creation.ApplyRandomForest
+            return lambda: fit_fn(x_train=state['x_train'], y_train=state['y_train'], class_weights=state['class_weights'])
+
+        def best_model():
+            _, state['model'], _ = FindBestModel(config_path=config_path).GetBestModel(
+                x_train=state['x_train'], y_train=state['y_train'], x_test=state['x_test'], y_test=state['y_test'],
+                class_weights=state['class_weights']) # the best model is saved in the work directory
+
+        def predict():
+            common_utils.save_model(model=state['pipeline'], model_path=config['model']['pipeline_path'])
+            state['schema'].Save(schema_path=config['model']['schema_path'])
+            ExportArtifacts(model=state['model'], pipeline=state['pipeline'], export_dir=config['inference']['mmap_dir'])
+            Predection(config_path=config_path).Predection() # load the artifacts, validate, transform & score the test data
+
+        stages = {'load_split': load, 'raw_data_validation': validate, 'features_engineering': features,
+                  'borderline_smote': smote, 'knn_imputer': impute, 'model_creation_xgboost': fit('xgboost'),
+                  'model_creation_random_forest': fit('random_forest'), 'find_best_model': best_model, 'predection': predict}
+        skip = set(args.skip) | ({'predection'} if 'find_best_model' in args.skip else set()) # predection needs the best model
+        for name in STAGES:
+            if name not in skip:
+                run_stage(name, stages[name], results, scale, rows, trace=args.tracemalloc)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance, min_seconds, min_mb):
+    """
+        regressions of the results against the baseline, printed as a table
+    """
+    base = {(item['scale'], item['stage']): item for item in baseline['results']}
+    regressions = []
+    print(f"\n{'scale':>6}  {'stage':>28}  {'seconds':>9}  {'baseline':>9}  {'ratio':>6}  {'peak MB':>9}  {'baseline':>9}  {'ratio':>6}")
+    for item in results:
+        old = base.get((item['scale'], item['stage']))
+        if old is None: # a stage (or scale) the baseline doesn't have is reported, never silently passed
+            regressions.append({**item, 'baseline': None, 'regression': 'NO BASELINE'})
+            print(f"{item['scale']:>6}  {item['stage']:>28}  {item['seconds']:>8.3f}s  {'-':>9}  {'-':>6}  "
+                  f"{item['peak_mb']:>9.1f}  {'-':>9}  {'-':>6}  NO BASELINE")
+            continue
+        time_ratio = item['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        memory_ratio = item['peak_mb'] / old['peak_mb'] if old['peak_mb'] else float('inf')
+        slower = time_ratio > 1 + tolerance and item['seconds'] - old['seconds'] > min_seconds
+        bigger = memory_ratio > 1 + tolerance and item['peak_mb'] - old['peak_mb'] > min_mb
+        flag = ' '.join(name for name, failed in [('SLOWER', slower), ('MORE MEMORY', bigger)] if failed)
+        if flag:
+            regressions.append({**item, 'baseline': old, 'regression': flag})
+        print(f"{item['scale']:>6}  {item['stage']:>28}  {item['seconds']:>8.3f}s  {old['seconds']:>8.3f}s  {time_ratio:>6.2f}  "
+              f"{item['peak_mb']:>9.1f}  {old['peak_mb']:>9.1f}  {memory_ratio:>6.2f}  {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--skip', nargs='*', default=[], choices=STAGES, help='stages not run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--config', default='params.yaml')
+    parser.add_argument('--data', default='DATA/adult_new.csv')
+    parser.add_argument('--output', default='benchmarks/results/bench_pipeline.json')
+    parser.add_argument('--compare', default=None, help='baseline json, the regressions set the exit code to 1')
+    parser.add_argument('--save-baseline', default=None, help='also write the results to this baseline json')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown/growth (0.25: 25%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.1, help='smaller slowdowns are noise')
+    parser.add_argument('--min-mb', type=float, default=1.0, help='smaller memory growths are noise')
+    parser.add_argument('--work-dir', default=None, help='parent of the temporary directories (default: system temp)')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary directories')
+    parser.add_argument('--tracemalloc', action='store_true', help='also report the tracemalloc peak (slower)')
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.data, sep=',')
+    results = []
+    print(f"{'scale':>6}  {'rows':>9}  {'stage':>28}  {'time':>10}  {'peak MB':>9}  {'peak RSS':>9}" + (f"  {'traced MB':>9}" if args.tracemalloc else ''))
+    for scale in args.scales:
+        run_scale(args, raw, scale, results)
+
+    report = {'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+                              'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+                              'xgboost': xgboost.__version__},
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'data': args.data, 'seed': args.seed, 'tracemalloc': args.tracemalloc,
+              'results': results}
+    for path in [args.output, args.save_baseline]:
+        if path:
+            common_utils.create_dir(dirs=[os.path.dirname(path) or '.'])
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=1)
+                f.write('\n')
+    print(f"\nresults saved in {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_seconds, args.min_mb)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {[(item['scale'], item['stage'], item['regression']) for item in regressions]}")
+            sys.exit(1)
+        print("\nno regression")
+
+
+if __name__ == '__main__':
+    main()
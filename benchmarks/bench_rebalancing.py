@@ -0,0 +1,66 @@
+"""
+    Benchmark: time, peak memory & test AUC of each rebalancing strategy.
+
+    The bundled DATA/adult_new.csv is split like the training pipeline (base.test_size, base.random_state), encoded
+    with the features transformer fitted on the train part & the train part is replaced by --scale times its rows of
+    synthetic census data (SyntheticCensus fitted on the train part, scale 1 keeps the train part). Every strategy
+    rebalances the train part, then an XGBoost model (ml_algo.xgboost.best_params) is trained & scored on the test part.
+    The class_weight strategy passes the balanced class weights to the model instead of resampling.
+
+    Run from the project root:  python -m benchmarks.bench_rebalancing --scale 1 4
+"""
+import argparse
+import time
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+import utils.common_utils as common_utils
+from data_preprocessing.rebalancing import Rebalancer
+from ml_model_creation.modelCreation import BuildEstimator
+from training_features_engineering.featureEngineering import FeaturesTransformer
+from utils.synthetic_data import SyntheticCensus
+
+
+def make_data(config_path, data_path, scale):
+    """
+        encoded census train (synthetic, scale times the train rows) & test data
+    """
+    config = common_utils.read_params(config_path)
+    raw = pd.read_csv(data_path, sep=',')
+    train, test = train_test_split(raw, test_size=config['base']['test_size'], random_state=config['base']['random_state'])
+    transformer = FeaturesTransformer(config_path=config_path).fit(train)
+    if scale > 1:
+        generator = SyntheticCensus(ycol=transformer.output_col, seed=config['base']['random_state']).fit(train)
+        train = pd.concat(generator.Generate(len(train) * scale), ignore_index=True)
+    train, test = transformer.transform(train), transformer.transform(test)
+    return train, test, transformer.output_col, config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--config', default='params.yaml')
+    parser.add_argument('--data', default='DATA/adult_new.csv')
+    args = parser.parse_args()
+
+    modes = [('none', 'exact'), ('class_weight', 'exact'), ('random_over', 'exact'), ('random_under', 'exact'),
+             ('smote', 'exact'), ('smote', 'approximate'), ('borderline_smote', 'exact'), ('borderline_smote', 'approximate')]
+    print(f"{'scale':>5}  {'strategy':>28}  {'rows':>8}  {'rebalance':>10}  {'peak MB':>8}  {'fit':>8}  {'AUC':>7}")
+    for scale in args.scale:
+        train, test, ycol, config = make_data(args.config, args.data, scale)
+        for strategy, neighbors in modes:
+            rebalancer = Rebalancer(strategy=strategy, neighbors=neighbors, random_state=config['base']['random_state'], trace_memory=True)
+            data = rebalancer.fit_resample(data=train, ycol=ycol)
+            x, y = data.drop(columns=ycol), data[ycol]
+            start = time.perf_counter()
+            model = BuildEstimator(algo='xgboost', params=config['ml_algo']['xgboost']['best_params'])
+            model.fit(x, y, sample_weight=y.map(rebalancer.class_weights).to_numpy() if rebalancer.class_weights else None)
+            fit_seconds = time.perf_counter() - start
+            auc = roc_auc_score(test[ycol], model.predict_proba(test[x.columns])[:, 1])
+            report = rebalancer.report
+            print(f"{scale:>5}  {strategy + ' (' + neighbors + ')':>28}  {report['rows']:>8}  {report['seconds']:>9.3f}s  "
+                  f"{report['peak_memory_mb']:>8.1f}  {fit_seconds:>7.2f}s  {auc:>7.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+    Benchmark: inference transform of a raw batch to the model input, pandas data frames (PreprocessingPipeline.transform,
+    then the model columns as a float32 matrix) vs the preallocated float matrix fast path (TransformArray). The time &
+    the tracemalloc peak of each path are reported, the allocations above the model input itself are the overhead.
+    The two model inputs are checked for exact equality.
+
+    The pipeline is fitted on the bundled DATA/adult_new.csv with the params.yaml steps (rebalancing disabled), the
+    batches are synthetic census data (SyntheticCensus fitted on the same file, string columns as categories, like the
+    batch scoring).
+
+    Run from the project root:  python -m benchmarks.bench_transform --rows 1000 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import utils.common_utils as common_utils
+from data_preprocessing.pipeline import PreprocessingPipeline
+from data_preprocessing.rebalancing import Rebalancer
+from utils.synthetic_data import SyntheticCensus
+
+
+def fit_pipeline(config_path, raw):
+    """
+        pipeline fitted on the raw data (no rebalancing, the inference steps only)
+    """
+    pipeline = PreprocessingPipeline(config_path=config_path)
+    pipeline.rebalancer = Rebalancer(strategy='none')
+    return pipeline.fit(raw)
+
+
+def measure(fn, repeat):
+    """
+        best time & tracemalloc peak (MB) of fn
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--config', default='params.yaml')
+    parser.add_argument('--data', default='DATA/adult_new.csv')
+    args = parser.parse_args()
+
+    raw = common_utils.to_categorical(pd.read_csv(args.data, sep=','))
+    pipeline = fit_pipeline(args.config, raw)
+    cols = pipeline.feature_cols
+    generator = SyntheticCensus(ycol=pipeline.output_col, seed=42, chunk_size=max(args.rows)).fit(raw)
+    print(f"{'rows':>8}  {'path':>6}  {'time':>9}  {'peak MB':>8}  {'input MB':>8}  {'overhead MB':>11}  {'equal':>6}")
+    for n_rows in args.rows:
+        batch = generator.GenerateChunk(index=0, n_rows=n_rows)
+        frame, frame_time, frame_peak = measure(lambda: pipeline.transform(batch)[cols].to_numpy(dtype=np.float32), args.repeat)
+        array, array_time, array_peak = measure(lambda: pipeline.TransformArray(batch, cols=cols), args.repeat)
+        equal = np.array_equal(frame, array, equal_nan=True)
+        input_mb = array.nbytes / 1024 ** 2
+        for path, seconds, peak in [('frame', frame_time, frame_peak), ('array', array_time, array_peak)]:
+            print(f"{n_rows:>8}  {path:>6}  {seconds:>8.4f}s  {peak:>8.1f}  {input_mb:>8.1f}  {peak - input_mb:>11.1f}  {str(equal):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+    Benchmark: RandomForest prediction latency (small batches) & throughput (large batches), scikit-learn
+    estimator vs the flattened, vectorized FlatForest backend. The probabilities are checked for exact equality.
+
+    The forest is trained on the bundled DATA/adult_new.csv (encoded with the features transformer) using
+    ml_algo.random_forest.best_params from params.yaml, unless --max-depth / --n-estimators are given.
+
+    Run from the project root:  python -m benchmarks.bench_tree_inference --rows 1 10 100 10000 100000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+import utils.common_utils as common_utils
+from inference_engine.mappedArtifacts import FlatForest
+from training_features_engineering.featureEngineering import FeaturesTransformer
+
+
+def make_data(config_path, data_path):
+    """
+        encoded census features & label
+    """
+    raw = pd.read_csv(data_path, sep=',')
+    transformer = FeaturesTransformer(config_path=config_path).fit(raw)
+    data = transformer.transform(raw)
+    return data.drop(columns=transformer.output_col), data[transformer.output_col]
+
+
+def time_it(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 10, 100, 10000, 100000])
+    parser.add_argument('--n-estimators', type=int, default=None)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--config', default='params.yaml')
+    parser.add_argument('--data', default='DATA/adult_new.csv')
+    args = parser.parse_args()
+
+    x, y = make_data(args.config, args.data)
+    params = dict(common_utils.read_params(args.config)['ml_algo']['random_forest']['best_params'])
+    if args.n_estimators is not None:
+        params['n_estimators'] = args.n_estimators
+    if args.max_depth is not None:
+        params['max_depth'] = args.max_depth
+    model = RandomForestClassifier(**params, n_jobs=1, random_state=42).fit(x, y) # n_jobs=1: deterministic summation order
+    flat = FlatForest.FromRandomForest(model=model)
+    print(f"RandomForest {params}")
+
+    print(f"{'rows':>8}  {'sklearn':>12}  {'vectorized':>12}  {'speedup':>8}  {'equal':>6}")
+    for n_rows in args.rows:
+        batch = x.sample(n=n_rows, replace=True, random_state=42)
+        equal = np.array_equal(model.predict_proba(batch), flat.predict_proba(batch))
+        sklearn_time = time_it(lambda: model.predict_proba(batch), args.repeat)
+        flat_time = time_it(lambda: flat.predict_proba(batch), args.repeat)
+        print(f"{n_rows:>8}  {sklearn_time:>11.5f}s  {flat_time:>11.5f}s  {sklearn_time / flat_time:>7.1f}x  {str(equal):>6}")
+
+
+if __name__ == '__main__':
+    main()
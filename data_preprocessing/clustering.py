@@ -30,7 +30,7 @@ class KMeans_Clustering:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.wcss = []
             for i in range(1, 11):
@@ -55,7 +55,7 @@ class KMeans_Clustering:
             return self.kn.knee  # get or return the number of cluster
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -72,7 +72,7 @@ class KMeans_Clustering:
             :return: cluster data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.no_cluster = no_cluster
             self.kmeans = KMeans(n_clusters=self.no_cluster, init='k-means++', random_state=101)  # create a cluster using KMeans Clustering
@@ -93,7 +93,7 @@ class KMeans_Clustering:
             return self.data # return the cluster labeled data
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
\ No newline at end of file
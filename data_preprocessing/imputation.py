@@ -0,0 +1,182 @@
+import numpy as np
+from sklearn.metrics.pairwise import nan_euclidean_distances
+
+
+class MissingValueImputer:
+    """
+        This class shall be used to impute the missing values with the statistics learned from train data.\n
+        strategy:\n
+            median: per-column median (mode for non-numeric columns).\n
+            group: per-category median of a group column (like sex), falls back to the column median.\n
+            knn: mean of the nearest complete train rows (nan euclidean distance), computed chunk by chunk
+                 only for the rows which have missing values, against a sample of at most max_reference_rows
+                 train rows.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    strategies = ('median', 'group', 'knn')
+
+    def __init__(self, strategy='median', group_col=None, n_neighbors=3, chunk_size=2048, max_reference_rows=20000,
+                 random_state=42):
+        if strategy not in self.strategies:
+            raise ValueError(f"Unknown imputation strategy {strategy}, use one of {self.strategies}")
+        if strategy == 'group' and group_col is None:
+            raise ValueError("group_col is required for the group imputation strategy")
+        self.strategy = strategy
+        self.group_col = group_col
+        self.n_neighbors = n_neighbors
+        self.chunk_size = chunk_size
+        self.max_reference_rows = max_reference_rows
+        self.random_state = random_state
+        self.columns = None # columns seen at fit time
+        self.fill_values = {} # {column: median or mode}
+        self.group_values = None # per-category median (group strategy)
+        self.reference = None # complete train rows (knn strategy)
+        self.reference_cols = [] # numeric columns of the reference rows (knn strategy)
+
+    def fit(self, data):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn the imputation statistics from the train data\n
+            **Output:** fitted imputer\n
+            **On Failure:** Raise Error.\n
+
+            :param data: x_train
+            :return: fitted imputer
+        """
+        self.columns = list(data.columns)
+        numeric_cols = data.select_dtypes(include='number').columns
+        self.fill_values = data[numeric_cols].median().to_dict()
+        for col in data.columns.difference(numeric_cols):
+            mode = data[col].mode()
+            self.fill_values[col] = mode.iloc[0] if len(mode) else np.nan
+        if self.strategy == 'group':
+            self.group_values = data.groupby(self.group_col)[list(numeric_cols.drop(self.group_col, errors='ignore'))].median()
+        elif self.strategy == 'knn':
+            complete = data[numeric_cols].dropna()
+            if len(complete) > self.max_reference_rows: # approximate neighbours, search a random sample of train rows
+                complete = complete.sample(n=self.max_reference_rows, random_state=self.random_state)
+            self.reference = complete.to_numpy(dtype=np.float64)
+            self.reference_cols = list(numeric_cols)
+        return self
+
+    def transform(self, data):
+        """
+            **Method Name:** transform\n
+            **Description:** This method helps to impute the missing values using the learned statistics,
+                             the data is returned as it is if no value is missing\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: x_train, x_test or predection data
+            :return: data
+        """
+        if self.columns is None:
+            raise ValueError("MissingValueImputer is not fitted yet, call fit() first")
+        null_counts = data.isnull().sum()
+        missing_cols = list(null_counts[null_counts > 0].index)
+        if not missing_cols: # nothing to impute
+            return data
+        data = data.copy(deep=False) # the imputed columns are replaced, not written in place
+        if self.strategy == 'group':
+            groups = data[self.group_col]
+            for col in missing_cols:
+                if col in self.group_values:
+                    data[col] = data[col].fillna(groups.map(self.group_values[col]))
+        elif self.strategy == 'knn':
+            self._ImputeKNN(data, [col for col in missing_cols if col in self.reference_cols])
+        return data.fillna({col: self.fill_values.get(col, np.nan) for col in missing_cols}) # remaining values
+
+    def fit_transform(self, data):
+        """
+            **Method Name:** fit_transform\n
+            **Description:** This method helps to fit the imputer & impute the train data\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: x_train
+            :return: data
+        """
+        return self.fit(data).transform(data)
+
+    def TransformArray(self, values, cols):
+        """
+            **Method Name:** TransformArray\n
+            **Description:** This method helps to impute the missing values of a float matrix in place (like the
+                             preallocated model input), the columns are found by name. The columns with a missing value
+                             are found with one column sum, nothing is allocated if no value is missing\n
+            **Output:** values\n
+            **On Failure:** Raise Error.\n
+
+            :param values: 2-D float array (rows x cols)
+            :param cols: column names of the array
+            :return: values
+        """
+        if self.columns is None:
+            raise ValueError("MissingValueImputer is not fitted yet, call fit() first")
+        with np.errstate(invalid='ignore'): # inf - inf
+            candidates = np.flatnonzero(np.isnan(values.sum(axis=0))) # a missing value makes the column sum nan
+        missing_cols = [cols[j] for j in candidates if np.isnan(values[:, j]).any()]
+        if not missing_cols:
+            return values
+        if self.strategy == 'group' and self.group_col in cols:
+            groups = values[:, cols.index(self.group_col)]
+            for col in missing_cols:
+                if col in self.group_values:
+                    column = values[:, cols.index(col)]
+                    mask = np.isnan(column)
+                    column[mask] = self.group_values[col].reindex(groups[mask]).to_numpy()
+        elif self.strategy == 'knn':
+            knn_cols = [col for col in missing_cols if col in self.reference_cols]
+            if knn_cols and len(self.reference):
+                self._CheckReferenceCols(cols)
+                index = [cols.index(col) for col in self.reference_cols]
+                reference_values = values[:, index].astype(np.float64)
+                self._ImputeKNNValues(reference_values)
+                for col in knn_cols:
+                    values[:, cols.index(col)] = reference_values[:, self.reference_cols.index(col)]
+        for col in missing_cols: # remaining values
+            column = values[:, cols.index(col)]
+            column[np.isnan(column)] = self.fill_values.get(col, np.nan)
+        return values
+
+    def _ImputeKNN(self, data, missing_cols):
+        """
+            impute (in place) the rows which have missing values with the mean of the nearest reference rows
+        """
+        if not missing_cols or len(self.reference) == 0:
+            return
+        self._CheckReferenceCols(data.columns)
+        values = data[self.reference_cols].to_numpy(dtype=np.float64)
+        self._ImputeKNNValues(values)
+        for col in missing_cols:
+            data[col] = values[:, self.reference_cols.index(col)]
+
+    def _CheckReferenceCols(self, cols):
+        """
+            the knn distances need all the reference columns (the numeric columns seen at fit time)
+        """
+        absent = [col for col in self.reference_cols if col not in cols]
+        if absent:
+            raise ValueError(f"The knn imputer needs the reference columns {absent}, they are not in the data")
+
+    def _ImputeKNNValues(self, values):
+        """
+            impute (in place) the rows of a float64 matrix (reference columns) which have missing values
+        """
+        rows = np.flatnonzero(np.isnan(values).any(axis=1)) # only the rows with missing values
+        k = min(self.n_neighbors, len(self.reference))
+        for start in range(0, len(rows), self.chunk_size): # memory is bounded by chunk_size x reference rows
+            chunk = rows[start:start + self.chunk_size]
+            distances = nan_euclidean_distances(values[chunk], self.reference)
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            neighbour_means = self.reference[nearest].mean(axis=1) # (rows, columns)
+            chunk_values = values[chunk]
+            mask = np.isnan(chunk_values)
+            chunk_values[mask] = neighbour_means[mask]
+            values[chunk] = chunk_values
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,130 @@
+import numpy as np
+
+
+class ZScoreOutliers:
+    """
+        This class shall be used to detect & handle the outliers with the Z-Score (|x - mean| >= threshold * std) of all
+        the numeric columns together. The means & standard deviations are learned from the train data in one numpy pass,
+        so the test/predection data uses the same limits.\n
+        policy:\n
+            clip: the values are clipped to mean +/- threshold * std.\n
+            drop: the rows with an outlier are removed (train data only, transform keeps the rows to score them).\n
+            flag: an is_outlier column (0/1) is added.\n
+            none: the data is returned as it is (only the statistics are learned).\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    policies = ('clip', 'drop', 'flag', 'none')
+    flag_col = 'is_outlier'
+
+    def __init__(self, threshold=3, policy='clip', cols=None):
+        if policy not in self.policies:
+            raise ValueError(f"Unknown outliers policy {policy}, use one of {self.policies}")
+        self.threshold = threshold
+        self.policy = policy
+        self.cols = cols # numeric columns, None: all the numeric columns seen at fit time
+        self.means = None # per column mean, learned from train data
+        self.stds = None # per column standard deviation (ddof=0, like scipy.stats.zscore), learned from train data
+
+    def fit(self, data, exclude_cols=()):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn the means & standard deviations of the numeric columns\n
+            **Output:** fitted outliers engine\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data
+            :param exclude_cols: columns never checked (like the output column)
+            :return: fitted outliers engine
+        """
+        if self.cols is None:
+            self.cols = [col for col in data.select_dtypes(include='number').columns if col not in exclude_cols]
+        values = data[self.cols].to_numpy(dtype=np.float64)
+        self.means = np.nanmean(values, axis=0)
+        self.stds = np.nanstd(values, axis=0)
+        return self
+
+    def Mask(self, data):
+        """
+            **Method Name:** Mask\n
+            **Description:** This method helps to get the outliers of all the columns at once\n
+            **Output:** boolean matrix (rows x columns), True for an outlier\n
+            **On Failure:** Raise Error.\n
+
+            :param data: data with the fitted columns
+            :return: boolean matrix
+        """
+        if self.means is None:
+            raise ValueError("ZScoreOutliers is not fitted yet, call fit() first")
+        values = data[self.cols].to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'): # missing values are never outliers
+            return (np.abs(values - self.means) >= self.threshold * self.stds) & (self.stds > 0) # |z| >= threshold, a constant column (std 0) has no outliers
+
+    def OutlierColumns(self, data):
+        """
+            **Method Name:** OutlierColumns\n
+            **Description:** This method helps to get the columns where the outliers are present\n
+            **Output:** {column: positions of the outliers}\n
+            **On Failure:** Raise Error.\n
+
+            :param data: data with the fitted columns
+            :return: {column: positions of the outliers}
+        """
+        mask = self.Mask(data)
+        return {col: np.flatnonzero(mask[:, i]) for i, col in enumerate(self.cols) if mask[:, i].any()}
+
+    def ClipArray(self, col, values):
+        """
+            **Method Name:** ClipArray\n
+            **Description:** This method helps to clip one column to the train limits in place (clip policy only)\n
+            **Output:** values\n
+            **On Failure:** Raise Error.\n
+
+            :param col: column
+            :param values: float array of the column
+            :return: values
+        """
+        if self.policy == 'clip' and col in self.cols:
+            i = self.cols.index(col)
+            limit = self.threshold * self.stds[i]
+            np.clip(values, self.means[i] - limit, self.means[i] + limit, out=values)
+        return values
+
+    def transform(self, data):
+        """
+            **Method Name:** transform\n
+            **Description:** This method helps to apply the policy with the train limits (the drop policy keeps the
+                             rows, they must be scored)\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: test or predection data
+            :return: data
+        """
+        return self._Apply(data, drop=False)
+
+    def fit_transform(self, data, exclude_cols=()):
+        """
+            **Method Name:** fit_transform\n
+            **Description:** This method helps to learn the statistics & apply the policy on the train data\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data
+            :param exclude_cols: columns never checked (like the output column)
+            :return: data
+        """
+        return self.fit(data, exclude_cols=exclude_cols)._Apply(data, drop=True)
+
+    def _Apply(self, data, drop):
+        if self.policy == 'none':
+            return data
+        if self.policy == 'clip':
+            limit = self.threshold * self.stds
+            clipped = np.clip(data[self.cols].to_numpy(dtype=np.float64), self.means - limit, self.means + limit)
+            return data.assign(**{col: clipped[:, i] for i, col in enumerate(self.cols)}) # the clipped columns are float
+        outlier_rows = self.Mask(data).any(axis=1)
+        if self.policy == 'flag':
+            return data.assign(**{self.flag_col: outlier_rows.astype(np.int8)})
+        return data[~outlier_rows] if drop else data
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+import utils.common_utils as common_utils
+from data_preprocessing.outliers import ZScoreOutliers
+from data_preprocessing.imputation import MissingValueImputer
+from data_preprocessing.rebalancing import Rebalancer
+from training_features_engineering.featureEngineering import FeaturesTransformer
+from training_data_scaling.dataScaling import Standardizer
+
+
+class PreprocessingPipeline:
+    """
+        This class shall be used to learn every preprocessing step from the train data once & apply them to the
+        test/predection data, like a scikit-learn pipeline. The steps are built from params.yaml:\n
+            deduplicate: remove the duplicate rows (train data only).\n
+            outliers: z-score outliers policy (ZScoreOutliers).\n
+            encoder: label encoding, mean encoding & zero value replacement (FeaturesTransformer).\n
+            scaler: standardization, fused with the encoding (Standardizer, None if features_eng.scaling is disabled).\n
+            imputer: missing values imputation of the features (MissingValueImputer).\n
+            rebalancer: class rebalancing (Rebalancer, train data only).\n
+        The steps run one after another under pandas copy-on-write, so the unchanged columns are shared by the
+        intermediate frames instead of being copied at each step. TransformArray is the zero-copy fast path of the
+        inference: every step writes its output in the column slot of one preallocated float matrix (the model
+        input). The fitted pipeline is saved as one artifact.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, config_path:str):
+        config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form (not kept, the pipeline is pickled)
+        features_eng = config['features_eng'] # get the features engineering details
+        random_state = config['base']['random_state']
+        self.output_col = config['data']['output_col'] # get the output column
+        self.deduplicate = True # remove the duplicate train rows
+        self.outliers = ZScoreOutliers(threshold=features_eng['outliers_theshold'], policy=features_eng['outliers']['policy'],
+                                       cols=features_eng['outliers']['cols'])
+        self.encoder = FeaturesTransformer(config_path=config_path)
+        scaling = features_eng['scaling']
+        self.scaler = Standardizer(cols=scaling['cols'], dtype=scaling['dtype']) if scaling['enabled'] else None
+        imputation = config['preProcessing']['imputation']
+        self.imputer = MissingValueImputer(strategy=imputation['strategy'], group_col=imputation['group_col'],
+                                           n_neighbors=imputation['n_neighbors'], chunk_size=imputation['chunk_size'],
+                                           max_reference_rows=imputation['max_reference_rows'], random_state=random_state)
+        rebalancing = features_eng['rebalancing']
+        self.rebalancer = Rebalancer(strategy=rebalancing['strategy'], neighbors=rebalancing['neighbors'],
+                                     k_neighbors=rebalancing['k_neighbors'], m_neighbors=rebalancing['m_neighbors'],
+                                     max_reference_rows=rebalancing['max_reference_rows'], n_jobs=rebalancing['n_jobs'],
+                                     random_state=random_state, trace_memory=rebalancing['trace_memory'])
+        self.feature_cols = [] # encoded features (without output column), learned from train data
+        self.report = {} # rows left after each train step
+
+    def fit_transform(self, data):
+        """
+            **Method Name:** fit_transform\n
+            **Description:** This method helps to learn every step from the train data & get the model input:
+                             remove the duplicates, handle the outliers, encode, scale, impute & rebalance\n
+            **Output:** data (encoded features & output column)\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data (raw, with output column)
+            :return: data
+        """
+        with pd.option_context('mode.copy_on_write', True):
+            self.report = {'rows': len(data)}
+            if self.deduplicate:
+                data = data.drop_duplicates()
+                self.report['deduplicate'] = len(data)
+            data = self.outliers.fit_transform(data=data, exclude_cols=[self.output_col])
+            self.report['outliers'] = len(data)
+            data = self.encoder.fit_transform(data=data)
+            if self.scaler is not None:
+                data = self.scaler.fit_transform(data=data, exclude_cols=[self.output_col])
+            self.feature_cols = [col for col in data.columns if col != self.output_col]
+            self.imputer.fit(data[self.feature_cols])
+            data = self.imputer.transform(data)
+            data = self.rebalancer.fit_resample(data=data, ycol=self.output_col)
+            self.report['rebalancer'] = len(data)
+            return data
+
+    def fit(self, data):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn every step from the train data\n
+            **Output:** fitted pipeline\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data (raw, with output column)
+            :return: fitted pipeline
+        """
+        self.fit_transform(data)
+        return self
+
+    def transform(self, data):
+        """
+            **Method Name:** transform\n
+            **Description:** This method helps to apply the fitted steps on the test/predection data: outliers policy
+                             (the rows are kept), encoding & scaling (fused) & imputation. The train only steps
+                             (deduplicate & rebalancer) are skipped, output column is optional\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: test or predection data (raw)
+            :return: data
+        """
+        if not self.feature_cols:
+            raise ValueError("PreprocessingPipeline is not fitted yet, call fit() first")
+        with pd.option_context('mode.copy_on_write', True):
+            data = self.outliers.transform(data=data)
+            data = self.encoder.transform(data=data, scaler=self.scaler)
+            return self.imputer.transform(data)
+
+    def TransformArray(self, data, cols, out=None):
+        """
+            **Method Name:** TransformArray\n
+            **Description:** This method helps to get the model input of the test/predection data as one float matrix,
+                             every column is written once in its slot (column index of cols): the encoded columns are
+                             gathered from the lookup tables, the numeric columns are copied, clipped & their zero
+                             values replaced in place, then scaled & imputed in place. No intermediate data frame is
+                             made, the values are the ones of transform (model input dtype). The knn imputer searches
+                             the neighbours on a float64 matrix (like transform), copied into the model input after\n
+            **Output:** float matrix (rows x cols, column-major, float32 or the scaler dtype)\n
+            **On Failure:** Raise Error.\n
+
+            :param data: test or predection data (raw)
+            :param cols: features (& order) of the model input
+            :param out: preallocated output matrix (optional, rows x cols)
+            :return: float matrix
+        """
+        if not self.feature_cols:
+            raise ValueError("PreprocessingPipeline is not fitted yet, call fit() first")
+        if out is None:
+            dtype = self.scaler.dtype if self.scaler is not None else np.float32 # the tree models predict on float32
+            out = np.empty((len(data), len(cols)), dtype=dtype, order='F') # one contiguous slot per column
+        values = out
+        if self.imputer.strategy == 'knn' and out.dtype != np.float64: # the neighbours are searched on the values of transform, not on the rounded model input
+            values = np.empty(out.shape, dtype=np.float64, order='F')
+        scaled_cols = set(self.scaler.cols) if self.scaler is not None else set()
+        for j, col in enumerate(cols):
+            slot = values[:, j]
+            if col == self.outliers.flag_col and self.outliers.policy == 'flag':
+                slot[:] = self.outliers.Mask(data).any(axis=1)
+            elif not self.encoder.EncodeColumn(data, col, out=slot): # label & mean encoding
+                if col not in data:
+                    raise ValueError(f"Column {col} is not in the data")
+                np.copyto(slot, data[col].to_numpy(), casting='unsafe') # numeric column
+                self.outliers.ClipArray(col, slot)
+                self.encoder.ReplaceZeroArray(col, slot)
+            if col in scaled_cols:
+                if slot.dtype == self.scaler.dtype:
+                    self.scaler.ScaleColumn(col, slot)
+                else: # scaled in the scaler dtype, like transform
+                    slot[:] = self.scaler.ScaleColumn(col, slot.astype(self.scaler.dtype))
+        values = self.imputer.TransformArray(values, list(cols))
+        if values is not out:
+            np.copyto(out, values, casting='unsafe')
+        return out
+
+    def Steps(self):
+        """
+            **Method Name:** Steps\n
+            **Description:** This method helps to get a compact text report of the fitted steps (for the logs)\n
+            **Output:** report\n
+            **On Failure:** Raise Error.\n
+
+            :return: report
+        """
+        return (f"outliers ({self.outliers.policy}) of {self.outliers.cols}, label encoding of {list(self.encoder.label_maps)}, "
+                f"mean encoding of {self.encoder.mean_encoding_cols}, zero values replaced in {self.encoder.replace_zero_values_cols}, "
+                f"scaling of {self.scaler.cols if self.scaler is not None else []}, {self.imputer.strategy} imputer, "
+                f"{self.rebalancer.strategy} rebalancing, rows: {self.report}")
+
+
+if __name__ == '__main__':
+    pass
@@ -1,8 +1,6 @@
-import pandas as pd
-import numpy as np
 from application_logs.logger import App_Logger
 import utils.common_utils as common_utils
-from sklearn.impute import KNNImputer
+from data_preprocessing.imputation import MissingValueImputer
 from sklearn.model_selection import train_test_split
 
 
@@ -31,7 +29,7 @@ class PreProcessing:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.cols = cols
             if self.cols is None:  # if you can't mention the column(s), then nothing happen
@@ -45,7 +43,7 @@ class PreProcessing:
                 return self.data  # return data after drop column/ columns
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -62,7 +60,7 @@ class PreProcessing:
             :return: X, Y
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.output_col = ycol
             self.X = self.data.drop(axis=1, columns=self.output_col)  # separate the features columns
@@ -72,33 +70,45 @@ class PreProcessing:
             return self.X, self.Y  # return the features & output or label column(s)
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
 
-    def ImputeMissingValues(self, data):
+    def ImputeMissingValues(self, data, imputer=None):
         """
             **Method Name:** ImputeMissingValues\n
-            **Description:** This method replaces all the missing values in the Dataframe using KNN Imputer.\n
+            **Description:** This method replaces all the missing values in the Dataframe. If imputer is not given,
+                             a new imputer (strategy from params.yaml) is fitted on the data (train data), and kept in
+                             self.imputer; pass the fitted imputer to impute the test/predection data with train
+                             statistics.\n
             **Output:** data\n
             **On Failure:** Raise Error.\n
 
             :param data: train.csv or test.csv
+            :param imputer: fitted imputer (optional)
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
-            self.imputer = KNNImputer(n_neighbors=3, weights='uniform', missing_values=np.nan) # impute the missing value with KNNImputer
-            self.new_data = self.imputer.fit_transform(self.data)
-            self.new_data = pd.DataFrame(self.new_data, columns=self.data.columns)
-            self.logger.log(self.file, "Impute the missing values with KNNImputer")
+            if imputer is None:
+                self.imputation = self.config['preProcessing']['imputation'] # get the imputation details
+                self.imputer = MissingValueImputer(strategy=self.imputation['strategy'], group_col=self.imputation['group_col'],
+                                                   n_neighbors=self.imputation['n_neighbors'], chunk_size=self.imputation['chunk_size'],
+                                                   max_reference_rows=self.imputation['max_reference_rows'],
+                                                   random_state=self.config['base']['random_state'])
+                self.imputer.fit(self.data) # learn the imputation statistics
+                self.logger.log(self.file, f"Fit the {self.imputer.strategy} imputer")
+            else:
+                self.imputer = imputer
+            self.new_data = self.imputer.transform(self.data) # impute only the columns where missing values are present
+            self.logger.log(self.file, f"Impute the missing values with {self.imputer.strategy} imputer")
             self.file.close()
             return self.new_data  # return data where no missing values are present
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -114,7 +124,7 @@ class PreProcessing:
             :return: columns
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.data_describe = self.data.describe()
             self.droping_cols = []
@@ -130,7 +140,7 @@ class PreProcessing:
             return self.droping_cols  # return the columns, if you want you can drop those columns.
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -147,7 +157,7 @@ class PreProcessing:
             :return: x_train, x_test, y_train, y_test
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.X = X
             self.Y = Y
             self.test_size = self.config['base']['test_size']
@@ -158,7 +168,7 @@ class PreProcessing:
             return x_train, x_test, y_train, y_test
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
\ No newline at end of file
@@ -0,0 +1,158 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+from imblearn.over_sampling import SMOTE, BorderlineSMOTE, RandomOverSampler
+from imblearn.under_sampling import RandomUnderSampler
+
+
+class SampledNearestNeighbors(NearestNeighbors):
+    """
+        This class shall be used as an approximate neighbours backend for the SMOTE variants: the neighbours are searched
+        in a random sample of at most max_reference_rows fitted rows (the returned indices point to the fitted rows),
+        so the search cost doesn't grow with the train data.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, n_neighbors=5, max_reference_rows=20000, random_state=None, n_jobs=None):
+        super().__init__(n_neighbors=n_neighbors, n_jobs=n_jobs)
+        self.max_reference_rows = max_reference_rows
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        X = np.asarray(X)
+        self.sample_index_ = np.arange(len(X)) if len(X) <= self.max_reference_rows else \
+            np.sort(np.random.RandomState(self.random_state).choice(len(X), size=self.max_reference_rows, replace=False))
+        return super().fit(X[self.sample_index_])
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        result = super().kneighbors(X, n_neighbors=n_neighbors, return_distance=return_distance)
+        if return_distance:
+            distances, indices = result
+            return distances, self.sample_index_[indices]
+        return self.sample_index_[result]
+
+
+class Rebalancer:
+    """
+        This class shall be used to rebalance the classes of the train data with a selectable strategy, the time
+        (& the tracemalloc peak memory if trace_memory, it slows the run down) of each run are kept in report.\n
+        strategy:\n
+            none: the data is returned as it is.\n
+            class_weight: the data is returned as it is, the balanced class weights are passed to the models.\n
+            random_over: the minority rows are repeated at random.\n
+            random_under: the majority rows are dropped at random.\n
+            smote: synthetic minority rows between the nearest minority neighbours.\n
+            borderline_smote: synthetic rows only for the minority rows close to the border (Borderline-SMOTE-1).\n
+        neighbors (SMOTE variants): exact (all the rows, n_jobs threads) or approximate (a random sample of
+        max_reference_rows rows, see SampledNearestNeighbors).\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    strategies = ('none', 'class_weight', 'random_over', 'random_under', 'smote', 'borderline_smote')
+    neighbor_backends = ('exact', 'approximate')
+
+    def __init__(self, strategy='borderline_smote', neighbors='exact', k_neighbors=5, m_neighbors=10, max_reference_rows=20000,
+                 n_jobs=None, random_state=42, trace_memory=False):
+        if strategy not in self.strategies:
+            raise ValueError(f"Unknown rebalancing strategy {strategy}, use one of {self.strategies}")
+        if neighbors not in self.neighbor_backends:
+            raise ValueError(f"Unknown neighbors backend {neighbors}, use one of {self.neighbor_backends}")
+        self.strategy = strategy
+        self.neighbors = neighbors
+        self.k_neighbors = k_neighbors
+        self.m_neighbors = m_neighbors
+        self.max_reference_rows = max_reference_rows
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.trace_memory = trace_memory # True: measure the peak memory with tracemalloc (benchmarks)
+        self.class_weights = None # {class: weight}, class_weight strategy
+        self.report = {} # time, peak memory & class counts of the last run
+
+    @staticmethod
+    def ClassWeights(y):
+        """
+            **Method Name:** ClassWeights\n
+            **Description:** This method helps to get the balanced class weights, n_rows / (n_classes * class count)\n
+            **Output:** {class: weight}\n
+            **On Failure:** Raise Error.\n
+
+            :param y: output column
+            :return: {class: weight}
+        """
+        counts = pd.Series(y).value_counts(sort=False)
+        return {cls.item() if hasattr(cls, 'item') else cls: float(len(y) / (len(counts) * count)) for cls, count in counts.items()}
+
+    def GetNeighbors(self, n_neighbors):
+        """
+            **Method Name:** GetNeighbors\n
+            **Description:** This method helps to create the neighbours search of the SMOTE variants\n
+            **Output:** neighbours estimator\n
+            **On Failure:** Raise Error.\n
+
+            :param n_neighbors: no of neighbours (the row itself included)
+            :return: neighbours estimator
+        """
+        if self.neighbors == 'approximate':
+            return SampledNearestNeighbors(n_neighbors=n_neighbors, max_reference_rows=self.max_reference_rows,
+                                           random_state=self.random_state, n_jobs=self.n_jobs)
+        return NearestNeighbors(n_neighbors=n_neighbors, n_jobs=self.n_jobs)
+
+    def GetSampler(self):
+        """
+            **Method Name:** GetSampler\n
+            **Description:** This method helps to create the imbalanced-learn sampler of the strategy\n
+            **Output:** sampler (None for none & class_weight)\n
+            **On Failure:** Raise Error.\n
+
+            :return: sampler
+        """
+        if self.strategy == 'random_over':
+            return RandomOverSampler(random_state=self.random_state)
+        if self.strategy == 'random_under':
+            return RandomUnderSampler(random_state=self.random_state)
+        if self.strategy == 'smote':
+            return SMOTE(random_state=self.random_state, k_neighbors=self.GetNeighbors(self.k_neighbors + 1))
+        if self.strategy == 'borderline_smote':
+            return BorderlineSMOTE(random_state=self.random_state, kind='borderline-1', k_neighbors=self.GetNeighbors(self.k_neighbors + 1),
+                                   m_neighbors=self.GetNeighbors(self.m_neighbors + 1))
+        return None
+
+    def fit_resample(self, data, ycol:str):
+        """
+            **Method Name:** fit_resample\n
+            **Description:** This method helps to rebalance the train data & report the time (& the peak memory, if
+                             trace_memory)\n
+            **Output:** data (after rebalance)\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data (encoded features & output column)
+            :param ycol: output column
+            :return: data
+        """
+        tracing = tracemalloc.is_tracing() # don't stop an outer trace
+        if self.trace_memory:
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        peak = None
+        start = time.perf_counter()
+        try:
+            counts_before = data[ycol].value_counts().to_dict()
+            self.class_weights = self.ClassWeights(data[ycol]) if self.strategy == 'class_weight' else None
+            sampler = self.GetSampler()
+            if sampler is not None:
+                x, y = sampler.fit_resample(data.drop(columns=[ycol]), data[ycol])
+                data = x.assign(**{ycol: np.asarray(y)})
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+        finally:
+            if self.trace_memory and not tracing:
+                tracemalloc.stop()
+        self.report = {'strategy': self.strategy, 'neighbors': self.neighbors, 'seconds': round(time.perf_counter() - start, 3),
+                       'peak_memory_mb': round(peak / 1024 ** 2, 1) if peak is not None else None, 'rows': len(data), 'class_counts_before': counts_before,
+                       'class_counts_after': data[ycol].value_counts().to_dict(), 'class_weights': self.class_weights}
+        return data
@@ -1,7 +1,42 @@
+import os
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 import utils.common_utils as common_utils
 from application_logs.logger import App_Logger
 from ml_model_creation.modelCreation import ModelCreation
-from sklearn.metrics import roc_auc_score, accuracy_score
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score, accuracy_score, roc_curve
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+
+# candidate name (in params.yaml) -> (model name, ModelCreation method, model directory key, model path key)
+CANDIDATES = {
+    'xgboost': ('XGBoost', 'ApplyXGBoost', 'xgboost_dir', 'xgboost_path'),
+    'random_forest': ('RandomForest', 'ApplyRandomForest', 'random_forest_dir', 'random_forest_path'),
+}
+
+
+def FitCandidate(config_path, candidate, x_train, y_train, x_test, y_test, n_jobs, class_weights=None):
+    """
+        **Method Name:** FitCandidate\n
+        **Description:** This method helps to train one candidate model & score it on the test data, the AUC is
+                         computed on the positive class probabilities (predict_proba).
+                         It is a module level function, so it can run in a worker process.\n
+        **Output:** model name, model, score, metric name\n
+        **On Failure:** Raise Error.\n
+
+        :param config_path: params.yaml file
+        :param candidate: candidate name, like xgboost, random_forest
+        :param n_jobs: number of threads for this candidate
+        :param class_weights: {class: weight} passed to the model (None: no class weights)
+        :return: model name, model, score, metric name
+    """
+    model_name, method, _, _ = CANDIDATES[candidate]
+    model = getattr(ModelCreation(config_path=config_path), method)(x_train=x_train, y_train=y_train, n_jobs=n_jobs, class_weights=class_weights) # train the model
+    if len(y_test.unique()) == 1:  # if there is only one label in y, then roc_auc_score returns error. We will use accuracy in that case
+        return model_name, model, accuracy_score(y_test, model.predict(x_test)), 'Accuracy'
+    return model_name, model, roc_auc_score(y_test, model.predict_proba(x_test)[:, -1]), 'AUC' # probability of the positive class
 
 
 class FindBestModel:
@@ -12,67 +47,123 @@ class FindBestModel:
         Version: 0.0.1\n\n
     """
     def __init__(self, config_path: str):
+        self.config_path = config_path # the worker processes read the params themselves
         self.config = common_utils.read_params(config_path)  # read the information from params.yaml file as dict form
         self.file_path = self.config['execution_logs']['training']['log_files']['find_best_model']  # this file path help to log the details
         self.logger = App_Logger()  # call the App_Logger() to log the details
         self.model = ModelCreation(config_path=config_path) # get the model
 
-    def GetBestModel(self, x_train, y_train, x_test, y_test):
+    def GetThreadBudget(self, n_parallel:int):
+        """
+            **Method Name:** GetThreadBudget\n
+            **Description:** This method helps to split the threads budget across the candidates trained in parallel,
+                             so the models don't oversubscribe the cores\n
+            **Output:** number of threads per candidate\n
+            **On Failure:** Raise Error.\n
+
+            :param n_parallel: number of candidates trained in parallel
+            :return: number of threads per candidate
+        """
+        n_jobs = self.config['model_selection']['n_jobs'] # total threads budget
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = os.cpu_count() or 1 # use all the cores
+        return max(1, n_jobs // n_parallel)
+
+    def GetDecisionThreshold(self, model, x_train, y_train, class_weights=None):
+        """
+            **Method Name:** GetDecisionThreshold\n
+            **Description:** This method helps to get the decision threshold (positive if probability >= threshold),
+                             a number in params.yaml or youden: the threshold maximizing tpr - fpr on the out-of-fold
+                             probabilities of the train data (the test data stays for the evaluation only)\n
+            **Output:** decision threshold\n
+            **On Failure:** Raise Error.\n
+
+            :param model: best model (cloned & refitted on every fold)
+            :param x_train: x_train
+            :param y_train: y_train
+            :param class_weights: {class: weight} of the best model (XGBoost gets them as sample weights on every fold)
+            :return: decision threshold
+        """
+        threshold = self.config['model_selection']['decision_threshold']
+        if threshold != 'youden':
+            return float(threshold)
+        if len(np.unique(y_train)) == 1: # no roc curve with one label
+            return 0.5
+        folds = StratifiedKFold(n_splits=self.config['model_selection']['threshold_folds'], shuffle=True,
+                                random_state=self.config['base']['random_state'])
+        fit_params = {'sample_weight': np.array([class_weights[label] for label in y_train])} \
+            if class_weights and hasattr(model, 'get_booster') else None # RandomForest keeps its class_weight param in the clone
+        proba = cross_val_predict(clone(model), x_train, y_train, cv=folds, method='predict_proba', params=fit_params)[:, -1] # out-of-fold probabilities
+        fpr, tpr, thresholds = roc_curve(y_train, proba)
+        return float(min(thresholds[np.argmax(tpr - fpr)], 1.0)) # the first roc threshold is +inf
+
+    def SaveBestModel(self, model_name:str, model, decision_threshold:float=0.5):
+        """
+            **Method Name:** SaveBestModel\n
+            **Description:** This method helps to save the best model & its decision threshold in model directory,
+                             the models saved by the previous trainings (for the other candidates) are removed\n
+            **Output:** None\n
+            **On Failure:** Raise Error.\n
+
+            :param model_name: best model name, like XGBoost, RandomForest
+            :param model: best model
+            :param decision_threshold: positive if probability >= decision threshold
+            :return: None
+        """
+        for candidate_name, _, model_dir_key, model_path_key in CANDIDATES.values():
+            common_utils.clean_prev_dirs_if_exis(dir_path=self.config['model'][model_dir_key])
+            if candidate_name == model_name:
+                common_utils.create_dir(dirs=[self.config['model'][model_dir_key]]) # create the model directory
+                common_utils.save_model(model=model, model_path=self.config['model'][model_path_key])  # save the model
+        with open(self.config['model']['decision_threshold_path'], 'w') as f:
+            json.dump({'model_name': model_name, 'decision_threshold': decision_threshold}, f) # used by the inference engine
+
+    def GetBestModel(self, x_train, y_train, x_test, y_test, class_weights=None):
         """
             **Method Name:** GetBestModel\n
-            **Description:** This method helps to get the best model\n
-            **Output:** best model\n
+            **Description:** This method helps to get the best model. All the configured candidates are trained
+                             concurrently in a process pool, only the best model is saved.\n
+            **Output:** best model name, best model, decision threshold\n
             **On Failure:** Raise Error.\n
 
             :param x_train: x_train
             :param y_train: y_train
             :param x_test: x_test
             :param y_test: y_test
-            :return: best model
+            :param class_weights: {class: weight} passed to the candidates (class_weight rebalancing strategy)
+            :return: best model name, best model, decision threshold
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.x_train, self.y_train, self.x_test, self.y_test = x_train, y_train, x_test, y_test
-            # For XGBoost Classifier:
-            self.xgb = self.model.ApplyXGBoost(x_train=self.x_train, y_train=self.y_train) # get the xgboost model
-            self.prediction_xgboost = self.xgb.predict(self.x_test)  # Predictions using the XGBoost Model
-            if len(self.y_test.unique()) == 1:  # if there is only one label in y, then roc_auc_score returns error. We will use accuracy in that case
-                self.xgboost_score = accuracy_score(self.y_test, self.prediction_xgboost)
-                self.logger.log(self.file, 'Accuracy for XGBoost:' + str(self.xgboost_score))  # Log AUC
-            else:
-                self.xgboost_score = roc_auc_score(self.y_test, self.prediction_xgboost)  # AUC for XGBoost
-                self.logger.log(self.file, 'AUC for XGBoost:' + str(self.xgboost_score))  # Log AUC
-
-            # For RandomForest Classifier:
-            self.ran = self.model.ApplyRandomForest(x_train=self.x_train, y_train=self.y_train) # get the random forest model
-            self.prediction_random_forest = self.ran.predict(self.x_test)  # prediction using the Random Forest Algorithm
-            if len(self.y_test.unique()) == 1:  # if there is only one label in y, then roc_auc_score returns error. We will use accuracy in that case
-                self.random_forest_score = accuracy_score(self.y_test, self.prediction_random_forest)
-                self.logger.log(self.file, 'Accuracy for RF:' + str(self.random_forest_score))
-            else:
-                self.random_forest_score = roc_auc_score(self.y_test, self.prediction_random_forest)  # AUC for Random Forest
-                self.logger.log(self.file, 'AUC for RF:' + str(self.random_forest_score))
-
-            # Comparing the two models:
-            if (self.random_forest_score < self.xgboost_score):
-                self.xgboost_dir = self.config['model']['xgboost_dir'] # mention the directory
-                self.xgboost_path = self.config['model']['xgboost_path'] # mention the model path
-                common_utils.create_dir(dirs=[self.xgboost_dir]) # create the xgboost directory
-                common_utils.save_model(model=self.xgb, model_path=self.xgboost_path)  # save the model
-                self.logger.log(self.file, "XGBoost is the best model & save the model in model directory")
-                self.file.close()
-                return 'XGBoost', self.xgb
+            self.candidates = self.config['model_selection']['candidates'] # get the candidates, like xgboost, random_forest
+            self.n_workers = min(self.config['model_selection']['n_workers'], len(self.candidates)) # number of worker processes
+            self.n_jobs = self.GetThreadBudget(n_parallel=self.n_workers) # threads per candidate
+            self.logger.log(self.file, f"Train the candidates {self.candidates} with {self.n_workers} worker(s), {self.n_jobs} thread(s) each")
+
+            args = [(self.config_path, candidate, self.x_train, self.y_train, self.x_test, self.y_test, self.n_jobs, class_weights)
+                    for candidate in self.candidates]
+            if self.n_workers > 1:
+                with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                    self.results = list(executor.map(FitCandidate, *zip(*args))) # train the candidates concurrently
             else:
-                self.random_forest_dir = self.config['model']['random_forest_dir']  # mention the directory
-                self.random_forest_path = self.config['model']['random_forest_path']  # mention the model path
-                common_utils.create_dir(dirs=[self.random_forest_dir])  # create the xgboost directory
-                common_utils.save_model(model=self.ran, model_path=self.random_forest_path)  # save the model
-                self.logger.log(self.file, "RandomForest is the best model & save the model in model directory")
-                self.file.close()
-                return 'RandomForest', self.ran
+                self.results = [FitCandidate(*arg) for arg in args] # train the candidates one after another
+
+            self.best_model_name, self.best_model, self.best_score = None, None, None
+            for self.model_name, self.candidate_model, self.score, self.metric in self.results:
+                self.logger.log(self.file, f'{self.metric} for {self.model_name}: {self.score}')  # Log AUC/Accuracy
+                if self.best_score is None or self.score >= self.best_score: # on a tie, the later candidate wins
+                    self.best_model_name, self.best_model, self.best_score = self.model_name, self.candidate_model, self.score
+
+            self.decision_threshold = self.GetDecisionThreshold(model=self.best_model, x_train=self.x_train, y_train=self.y_train,
+                                                                class_weights=class_weights) # positive if probability >= threshold
+            self.SaveBestModel(model_name=self.best_model_name, model=self.best_model, decision_threshold=self.decision_threshold) # save only the best model
+            self.logger.log(self.file, f"{self.best_model_name} is the best model & save the model in model directory, decision threshold: {self.decision_threshold}")
+            self.file.close()
+            return self.best_model_name, self.best_model, self.decision_threshold
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
-            raise ex
\ No newline at end of file
+            raise ex
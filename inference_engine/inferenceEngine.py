@@ -0,0 +1,245 @@
+import os
+import json
+import numpy as np
+import utils.common_utils as common_utils
+from inference_engine import mappedArtifacts
+from utils.schema_contract import SchemaContract
+from application_logs.logger import App_Logger
+
+
+class InferenceEngine:
+    """
+        This class shall be used to keep the trained model & the fitted preprocessing artifacts in memory,
+        and predict the outcome for repeated calls.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, config_path:str):
+        self.config = common_utils.read_params(config_path)  # read the information from params.yaml file as dict form
+        self.file_path = self.config['execution_logs']['predection']['log_files']['predection_logs']  # this file path help to log the details
+        self.logger = App_Logger()  # call the App_Logger() to log the details
+        self.LoadArtifacts() # load the model & artifacts only once
+
+    def LoadArtifacts(self):
+        """
+            **Method Name:** LoadArtifacts\n
+            **Description:** This method helps to load the model & the fitted preprocessing artifacts from model directory.
+                             Call it again to pick up a newly trained model.\n
+            **Output:** None\n
+            **On Failure:** Raise Error.\n
+
+            :return: None
+        """
+        try:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.artifact_format = self.config['inference']['artifact_format'] # mmap or pickle
+            self.mmap_dir = self.config['inference']['mmap_dir'] # memory-mapped export directory
+            self.backend = self.config['inference']['backend'] # RandomForest inference backend, vectorized or sklearn
+            self.model_dir = self.config['model']['model_dir'] # mention the model directory
+            self.pipeline_path = self.config['model']['pipeline_path'] # mention the fitted pipeline path
+            if self.artifact_format == 'mmap' and os.path.isfile(os.path.join(self.mmap_dir, 'meta.json')):
+                self.model, self.pipeline = mappedArtifacts.LoadArtifacts(export_dir=self.mmap_dir) # shared pages, the lookup tables are not unpickled
+                if self.backend == 'sklearn' and isinstance(self.model, mappedArtifacts.FlatForest):
+                    self.model = common_utils.load_model(model_path=self.model_dir) # the pickled estimator
+            else: # pickled artifacts (or no export yet)
+                self.artifact_format = 'pickle'
+                self.CheckArtifacts(paths=[self.pipeline_path]) # a fresh checkout has no trained artifacts
+                self.pipeline = common_utils.load_model_file(model_path=self.pipeline_path) # load the fitted preprocessing pipeline (outliers, encoding, scaling & imputation)
+                self.model = common_utils.load_model(model_path=self.model_dir) # load the best model
+            if self.backend == 'vectorized' and hasattr(self.model, 'estimators_') and not hasattr(self.model, 'get_booster'):
+                self.model = mappedArtifacts.FlatForest.FromRandomForest(model=self.model) # RandomForest as flattened node arrays
+            self.features_transformer = self.pipeline.encoder # fitted encoders (input columns & vocabularies)
+            self.transform_mode = self.config['inference']['transform'] # array or frame
+            if hasattr(self.model, 'estimators_'): # the scikit-learn estimator checks the features names of a data frame
+                self.transform_mode = 'frame'
+            self.schema_path = self.config['model']['schema_path'] # mention the schema contract path
+            self.schema = SchemaContract.Load(schema_path=self.schema_path) if os.path.isfile(self.schema_path) else None # model trained without it
+            self.feature_cols = self.GetFeatureColumns() # the columns (& order) used to train the model
+            self.decision_threshold = self.GetDecisionThreshold() # positive if probability >= decision threshold
+            self.logger.log(self.file, f"Load the model {type(self.model).__name__} ({self.artifact_format}, {self.backend} backend, {self.transform_mode} transform), preprocessing pipeline ({self.pipeline.Steps()}), decision threshold: {self.decision_threshold}, features: {self.feature_cols}") # logs the details
+            self.file.close()
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+    def CheckArtifacts(self, paths):
+        """
+            **Method Name:** CheckArtifacts\n
+            **Description:** This method helps to check the fitted artifacts are present, the model & the artifacts are
+                             written by the training\n
+            **Output:** None\n
+            **On Failure:** Raise FileNotFoundError.\n
+
+            :param paths: artifact paths
+            :return: None
+        """
+        missing = [path for path in paths if not os.path.isfile(path)]
+        if missing:
+            raise FileNotFoundError(f"The trained artifacts {missing} are not found, run the training first (python main.py)")
+
+    def GetFeatureColumns(self):
+        """
+            **Method Name:** GetFeatureColumns\n
+            **Description:** This method helps to get the features names the model was trained on\n
+            **Output:** list of columns\n
+            **On Failure:** Raise Error.\n
+
+            :return: list of columns
+        """
+        if hasattr(self.model, 'feature_names_in_'): # scikit-learn style estimators (RandomForest, XGBoost sklearn API)
+            return list(self.model.feature_names_in_)
+        if hasattr(self.model, 'get_booster'): # older XGBoost versions
+            return list(self.model.get_booster().feature_names)
+        raise ValueError(f"Can't get the feature names from model {type(self.model).__name__}")
+
+    def GetDecisionThreshold(self):
+        """
+            **Method Name:** GetDecisionThreshold\n
+            **Description:** This method helps to get the decision threshold saved with the best model
+                             (0.5 for a model trained without it)\n
+            **Output:** decision threshold\n
+            **On Failure:** Raise Error.\n
+
+            :return: decision threshold
+        """
+        threshold_path = self.config['model']['decision_threshold_path']
+        if not os.path.isfile(threshold_path):
+            return 0.5
+        with open(threshold_path) as f:
+            return float(json.load(f)['decision_threshold'])
+
+    def CategoricalDtypes(self):
+        """
+            **Method Name:** CategoricalDtypes\n
+            **Description:** This method helps to get the read dtypes of the encoded string columns (category). The
+                             categories are the values of each batch, so the unknown values are still seen by the schema
+                             contract, the encoders recode them to the train vocabulary once per category\n
+            **Output:** {column: 'category'}\n
+            **On Failure:** Raise Error.\n
+
+            :return: {column: 'category'}
+        """
+        return {col: 'category' for col in self.features_transformer.Vocabularies()}
+
+    def Validate(self, data):
+        """
+            **Method Name:** Validate\n
+            **Description:** This method helps to check the raw data against the schema contract of the train data,
+                             the rejected rows are returned with the reason instead of failing the whole batch\n
+            **Output:** valid rows, rejected rows (with the reject_reason column)\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data
+            :return: valid rows, rejected rows
+        """
+        if self.schema is None: # model trained without a schema contract, nothing is rejected
+            return data, data.iloc[:0].assign(**{SchemaContract.reason_col: []})
+        return self.schema.Validate(data)
+
+    def transform(self, data):
+        """
+            **Method Name:** transform\n
+            **Description:** This method helps to convert the raw data to the model input using the fitted artifacts\n
+            **Output:** features\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data (same columns as DATA/adult_new.csv, output column is optional)
+            :return: features
+        """
+        return self.pipeline.transform(data)[self.feature_cols] # outliers, encoding & scaling (fused) & imputation
+
+    def Features(self, data):
+        """
+            **Method Name:** Features\n
+            **Description:** This method helps to get the model input for raw data, one preallocated float matrix
+                             (array transform, see PreprocessingPipeline.TransformArray) or the transformed data frame\n
+            **Output:** features\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data
+            :return: features
+        """
+        if self.transform_mode == 'array':
+            return self.pipeline.TransformArray(data, cols=self.feature_cols) # no intermediate data frame
+        return self.transform(data)
+
+    def predict(self, data):
+        """
+            **Method Name:** predict\n
+            **Description:** This method helps to predict the outcome for raw data, positive if the positive class
+                             probability >= decision threshold\n
+            **Output:** predicted outcome\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data
+            :return: predicted outcome
+        """
+        return self.ApplyThreshold(proba=self.predict_proba(data)[:, -1])
+
+    def predict_proba(self, data):
+        """
+            **Method Name:** predict_proba\n
+            **Description:** This method helps to predict the class probabilities for raw data\n
+            **Output:** class probabilities\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data
+            :return: class probabilities
+        """
+        return self.model.predict_proba(self.Features(data))
+
+    def Score(self, data, include_proba=False):
+        """
+            **Method Name:** Score\n
+            **Description:** This method helps to get the output columns for raw data, the model is called once\n
+            **Output:** {"outcome": predicted outcome, "outcome_proba": positive class probability (optional)}\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data
+            :param include_proba: add the positive class probability
+            :return: output columns
+        """
+        features = self.Features(data) if len(data) > 0 else data # an empty batch isn't transformed
+        return self.ScoreFeatures(features=features, include_proba=include_proba)
+
+    def ScoreFeatures(self, features, include_proba=False):
+        """
+            **Method Name:** ScoreFeatures\n
+            **Description:** This method helps to get the output columns for transformed features\n
+            **Output:** {"outcome": predicted outcome, "outcome_proba": positive class probability (optional)}\n
+            **On Failure:** Raise Error.\n
+
+            :param features: model input (see Features)
+            :param include_proba: add the positive class probability
+            :return: output columns
+        """
+        if len(features) == 0: # every row of the batch is rejected
+            proba = np.empty(0)
+        else:
+            proba = self.model.predict_proba(features)[:, -1] # probability of the positive class
+        columns = {'outcome': self.ApplyThreshold(proba=proba)}
+        if include_proba:
+            columns['outcome_proba'] = proba
+        return columns
+
+    def ApplyThreshold(self, proba):
+        """
+            **Method Name:** ApplyThreshold\n
+            **Description:** This method helps to convert the positive class probabilities to the outcome\n
+            **Output:** predicted outcome\n
+            **On Failure:** Raise ValueError, if the model is not a binary classifier.\n
+
+            :param proba: positive class probabilities
+            :return: predicted outcome
+        """
+        if len(self.model.classes_) != 2:
+            raise ValueError(f"The decision threshold needs a binary model, the model has the classes {list(self.model.classes_)}")
+        return np.asarray(self.model.classes_).take((np.asarray(proba) >= self.decision_threshold).astype(int))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,244 @@
+import os
+import copy
+import json
+import numpy as np
+import pandas as pd
+import utils.common_utils as common_utils
+
+
+class FlatForest:
+    """
+        This class shall be used to predict with a RandomForest stored as flattened node arrays (all the trees
+        concatenated). All the trees are walked together for a block of rows with vectorized numpy gathers, the leaves
+        point to themselves so the walk needs no masks. The arrays can be memory-mapped, so the worker processes share
+        the same pages.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    ARRAYS = ['children', 'feature', 'threshold', 'value', 'tree_offsets', 'max_depth']
+    BLOCK_SIZE = 1024 # rows walked together (the node matrix is trees x rows)
+
+    def __init__(self, arrays:dict, classes, feature_names):
+        self.children = arrays['children'] # (n_nodes, 2) global node index of the left & right child (the node itself for a leaf)
+        self.feature = arrays['feature'] # split feature of each node (0 for a leaf)
+        self.threshold = arrays['threshold'] # float32 split threshold of each node (go left if x <= threshold)
+        self.value = arrays['value'] # class probabilities of each node (n_nodes, n_classes)
+        self.tree_offsets = arrays['tree_offsets'] # root node index of each tree, followed by the total no of nodes
+        self.max_depth = int(np.asarray(arrays['max_depth']).reshape(-1)[0]) # depth of the deepest tree (no of levels to walk)
+        self.classes_ = np.asarray(classes)
+        if feature_names is not None: # like scikit-learn, no feature_names_in_ when the forest is fitted on an array
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_estimators = len(self.tree_offsets) - 1
+
+    @classmethod
+    def FromRandomForest(cls, model):
+        """
+            **Method Name:** FromRandomForest\n
+            **Description:** This method helps to flatten the trees of a fitted RandomForestClassifier\n
+            **Output:** FlatForest\n
+            **On Failure:** Raise Error.\n
+
+            :param model: fitted RandomForestClassifier
+            :return: FlatForest
+        """
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        def shift(children, offset): # local -> global node index, a leaf points to itself
+            return np.where(children >= 0, children, np.arange(len(children))) + offset
+        threshold = np.concatenate([tree.threshold for tree in trees])
+        threshold32 = threshold.astype(np.float32)
+        threshold32 = np.where(threshold32 > threshold, np.nextafter(threshold32, np.float32(-np.inf)), threshold32) # largest float32 <= threshold,
+        # so (float32 x <= threshold32) == (float32 x <= threshold), the comparison done by scikit-learn
+        arrays = {
+            'children': np.concatenate([np.stack([shift(tree.children_left, offset), shift(tree.children_right, offset)], axis=1)
+                                        for tree, offset in zip(trees, offsets)]).astype(np.int32),
+            'feature': np.concatenate([np.maximum(tree.feature, 0) for tree in trees]).astype(np.int32), # any valid column for a leaf
+            'threshold': threshold32,
+            'value': np.concatenate([tree.value[:, 0, :model.n_classes_] for tree in trees]),
+            'tree_offsets': offsets.astype(np.int32),
+            'max_depth': np.array([max(tree.max_depth for tree in trees)]),
+        }
+        return cls(arrays=arrays, classes=model.classes_, feature_names=getattr(model, 'feature_names_in_', None))
+
+    def Save(self, export_dir:str):
+        """
+            **Method Name:** Save\n
+            **Description:** This method helps to save the node arrays as .npy files (memory-mappable)\n
+            **Output:** None\n
+            **On Failure:** Raise Error.\n
+
+            :param export_dir: artifacts directory
+            :return: None
+        """
+        for name in self.ARRAYS:
+            np.save(os.path.join(export_dir, f"forest_{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+
+    @classmethod
+    def Load(cls, export_dir:str, classes, feature_names):
+        """
+            **Method Name:** Load\n
+            **Description:** This method helps to memory-map the node arrays (read only)\n
+            **Output:** FlatForest\n
+            **On Failure:** Raise Error.\n
+
+            :param export_dir: artifacts directory
+            :param classes: class labels
+            :param feature_names: features names, in the training order
+            :return: FlatForest
+        """
+        arrays = {name: np.load(os.path.join(export_dir, f"forest_{name}.npy"), mmap_mode='r') for name in cls.ARRAYS}
+        return cls(arrays=arrays, classes=classes, feature_names=feature_names)
+
+    def predict_proba(self, x):
+        """
+            **Method Name:** predict_proba\n
+            **Description:** This method helps to predict the class probabilities block by block (same float32 comparison
+                             & same tree order summation as scikit-learn, so the result is exactly equal)\n
+            **Output:** class probabilities\n
+            **On Failure:** Raise Error.\n
+
+            :param x: features (same columns as the training data)
+            :return: class probabilities
+        """
+        x = np.asarray(x, dtype=np.float32)
+        proba = np.empty((len(x), self.value.shape[1]))
+        for start in range(0, len(x), self.BLOCK_SIZE):
+            proba[start:start + self.BLOCK_SIZE] = self._PredictBlock(x[start:start + self.BLOCK_SIZE])
+        return proba
+
+    def _PredictBlock(self, x):
+        """
+            walk all the trees together for a block of rows (max_depth levels, the rows in a leaf stay there),
+            the gathers use the flattened transposed block & int32 indices
+        """
+        n_rows = len(x)
+        x = np.ascontiguousarray(x.T).ravel() # feature major, x[feature * n_rows + row]
+        feature_offsets = self.feature * np.int32(n_rows)
+        children = self.children.reshape(-1) # left child at 2 * node, right child at 2 * node + 1
+        rows = np.arange(n_rows, dtype=np.int32)[None, :]
+        node = np.repeat(np.asarray(self.tree_offsets[:-1])[:, None], n_rows, axis=1) # (trees, rows), start at the roots
+        for _ in range(self.max_depth):
+            go_left = np.take(x, np.take(feature_offsets, node) + rows) <= np.take(self.threshold, node)
+            node = np.take(children, 2 * node + 1 - go_left)
+        return np.take(self.value, node, axis=0).sum(axis=0) / self.n_estimators # the trees are added in order, like scikit-learn
+
+    def predict(self, x):
+        """
+            **Method Name:** predict\n
+            **Description:** This method helps to predict the class labels\n
+            **Output:** predicted outcome\n
+            **On Failure:** Raise Error.\n
+
+            :param x: features
+            :return: predicted outcome
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(x), axis=1))
+
+
+def SaveTables(tables:dict, export_dir:str, prefix:str):
+    """
+        **Method Name:** SaveTables\n
+        **Description:** This method helps to save the lookup tables ({column: Series or dict of key -> value}) as key &
+                         value .npy files\n
+        **On Failure:** Raise Error.\n
+
+        :param tables: lookup tables
+        :param export_dir: artifacts directory
+        :param prefix: file name prefix
+        :return: list of columns
+    """
+    for i, (col, table) in enumerate(tables.items()):
+        table = pd.Series(table) if isinstance(table, dict) else table
+        keys = np.asarray(table.index.tolist())
+        if keys.dtype == object:
+            raise ValueError(f"lookup table of {col} has mixed key types, can't be memory-mapped")
+        np.save(os.path.join(export_dir, f"{prefix}_{i}_keys.npy"), keys)
+        np.save(os.path.join(export_dir, f"{prefix}_{i}_values.npy"), table.to_numpy())
+    return list(tables)
+
+
+def LoadTables(cols:list, export_dir:str, prefix:str):
+    """
+        **Method Name:** LoadTables\n
+        **Description:** This method helps to memory-map the lookup tables, as pandas Series (key -> value)\n
+        **On Failure:** Raise Error.\n
+
+        :param cols: list of columns (saved order)
+        :param export_dir: artifacts directory
+        :param prefix: file name prefix
+        :return: lookup tables
+    """
+    return {col: pd.Series(np.load(os.path.join(export_dir, f"{prefix}_{i}_values.npy"), mmap_mode='r'),
+                           index=np.load(os.path.join(export_dir, f"{prefix}_{i}_keys.npy")), copy=False)
+            for i, col in enumerate(cols)}
+
+
+def ExportArtifacts(model, pipeline, export_dir:str):
+    """
+        **Method Name:** ExportArtifacts\n
+        **Description:** This method helps to export the model & the fitted preprocessing pipeline in a memory-mappable
+                         format: XGBoost native UBJSON, RandomForest flattened node arrays & the encoding lookup tables as
+                         .npy files. The rest of the pipeline (outliers, scaler & imputer) is pickled without the
+                         encoder, so the lookup tables are never unpickled. The XGBoost booster is not shared between
+                         the processes, xgboost can't map it (see LoadArtifacts)\n
+        **On Failure:** Raise Error.\n
+
+        :param model: best model (XGBoost or RandomForest)
+        :param pipeline: fitted preprocessing pipeline
+        :param export_dir: artifacts directory
+        :return: None
+    """
+    common_utils.clean_prev_dirs_if_exis(dir_path=export_dir) # remove the previous export
+    common_utils.create_dir(dirs=[export_dir])
+    feature_names = getattr(model, 'feature_names_in_', None) # None when the model is fitted on an array
+    meta = {'feature_names': None if feature_names is None else [str(col) for col in feature_names]}
+    if hasattr(model, 'get_booster'): # XGBoost
+        meta['model_kind'] = 'xgboost'
+        model.save_model(os.path.join(export_dir, 'xgboost.ubj'))
+    elif hasattr(model, 'estimators_'): # RandomForest
+        meta['model_kind'] = 'random_forest'
+        meta['classes'] = model.classes_.tolist()
+        FlatForest.FromRandomForest(model).Save(export_dir=export_dir)
+    else:
+        raise ValueError(f"Can't export the model {type(model).__name__}")
+
+    state = pipeline.encoder.ToState() # the small settings are kept in the json, the tables as .npy files
+    meta['label_map_cols'] = SaveTables(tables=state.pop('label_maps'), export_dir=export_dir, prefix='label_map')
+    meta['mean_map_cols'] = SaveTables(tables=state.pop('mean_maps'), export_dir=export_dir, prefix='mean_map')
+    meta['features_transformer'] = state
+    steps = copy.copy(pipeline) # shallow copy, the fitted steps are shared with the pipeline
+    steps.encoder = None # restored from the exported state by LoadArtifacts
+    common_utils.save_model(model=steps, model_path=os.path.join(export_dir, 'pipeline_steps.sav'))
+    with open(os.path.join(export_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1) # written last, a complete export has a meta.json
+
+
+def LoadArtifacts(export_dir:str):
+    """
+        **Method Name:** LoadArtifacts\n
+        **Description:** This method helps to load the model & the preprocessing pipeline exported by ExportArtifacts,
+                         the node arrays & lookup tables are memory-mapped (read only) & the encoder is rebuilt from
+                         them. XGBoost is not shared: load_model parses the UBJSON into a private booster, so every
+                         worker process still holds its own copy\n
+        **On Failure:** Raise Error.\n
+
+        :param export_dir: artifacts directory
+        :return: model, preprocessing pipeline
+    """
+    from training_features_engineering.featureEngineering import FeaturesTransformer
+    with open(os.path.join(export_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta['model_kind'] == 'xgboost':
+        import xgboost as xgb
+        model = xgb.XGBClassifier()
+        model.load_model(os.path.join(export_dir, 'xgboost.ubj'))
+    else:
+        model = FlatForest.Load(export_dir=export_dir, classes=meta['classes'], feature_names=meta['feature_names'])
+
+    pipeline = common_utils.load_model_file(model_path=os.path.join(export_dir, 'pipeline_steps.sav')) # small, without the lookup tables
+    pipeline.encoder = FeaturesTransformer.FromState(dict(
+        meta['features_transformer'],
+        label_maps=LoadTables(cols=meta['label_map_cols'], export_dir=export_dir, prefix='label_map'),
+        mean_maps=LoadTables(cols=meta['mean_map_cols'], export_dir=export_dir, prefix='mean_map'))) # no unpickling
+    return model, pipeline
@@ -0,0 +1,91 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+
+class MicroBatcher:
+    """
+        This class shall be used to coalesce the concurrent predection requests into micro-batches, so the model's
+        vectorized predict is called once per batch instead of once per request.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5):
+        self.predict_fn = predict_fn # vectorized predict function, takes a dataframe & returns one outcome per row
+        self.max_batch_size = max_batch_size # maximum number of rows in a micro-batch
+        self.max_wait = max_wait_ms / 1000.0 # maximum time (in seconds) the first request waits for others
+        self.requests = queue.Queue() # pending (rows, future) pairs
+        self.worker = threading.Thread(target=self._Run, name='micro-batcher', daemon=True)
+        self.worker.start()
+
+    def Submit(self, rows:list):
+        """
+            **Method Name:** Submit\n
+            **Description:** This method helps to submit the rows of a request for predection\n
+            **Output:** future, resolved with one outcome per row\n
+            **On Failure:** Raise Error.\n
+
+            :param rows: list of records (dict), one per row
+            :return: future
+        """
+        future = Future()
+        self.requests.put((rows, future))
+        return future
+
+    def Predict(self, rows:list, timeout=None):
+        """
+            **Method Name:** Predict\n
+            **Description:** This method helps to predict the rows, waits until the micro-batch is scored\n
+            **Output:** list of outcome\n
+            **On Failure:** Raise Error.\n
+
+            :param rows: list of records (dict), one per row
+            :param timeout: maximum time (in seconds) to wait
+            :return: list of outcome
+        """
+        return self.Submit(rows).result(timeout=timeout)
+
+    def _CollectBatch(self):
+        """
+            collect the pending requests until max_batch_size rows or max_wait time after the first request
+        """
+        batch = [self.requests.get()] # block until the first request arrives
+        n_rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows, future = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append((rows, future))
+            n_rows += len(rows)
+        return batch
+
+    def _Run(self):
+        """
+            score the micro-batches one after another, in the background thread
+        """
+        while True:
+            batch = self._CollectBatch()
+            try:
+                data = pd.DataFrame.from_records([row for rows, _ in batch for row in rows])
+                outcome = np.asarray(self.predict_fn(data)).tolist() # plain python values (json serializable)
+            except Exception as ex:
+                for _, future in batch:
+                    future.set_exception(ex) # every request of the failed batch gets the error
+                continue
+            start = 0
+            for rows, future in batch:
+                future.set_result(outcome[start:start + len(rows)]) # give back each request's own rows
+                start += len(rows)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import shutil
+import urllib.request
+from application_logs.logger import App_Logger
+import utils.common_utils as common_utils
+
+
+def file_sha256(file_path:str, chunk_size=1 << 20):
+    """
+        **Method Name:** file_sha256\n
+        **Description:** This method helps to get the content hash of a file, read chunk by chunk\n
+        **On Failure:** Raise Exception\n\n
+
+        :param file_path: file path
+        :return: sha256 hex digest
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class DataSource:
+    """
+        This class shall be used to get the raw data file, from a local path (if present) or from the url.
+        The downloaded files are cached by content hash, so the url is fetched only once (or on refresh).\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, config_path:str):
+        self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
+        self.file_path = self.config['execution_logs']['training']['log_files']['file_operation'] # this file path help to log the details
+        self.logger = App_Logger() # call the App_Logger() to log the details
+        self.data_source = self.config['data_source'] # get the data source details
+        self.cache_dir = self.data_source['cache_dir'] # mention the raw data cache directory
+        self.index_path = os.path.join(self.cache_dir, 'index.json') # {url: {sha256, file}}
+
+    def GetRawData(self):
+        """
+            **Method Name:** GetRawData\n
+            **Description:** This method helps to get the raw data file & its content hash. The local_path is used
+                             when it exists, otherwise the cached copy of github_url (downloaded when not cached,
+                             or when refresh is True).\n
+            **Output:** raw data file path, sha256\n
+            **On Failure:** Raise Exception\n\n
+
+            :return: raw data file path, sha256
+        """
+        try:
+            self.file = self.logger.open(self.file_path) # open the file
+            self.local_path = self.data_source.get('local_path')
+            if self.local_path and os.path.isfile(self.local_path):
+                self.raw_path, self.sha256 = self.local_path, file_sha256(self.local_path)
+                self.logger.log(self.file, f"use the local raw data {self.local_path} ({self.sha256})")
+            else:
+                self.raw_path, self.sha256 = self.GetCachedUrl(url=self.data_source['github_url'])
+            self.file.close()
+            return self.raw_path, self.sha256
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+    def GetCachedUrl(self, url:str):
+        """
+            **Method Name:** GetCachedUrl\n
+            **Description:** This method helps to get the cached copy of the url, download it if it is not cached\n
+            **Output:** cached file path, sha256\n
+            **On Failure:** Raise Exception\n\n
+
+            :param url: raw data url
+            :return: cached file path, sha256
+        """
+        index = {} # {url: cached file & sha256}
+        if os.path.isfile(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+        cached = index.get(url)
+        if cached and os.path.isfile(cached['file']) and not self.data_source.get('refresh', False):
+            self.logger.log(self.file, f"use the cached raw data {cached['file']} of {url}")
+            return cached['file'], cached['sha256']
+
+        common_utils.create_dir(dirs=[self.cache_dir])
+        download_path = os.path.join(self.cache_dir, 'download.tmp')
+        with urllib.request.urlopen(url) as response, open(download_path, 'wb') as f:
+            shutil.copyfileobj(response, f) # download the raw data
+        sha256 = file_sha256(download_path)
+        cached_path = os.path.join(self.cache_dir, sha256 + os.path.splitext(url)[1]) # content addressed file name
+        os.replace(download_path, cached_path)
+        index[url] = {'sha256': sha256, 'file': cached_path}
+        with open(self.index_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        self.logger.log(self.file, f"download the raw data from {url}, cached in {cached_path}")
+        return cached_path, sha256
+
+
+if __name__ == "__main__":
+    pass
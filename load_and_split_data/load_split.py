@@ -1,8 +1,11 @@
+import json
+import os
 import numpy as np
 import pandas as pd
 from application_logs.logger import App_Logger
 import utils.common_utils as common_utils
 from sklearn.model_selection import train_test_split
+from load_and_split_data.dataSource import DataSource
 
 
 class load_split:
@@ -17,6 +20,43 @@ class load_split:
         self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
         self.file_path = self.config['execution_logs']['training']['log_files']['file_operation'] # this file path help to log the details
         self.logger = App_Logger() # call the App_Logger() to log the details
+        self.data_source = DataSource(config_path=config_path) # local/cached raw data
+        self.manifest_path = os.path.join(self.config['artifacts']['artifacts_dir'], 'manifest.json') # source hash & split params of the saved artifacts
+        self.manifest = None # manifest of the current source & split params
+        self.up_to_date = False # True, if the saved artifacts match the source & split params
+
+    def GetManifest(self, source_sha256:str):
+        """
+            **Method Name:** GetManifest\n
+            **Description:** This method helps to describe the artifacts: source hash, split params & data paths\n
+            **Output:** manifest\n
+            **On Failure:** Raise Exception\n\n
+
+            :param source_sha256: content hash of the raw data
+            :return: manifest
+        """
+        return {'source_sha256': source_sha256, 'test_size': self.config['base']['test_size'],
+                'random_state': self.config['base']['random_state'],
+                'raw_local_data': self.config['artifacts']['raw_local_data'],
+                'train_path': self.config['artifacts']['split_data']['train_path'],
+                'test_path': self.config['artifacts']['split_data']['test_path']}
+
+    def IsUpToDate(self, manifest:dict):
+        """
+            **Method Name:** IsUpToDate\n
+            **Description:** This method helps to check the saved artifacts were created from the same source & split params\n
+            **Output:** True (if up to date), False (if not)\n
+            **On Failure:** Raise Exception\n\n
+
+            :param manifest: manifest of the current source & params
+            :return: True (if up to date), False (if not)
+        """
+        if not os.path.isfile(self.manifest_path):
+            return False
+        with open(self.manifest_path) as f:
+            if json.load(f) != manifest:
+                return False
+        return all(os.path.isfile(manifest[key]) for key in ['raw_local_data', 'train_path', 'test_path'])
 
 
     def load_and_save_data(self):
@@ -30,9 +70,15 @@ class load_split:
             :return: save data
         """
         try:
-            self.file = open(self.file_path, 'a+') # open the file
-            self.github_url = self.config['data_source']['github_url'] # read/load the github url
-            self.data = pd.read_csv(self.github_url, sep=',') # read the data
+            self.file = self.logger.open(self.file_path) # open the file
+            self.raw_path, self.source_sha256 = self.data_source.GetRawData() # get the local/cached raw data
+            self.manifest = self.GetManifest(source_sha256=self.source_sha256)
+            self.up_to_date = self.IsUpToDate(manifest=self.manifest)
+            if self.up_to_date: # same source & params, keep the previous artifacts
+                self.logger.log(self.file, f"raw data is unchanged ({self.source_sha256}), use the previous artifacts")
+                self.file.close()
+                return
+            self.data = common_utils.to_categorical(pd.read_csv(self.raw_path, sep=',')) # read the data, the string columns as category
 
             self.artifacts = self.config['artifacts']
             self.artifacts_dir = self.artifacts['artifacts_dir'] # mention the artifacts directory
@@ -43,7 +89,7 @@ class load_split:
             self.logger.log(self.file, f"delete the {self.artifacts_dir} directory if it is previously created")
             common_utils.create_dir([self.artifacts_dir, self.raw_local_data_dir]) # create the artifacts and raw_local_data directories
             self.logger.log(self.file, f"create the {self.artifacts_dir, self.raw_local_data_dir} directories to store the data in local")
-            common_utils.save_raw_local_data(self.data, self.raw_local_data_path) # save data data to raw_local_data directory folder
+            common_utils.save_data(self.data, self.raw_local_data_path) # save data data to raw_local_data directory folder
             self.logger.log(self.file, f"save the data in {self.raw_local_data_path} ")
             self.file.close() # close the file
 
@@ -62,7 +108,11 @@ class load_split:
             :return: split data in train.csv & test.csv
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
+            if self.up_to_date: # the previous train & test data are created from the same source & split params
+                self.logger.log(self.file, "source & split params are unchanged, skip the splitting")
+                self.file.close()
+                return
             self.base = self.config['base']  # mention the base
             self.split_ratio = self.base['test_size']  # mention the split_ratio
             self.random_state = self.base['random_state']  # mention the random_state
@@ -77,14 +127,18 @@ class load_split:
 
             common_utils.create_dir([self.processed_data_dir])  # create the processed_data_dir directory
             self.logger.log(self.file, f"create the directory {self.processed_data_dir} to store the train & test data")
-            self.data = pd.read_csv(self.raw_local_data_path, sep=',')  # read the data from local directory path
+            self.data = common_utils.read_data(self.raw_local_data_path)  # read the data from local directory path
             self.logger.log(self.file, f"read the data from {self.raw_local_data_path}")
             self.train, self.test = train_test_split(self.data, test_size=self.split_ratio,
                                            random_state=self.random_state)  # split the data based on spliting ratio
             self.logger.log(self.file, f"split the train & test data based on split_ratio:{self.split_ratio}, random_state:{self.random_state}")
             for self.data, self.data_path in (self.train, self.train_data_path), (self.test, self.test_data_path):  # it helps to save the train & test data in aparticular directory
-                common_utils.save_raw_local_data(self.data, self.data_path)
+                common_utils.save_data(self.data, self.data_path)
             self.logger.log(self.file, f"store the data in {self.train_data_path, self.test_data_path}")
+            if self.manifest is not None: # describe the artifacts for the next run
+                with open(self.manifest_path, 'w') as f:
+                    json.dump(self.manifest, f, indent=2)
+            self.file.close()
 
         except Exception as e:
             raise e
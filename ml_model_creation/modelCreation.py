@@ -1,10 +1,53 @@
+import glob
+import hashlib
+import json
+import os
+import yaml
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from joblib import Parallel, delayed
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
 from xgboost import XGBClassifier
 import utils.common_utils as common_utils
 from application_logs.logger import App_Logger
 
 
+def BuildEstimator(algo:str, params:dict, n_jobs=None):
+    """
+        **Method Name:** BuildEstimator\n
+        **Description:** This method helps to create the (not trained) model for the algo & params\n
+        **Output:** model\n
+        **On Failure:** Raise Error.\n
+
+        :param algo: xgboost or random_forest
+        :param params: model params
+        :param n_jobs: number of threads
+        :return: model
+    """
+    if algo == 'xgboost':
+        return XGBClassifier(**params, n_jobs=n_jobs)
+    if algo == 'random_forest':
+        return RandomForestClassifier(**params, n_jobs=n_jobs)
+    raise ValueError(f"Unknown algo {algo}")
+
+
+def ScoreFold(algo:str, params:dict, x, y, train_index, val_index):
+    """
+        **Method Name:** ScoreFold\n
+        **Description:** This method helps to train the model on one cross validation fold & get the AUC on
+                         the validation part. It is a module level function, so it can run in a worker process.\n
+        **Output:** AUC\n
+        **On Failure:** Raise Error.\n
+
+        :return: AUC
+    """
+    model = BuildEstimator(algo=algo, params=params, n_jobs=1).fit(x[train_index], y[train_index])
+    return float(roc_auc_score(y[val_index], model.predict_proba(x[val_index])[:, 1]))
+
+
 class ModelCreation:
     """
         This class shall be used for create the model
@@ -17,8 +60,125 @@ class ModelCreation:
         self.file_path = self.config['execution_logs']['training']['log_files']['model_creation']  # this file path help to log the details
         self.logger = App_Logger()  # call the App_Logger() to log the details
 
+    def GetParams(self, algo:str, x_train, y_train, n_jobs=None):
+        """
+            **Method Name:** GetParams\n
+            **Description:** This method helps to get the model params, the best_params from params.yaml file or
+                             (if tuning is enabled) the winning params of the grid search\n
+            **Output:** params\n
+            **On Failure:** Raise Error.\n
+
+            :param algo: xgboost or random_forest
+            :param x_train: x_train data
+            :param y_train: y_train data
+            :param n_jobs: threads budget for the grid search
+            :return: params
+        """
+        if self.config['ml_algo']['tuning']['enabled']:
+            return self.TuneHyperParameters(algo=algo, x_train=x_train, y_train=y_train, n_jobs=n_jobs)
+        return self.config['ml_algo'][algo]['best_params']
+
+    def TuneHyperParameters(self, algo:str, x_train, y_train, n_jobs=None):
+        """
+            **Method Name:** TuneHyperParameters\n
+            **Description:** This method helps to run the grid_search_cv grid with successive halving: every
+                             configuration is cross validated on min_samples train rows, only the best 1/factor
+                             configurations go to the next round, which uses factor times more rows, until one
+                             configuration (or the whole train data) is left. The fold scores are cached on disk,
+                             so a rerun only trains the new configurations. The winning params are saved as a
+                             versioned yaml file.\n
+            **Output:** best params\n
+            **On Failure:** Raise Error.\n
+
+            :param algo: xgboost or random_forest
+            :param x_train: x_train data
+            :param y_train: y_train data
+            :param n_jobs: threads budget (None: tuning n_jobs from params.yaml)
+            :return: best params
+        """
+        try:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.tuning = self.config['ml_algo']['tuning'] # get the tuning details
+            self.random_state = self.config['base']['random_state']
+            self.n_jobs = n_jobs if n_jobs is not None else self.tuning['n_jobs'] # parallel fits
+            x = np.asarray(x_train, dtype=np.float64)
+            y = np.asarray(y_train)
+            self.data_hash = hashlib.sha256(x.tobytes() + y.tobytes()).hexdigest() # cache key part, changes with the data
+
+            self.cache_dir = self.tuning['cache_dir'] # mention the fold scores cache directory
+            self.cache_path = os.path.join(self.cache_dir, f"{algo}_fold_scores.json") # one file per algo, the candidates are tuned in parallel
+            common_utils.create_dir(dirs=[self.cache_dir])
+            self.cache = {} # {key: fold scores}
+            if os.path.isfile(self.cache_path):
+                with open(self.cache_path) as f:
+                    self.cache = json.load(f)
+
+            configs = list(ParameterGrid(self.config['ml_algo'][algo]['grid_search_cv'])) # all the configurations
+            order = np.random.RandomState(self.random_state).permutation(len(y)) # rows are taken in this order, each round extends the previous one
+            n_samples = min(self.tuning['min_samples'], len(y))
+            while True:
+                scores = self._CrossValidate(algo, configs, x[order[:n_samples]], y[order[:n_samples]])
+                self.logger.log(self.file, f"{algo} tuning round: {len(configs)} configurations on {n_samples} rows, best AUC {max(scores):.4f}")
+                ranked = [configs[i] for i in np.argsort(scores)[::-1]] # best configuration first
+                if len(configs) == 1 or n_samples == len(y):
+                    break
+                configs = ranked[:max(1, len(configs) // self.tuning['factor'])] # abandon the bad configurations
+                n_samples = min(n_samples * self.tuning['factor'], len(y))
+            self.best_params, self.best_score = ranked[0], float(max(scores))
 
-    def ApplyRandomForest(self, x_train, y_train):
+            self.SaveTunedParams(algo=algo, best_params=self.best_params, best_score=self.best_score, n_samples=n_samples)
+            self.logger.log(self.file, f"{algo} best params after tuning {self.best_params}, AUC {self.best_score:.4f}") # logs the details
+            self.file.close()
+            return self.best_params
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+    def _CrossValidate(self, algo, configs, x, y):
+        """
+            mean cross validation AUC of each configuration, the fold scores come from the cache when possible
+        """
+        folds = list(StratifiedKFold(n_splits=self.tuning['cv'], shuffle=True, random_state=self.random_state).split(x, y))
+        keys = [[hashlib.sha256(json.dumps([algo, params, len(y), fold, self.tuning['cv'], self.random_state, self.data_hash],
+                                           sort_keys=True, default=str).encode()).hexdigest()
+                 for fold in range(len(folds))] for params in configs]
+        pending = [(i, fold) for i in range(len(configs)) for fold in range(len(folds)) if keys[i][fold] not in self.cache]
+        results = Parallel(n_jobs=self.n_jobs)(delayed(ScoreFold)(algo, configs[i], x, y, *folds[fold]) for i, fold in pending)
+        for (i, fold), score in zip(pending, results):
+            self.cache[keys[i][fold]] = score
+        if pending:
+            with open(self.cache_path + '.tmp', 'w') as f:
+                json.dump(self.cache, f)
+            os.replace(self.cache_path + '.tmp', self.cache_path) # a killed run never leaves a broken cache
+        return [float(np.mean([self.cache[key] for key in config_keys])) for config_keys in keys]
+
+    def SaveTunedParams(self, algo:str, best_params:dict, best_score:float, n_samples:int):
+        """
+            **Method Name:** SaveTunedParams\n
+            **Description:** This method helps to save the winning params as a new version in tuning directory\n
+            **Output:** saved file path\n
+            **On Failure:** Raise Error.\n
+
+            :param algo: xgboost or random_forest
+            :param best_params: winning params
+            :param best_score: cross validation AUC of the winning params
+            :param n_samples: rows used in the last round
+            :return: saved file path
+        """
+        self.tuning_dir = self.config['ml_algo']['tuning']['tuning_dir'] # mention the tuning directory
+        common_utils.create_dir(dirs=[self.tuning_dir])
+        version = len(glob.glob(os.path.join(self.tuning_dir, f"{algo}_best_params_v*.yaml"))) + 1
+        path = os.path.join(self.tuning_dir, f"{algo}_best_params_v{version}.yaml")
+        with open(path, 'w') as f:
+            yaml.safe_dump({'algo': algo, 'version': version, 'created_at': datetime.now().isoformat(timespec='seconds'),
+                            'best_params': best_params, 'cv_auc': best_score, 'n_samples': n_samples,
+                            'grid_search_cv': self.config['ml_algo'][algo]['grid_search_cv']}, f, sort_keys=False)
+        return path
+
+    def ApplyRandomForest(self, x_train, y_train, n_jobs=None, class_weights=None):
         """
             **Method Name:** ApplyRandomForest\n
             **Description:** This method helps to create the randomforest model\n
@@ -27,31 +187,33 @@ class ModelCreation:
 
             :param x_train: x_train data
             :param x_test: y_train data
+            :param n_jobs: number of threads (None: 1)
+            :param class_weights: {class: weight} (None: all the classes weigh the same)
             :return: model
         """
         try:
-            self.file = open(self.file_path, 'a+')
             self.x_train = x_train
             self.y_train = y_train
-            # self.grid_params = self.config['ml_algo']['random_forest']['grid_search_cv']
-            self.best_params = self.config['ml_algo']['random_forest']['best_params'] # get the best params
+            self.best_params = self.GetParams(algo='random_forest', x_train=self.x_train, y_train=self.y_train, n_jobs=n_jobs) # get the best params
+            self.file = self.logger.open(self.file_path) # open the file (after tuning, it logs the details itself)
             self.n_estimators = self.best_params['n_estimators']
             self.criterion = self.best_params['criterion']
             self.max_depth = self.best_params['max_depth']
             self.max_features = self.best_params['max_features']
-            self.clf = RandomForestClassifier(n_estimators=self.n_estimators, criterion=self.criterion, max_depth=self.max_depth, max_features=self.max_features) # apply RandomForest() algo with best params
+            self.clf = RandomForestClassifier(n_estimators=self.n_estimators, criterion=self.criterion, max_depth=self.max_depth, max_features=self.max_features, n_jobs=n_jobs,
+                                              class_weight=class_weights) # apply RandomForest() algo with best params
             self.clf.fit(self.x_train, self.y_train) # train the model
-            self.logger.log(self.file, f"Apply the RandomForest with best params {self.best_params}") # logs the details
+            self.logger.log(self.file, f"Apply the RandomForest with best params {self.best_params}, class weights {class_weights}") # logs the details
             self.file.close()
             return self.clf # return the random forest model
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
 
-    def ApplyXGBoost(self, x_train, y_train):
+    def ApplyXGBoost(self, x_train, y_train, n_jobs=None, class_weights=None):
         """
             **Method Name:** ApplyXGBoost\n
             **Description:** This method helps to apply the XGBoost algo\n
@@ -60,26 +222,28 @@ class ModelCreation:
 
             :param x_train:  x_train data
             :param y_train: y_train data
+            :param n_jobs: number of threads (None: XGBoost default)
+            :param class_weights: {class: weight}, given to XGBoost as sample weights (None: all the rows weigh the same)
             :return:
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
             self.x_train = x_train
             self.y_train = y_train
-            # self.grid_params = self.config['ml_algo']['xgboost']['grid_search_cv']
-            self.best_params = self.config['ml_algo']['xgboost']['best_params']  # get the best params
+            self.best_params = self.GetParams(algo='xgboost', x_train=self.x_train, y_train=self.y_train, n_jobs=n_jobs)  # get the best params
+            self.file = self.logger.open(self.file_path)  # open the file (after tuning, it logs the details itself)
             self.learning_rate = self.best_params['learning_rate']
             self.max_depth = self.best_params['max_depth']
             self.n_estimators = self.best_params['n_estimators']
-            self.xgb = XGBClassifier(learning_rate=self.learning_rate, max_depth=self.max_depth, n_estimators=self.n_estimators) # apply the XGBoost classifier algo
-            self.xgb.fit(self.x_train, self.y_train) # train the model
+            self.xgb = XGBClassifier(learning_rate=self.learning_rate, max_depth=self.max_depth, n_estimators=self.n_estimators, n_jobs=n_jobs) # apply the XGBoost classifier algo
+            self.sample_weight = pd.Series(self.y_train).map(class_weights).to_numpy() if class_weights else None # weight of each row
+            self.xgb.fit(self.x_train, self.y_train, sample_weight=self.sample_weight) # train the model
             self.logger.log(self.file,
-                            f"Apply the RandomForest with best params {self.best_params}")  # logs the details
+                            f"Apply the XGBoost with best params {self.best_params}, class weights {class_weights}")  # logs the details
             self.file.close()
             return self.xgb # return the xgboost model
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
-            raise ex
\ No newline at end of file
+            raise ex
@@ -1,12 +1,17 @@
+import sys
 import utils.common_utils as common_utils
+from utils.stage_cache import StageCache, code_version
 from application_logs.logger import App_Logger
 from training_data_scaling.dataScaling import DataScaling as train_data_scaling
 from testing_data_scaling.dataScaling import DataScaling as test_data_scaling
 from training_validation_insertion import Train_Validation
 from testing_validation_insertion import Test_Validation
 from data_preprocessing.preProcessing import PreProcessing
+from data_preprocessing.rebalancing import Rebalancer
 from data_preprocessing.clustering import KMeans_Clustering
 from find_best_model.findbestModel import FindBestModel
+from ml_model_creation.modelCreation import ModelCreation
+from inference_engine.mappedArtifacts import ExportArtifacts
 
 
 class ModelTraining:
@@ -28,6 +33,7 @@ class ModelTraining:
         self.pre_processing = PreProcessing(config_path=config_path) # helps to perform the preprocessing operation
         self.clustering = KMeans_Clustering(config_path=config_path) # helps to create the cluster
         self.find_best_model = FindBestModel(config_path=config_path) # helps to find the best model
+        self.stage_cache = StageCache(config_path=config_path) # reuse the stage outputs, if nothing is changed
 
     def TrainingModel(self):
         """
@@ -43,7 +49,7 @@ class ModelTraining:
             :return: model
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             """
                 get the train data after validation
             """
@@ -62,20 +68,12 @@ class ModelTraining:
             # self.test_data = self.pre_processing.DropColumn(data=self.test_data, cols=self.drop_cols) # drop the columns from test data
             # self.logger.log(self.file, f"Drop the columns from train & test data") #logs the details
 
-            self.zero_std_cols_train = self.pre_processing.GetColumnsWithZeroStandardDeviation(data=self.train_data)  # get the zero std dev columns for train data
-            self.zero_std_cols_test = self.pre_processing.GetColumnsWithZeroStandardDeviation(data=self.test_data)  # get the zero std dev columns for test data
-            self.train_data = self.pre_processing.DropColumn(data=self.train_data, cols=self.zero_std_cols_train)  # drop the zero std dev columns from train data
-            self.test_data = self.pre_processing.DropColumn(data=self.test_data, cols=self.zero_std_cols_test)  # drop the zero std dev columns from test data
-            self.logger.log(self.file, "drop the zero standard deviation columns") # logs the details
-
-            self.output_col = self.config['data']['output_col'] #get the output columns
-            self.x_train, self.y_train = self.pre_processing.SeparateLabelColumn(data=self.train_data, ycol=self.output_col) # separate the x_train & y_train data
-            self.x_test, self.y_test = self.pre_processing.SeparateLabelColumn(data=self.test_data, ycol=self.output_col) # separate the x_test & y_test data
-            self.logger.log(self.file, "separate the x_train, y_train, x_test & y_test data") # logs the details
-
-            self.x_train = self.pre_processing.ImputeMissingValues(data=self.x_train) # impute the missing values using KNN Imputer (for x_train data)
-            self.x_test = self.pre_processing.ImputeMissingValues(data=self.x_test) # impute the missing values using KNN Imputer (for x_test data)
-            self.logger.log(self.file, "Impute the missing values (x_train & x_test data)") # logs the details
+            self.x_train, self.y_train, self.x_test, self.y_test = self.stage_cache.GetOrCompute(
+                stage='preprocessing', inputs=[self.train_data, self.test_data],
+                params={key: self.config[key] for key in ['base', 'data']},
+                code=code_version(sys.modules[__name__], sys.modules[PreProcessing.__module__]),
+                compute=lambda: self.PreprocessData(train_data=self.train_data, test_data=self.test_data)) # reused if nothing is changed
+            self.logger.log(self.file, "separate the x_train, y_train, x_test & y_test data (imputed by the preprocessing pipeline)") # logs the details
             # """
             #     Apply the KMeans clustering
             # """
@@ -101,16 +99,58 @@ class ModelTraining:
             # self.x_test = self.test_data_scaling.Standarization(data=self.x_test) # scale the x_test data
             # self.logger.log(self.file, "apply the standarization on x_train & x_test data")
 
-            self.model_name, self.model = self.find_best_model.GetBestModel(x_train=self.x_train, y_train=self.y_train, x_test=self.x_test, y_test=self.y_test) # get the best model name & model
-            self.logger.log(self.file, f"{self.model_name} is the best model")
+            self.rebalancing_strategy = self.config['features_eng']['rebalancing']['strategy'] # class_weight: the models weigh the classes, no resampling
+            self.class_weights = Rebalancer.ClassWeights(self.y_train) if self.rebalancing_strategy == 'class_weight' else None
+            self.logger.log(self.file, f"rebalancing strategy {self.rebalancing_strategy}, class weights {self.class_weights}") # logs the details
+
+            self.model_name, self.model, self.decision_threshold = self.stage_cache.GetOrCompute(
+                stage='model_selection', inputs=[self.x_train, self.y_train, self.x_test, self.y_test],
+                params={'base': self.config['base'], 'ml_algo': self.config['ml_algo'], 'candidates': self.config['model_selection']['candidates'],
+                        'decision_threshold': self.config['model_selection']['decision_threshold'],
+                        'threshold_folds': self.config['model_selection']['threshold_folds'], 'class_weights': self.class_weights},
+                code=code_version(sys.modules[FindBestModel.__module__], sys.modules[ModelCreation.__module__]),
+                compute=lambda: self.find_best_model.GetBestModel(x_train=self.x_train, y_train=self.y_train, x_test=self.x_test, y_test=self.y_test,
+                                                                 class_weights=self.class_weights)) # get the best model name, model & decision threshold
+            self.find_best_model.SaveBestModel(model_name=self.model_name, model=self.model, decision_threshold=self.decision_threshold) # save the best model (also when it comes from the stage cache)
+            self.logger.log(self.file, f"{self.model_name} is the best model, decision threshold: {self.decision_threshold}")
+
+            self.mmap_dir = self.config['inference']['mmap_dir'] # memory-mappable export of the model & encoders
+            ExportArtifacts(model=self.model, pipeline=self.train_data_validation.pipeline, export_dir=self.mmap_dir)
+            self.logger.log(self.file, f"export the model, the pipeline & the encoding lookup tables (memory-mappable) in {self.mmap_dir}") # logs the details
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
 
 
+    def PreprocessData(self, train_data, test_data):
+        """
+            **Method Name:** PreprocessData\n
+            **Description:** This method helps to drop the zero standard deviation columns & separate the label column
+                             (the missing values are imputed by the preprocessing pipeline)\n
+            **Output:** x_train, y_train, x_test, y_test\n
+            **On Failure:** Raise Error.\n
+
+            :param train_data: train data after validation
+            :param test_data: test data after validation
+            :return: x_train, y_train, x_test, y_test
+        """
+        self.train_data, self.test_data = train_data, test_data
+        self.zero_std_cols_train = self.pre_processing.GetColumnsWithZeroStandardDeviation(data=self.train_data)  # get the zero std dev columns for train data
+        self.zero_std_cols_test = self.pre_processing.GetColumnsWithZeroStandardDeviation(data=self.test_data)  # get the zero std dev columns for test data
+        self.train_data = self.pre_processing.DropColumn(data=self.train_data, cols=self.zero_std_cols_train)  # drop the zero std dev columns from train data
+        self.test_data = self.pre_processing.DropColumn(data=self.test_data, cols=self.zero_std_cols_test)  # drop the zero std dev columns from test data
+        self.logger.log(self.file, "drop the zero standard deviation columns") # logs the details
+
+        self.output_col = self.config['data']['output_col'] #get the output columns
+        self.x_train, self.y_train = self.pre_processing.SeparateLabelColumn(data=self.train_data, ycol=self.output_col) # separate the x_train & y_train data
+        self.x_test, self.y_test = self.pre_processing.SeparateLabelColumn(data=self.test_data, ycol=self.output_col) # separate the x_test & y_test data
+        self.logger.log(self.file, "separate the x_train, y_train, x_test & y_test data") # logs the details
+        return self.x_train, self.y_train, self.x_test, self.y_test
+
+
 if __name__ == '__main__':
     mt = ModelTraining('params.yaml')
     mt.TrainingModel()
@@ -1,9 +1,6 @@
 import utils.common_utils as common_utils
 from application_logs.logger import App_Logger
-from model_training import ModelTraining
-from data_preprocessing.preProcessing import PreProcessing
-from testing_validation_insertion import Test_Validation
-import pandas as pd
+from inference_engine.inferenceEngine import InferenceEngine
 
 class Predection:
     """
@@ -13,13 +10,25 @@ class Predection:
         Version: 0.0.1\n\n
     """
     def __init__(self, config_path):
+        self.config_path = config_path # keep the config path, the inference engine is created lazily
         self.config = common_utils.read_params(config_path)  # read the information from params.yaml file as dict form
         self.file_path = self.config['execution_logs']['predection']['log_files']['predection_logs']  # this file path help to log the details
         self.logger = App_Logger()  # call the App_Logger() to log the details
         self.common_utils = common_utils  # load the common utils
-        self.model = ModelTraining(config_path=config_path) # get the model name
-        self.preprocessing = PreProcessing(config_path=config_path) # load the pre_processing steps
-        self.test_val = Test_Validation(config_path=config_path) # apply test validation steps
+        self.engine = None # inference engine, created once on the first predection (the model may not be trained yet)
+
+    def GetEngine(self):
+        """
+            **Method Name:** GetEngine\n
+            **Description:** This method helps to get the warm inference engine, it loads the model only once\n
+            **Output:** inference engine\n
+            **On Failure:** Raise Error.\n
+
+            :return: inference engine
+        """
+        if self.engine is None:
+            self.engine = InferenceEngine(config_path=self.config_path) # load the model & fitted artifacts
+        return self.engine
 
     def Predection(self):
         """
@@ -33,25 +42,22 @@ class Predection:
             :return: predected_outcome
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.test_data_path = self.config['artifacts']['split_data']['test_path'] # load the test data path
-            self.test_data = pd.read_csv(self.test_data_path, sep=',') # read the data
-            self.output_col = self.config['data']['output_col'] # get the output columns
-            self.model_path = self.config['model']['model_dir'] # load the model path
+            self.test_data = self.common_utils.read_data(data_path=self.test_data_path) # read the data
 
-            self.model = self.common_utils.load_model(model_path=self.model_path) # get the model
-            self.logger.log(self.file, f"Get the best model {self.model}") # logs the details
+            self.engine = self.GetEngine() # get the model
+            self.logger.log(self.file, f"Get the best model {self.engine.model}") # logs the details
 
-            self.test_data = self.test_val.Test_Validation() # validate the test data
-            self.test_data = self.preprocessing.DropColumn(data=self.test_data, cols=self.output_col) # get the data
-            self.logger.log(self.file, "validate the test data for predection")
+            self.test_data, self.rejects = self.engine.Validate(data=self.test_data) # check the data with the schema contract
+            self.logger.log(self.file, f"Validate the data with the schema contract, {len(self.test_data)} valid & {len(self.rejects)} rejected rows") # logs the details
 
-            self.zero_std_cols_test = self.preprocessing.GetColumnsWithZeroStandardDeviation(data=self.test_data)  # get the zero std dev columns for test data
-            self.test_data = self.preprocessing.DropColumn(data=self.test_data, cols=self.zero_std_cols_test)  # drop the zero std dev columns from test data
-            self.logger.log(self.file, "drop the zero std columns") # logs the columns
+            self.test_data = self.engine.transform(data=self.test_data) # apply the fitted features engineering steps
+            self.logger.log(self.file, "apply the fitted features engineering steps on test data for predection")
 
-            self.outcome = self.model.predict(self.test_data) # predict the outcome
-            self.test_data['outcome'] = self.outcome
+            self.include_proba = self.config['predection_data']['include_proba'] # add the positive class probability
+            self.outcome = self.engine.ScoreFeatures(features=self.test_data, include_proba=self.include_proba) # predict the outcome (decision threshold of the model)
+            self.test_data = self.test_data.assign(**self.outcome) # attach the outcome with the features
 
             self.predection_data_dir = self.config['predection_data']['predection_data_dir'] # mention the prediction data directory
             self.predection_data_path = self.config['predection_data']['predection_data_path'] # mention the prediction data path
@@ -59,9 +65,14 @@ class Predection:
             self.common_utils.create_dir(dirs=[self.predection_data_dir]) # create the predection data directory
             self.common_utils.save_raw_local_data(data=self.test_data, new_data_path=self.predection_data_path) # save the prediction data.csv data
             self.logger.log(self.file, f"save the prediction data in {self.predection_data_dir} directory") # logs the details
+            if len(self.rejects) > 0:
+                self.quarantine_path = self.config['predection_data']['quarantine_path'] # mention the quarantine path
+                self.common_utils.save_raw_local_data(data=self.rejects, new_data_path=self.quarantine_path) # keep the rejected rows with the reason
+                self.logger.log(self.file, f"Quarantine the rejected rows in {self.quarantine_path}: {self.rejects[self.engine.schema.reason_col].value_counts().to_dict()}") # logs the details
+            self.file.close()
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -69,4 +80,3 @@ class Predection:
 if __name__ == '__main__':
     prd = Predection('params.yaml')
     prd.Predection()
-
@@ -0,0 +1,172 @@
+import json
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import utils.common_utils as common_utils
+from application_logs.logger import App_Logger
+from inference_engine.inferenceEngine import InferenceEngine
+from inference_engine.microBatcher import MicroBatcher
+from utils.schema_contract import SchemaContract
+
+
+class ScoringService:
+    """
+        This class shall be used to serve the trained model over HTTP (locally), the concurrent requests
+        are coalesced into micro-batches before calling the model.\n\n
+
+        POST /predict with a json record (or a list of records) matching the DATA/adult_new.csv columns,
+        returns {"predictions": [...]} (& "probabilities": [...] if predection_data.include_proba). The records rejected by the
+        schema contract get a null prediction & are listed in "rejects": [{"row": i, "reason": ...}]. GET /health returns the service status.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, config_path):
+        self.config = common_utils.read_params(config_path)  # read the information from params.yaml file as dict form
+        self.file_path = self.config['execution_logs']['predection']['log_files']['predection_logs']  # this file path help to log the details
+        self.logger = App_Logger()  # call the App_Logger() to log the details
+        self.service = self.config['scoring_service'] # get the scoring service details
+        self.engine = InferenceEngine(config_path=config_path) # load the model & fitted artifacts only once
+        self.include_proba = self.config['predection_data']['include_proba'] # return the positive class probabilities
+        self.batcher = MicroBatcher(predict_fn=lambda data: self.engine.predict_proba(data)[:, -1], max_batch_size=self.service['max_batch_size'],
+                                    max_wait_ms=self.service['max_wait_ms']) # coalesce the requests into micro-batches
+        self.input_cols = self.engine.features_transformer.input_cols # columns expected in each record
+
+    def ParseRows(self, body:bytes):
+        """
+            **Method Name:** ParseRows\n
+            **Description:** This method helps to parse & check the request body\n
+            **Output:** list of records\n
+            **On Failure:** Raise ValueError.\n
+
+            :param body: request body (json)
+            :return: list of records
+        """
+        rows = json.loads(body)
+        if isinstance(rows, dict):
+            rows = rows['rows'] if 'rows' in rows else [rows] # {"rows": [...]} or a single record
+        if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("request body must be a json record or a non-empty list of records")
+        for row in rows:
+            missing_cols = [col for col in self.input_cols if col not in row]
+            if missing_cols:
+                raise ValueError(f"missing columns {missing_cols}")
+        return rows
+
+    def ValidateRows(self, rows:list):
+        """
+            **Method Name:** ValidateRows\n
+            **Description:** This method helps to check the records with the schema contract of the train data\n
+            **Output:** valid records, {position: reject reason}\n
+            **On Failure:** Raise Error.\n
+
+            :param rows: list of records
+            :return: valid records, rejects
+        """
+        valid, rejects = self.engine.Validate(pd.DataFrame(rows))
+        if len(rejects) == 0:
+            return rows, {}
+        return [rows[i] for i in valid.index], dict(zip(rejects.index.tolist(), rejects[SchemaContract.reason_col].tolist()))
+
+    def GetResponse(self, proba:list, rejects=None):
+        """
+            **Method Name:** GetResponse\n
+            **Description:** This method helps to convert the positive class probabilities to the response
+                             (outcome with the decision threshold of the model), the rejected records get a null
+                             prediction in their position\n
+            **Output:** response\n
+            **On Failure:** Raise Error.\n
+
+            :param proba: positive class probabilities of the valid records
+            :param rejects: {position: reject reason} of the rejected records
+            :return: response
+        """
+        rejects = rejects or {}
+        predictions, probabilities = iter(self.engine.ApplyThreshold(proba=proba).tolist()), iter(proba)
+        n_rows = len(proba) + len(rejects)
+        response = {'predictions': [None if i in rejects else next(predictions) for i in range(n_rows)]}
+        if self.include_proba:
+            response['probabilities'] = [None if i in rejects else next(probabilities) for i in range(n_rows)]
+        if rejects:
+            response['rejects'] = [{'row': i, 'reason': reason} for i, reason in sorted(rejects.items())]
+        return response
+
+    def CreateServer(self):
+        """
+            **Method Name:** CreateServer\n
+            **Description:** This method helps to create the HTTP server (not started yet)\n
+            **Output:** server\n
+            **On Failure:** Raise Error.\n
+
+            :return: server
+        """
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _Reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == '/health':
+                    self._Reply(200, {'status': 'ok', 'model': type(service.engine.model).__name__})
+                else:
+                    self._Reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path != '/predict':
+                    self._Reply(404, {'error': 'not found'})
+                    return
+                try:
+                    rows = service.ParseRows(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                except ValueError as ex: # json decoding errors are ValueError too
+                    self._Reply(400, {'error': str(ex)})
+                    return
+                try:
+                    rows, rejects = service.ValidateRows(rows)
+                    proba = service.batcher.Predict(rows) if rows else [] # every record may be rejected
+                    self._Reply(200, service.GetResponse(proba=proba, rejects=rejects))
+                except Exception as ex:
+                    file = service.logger.open(service.file_path)  # open the file
+                    service.logger.log(file, f"Error: {ex}")  # logs the error, if error occurs
+                    file.close()  # close the file
+                    self._Reply(500, {'error': str(ex)})
+
+            def log_message(self, format, *args):
+                pass # don't write every request to stderr
+
+        return ThreadingHTTPServer((self.service['host'], self.service['port']), Handler)
+
+    def Serve(self):
+        """
+            **Method Name:** Serve\n
+            **Description:** This method helps to start the scoring service, runs until interrupted\n
+            **Output:** None\n
+            **On Failure:** Raise Error.\n
+
+            :return: None
+        """
+        try:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.server = self.CreateServer()
+            self.logger.log(self.file, f"Start the scoring service at {self.service['host']}:{self.service['port']}, max_batch_size: {self.service['max_batch_size']}, max_wait_ms: {self.service['max_wait_ms']}") # logs the details
+            self.file.close()
+            print(f"Scoring service is running at http://{self.service['host']}:{self.service['port']}")
+            self.server.serve_forever()
+
+        except KeyboardInterrupt:
+            self.server.server_close()
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+
+if __name__ == '__main__':
+    service = ScoringService('params.yaml')
+    service.Serve()
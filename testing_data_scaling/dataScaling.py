@@ -1,41 +1,42 @@
-from sklearn.preprocessing import StandardScaler
-from application_logs.logger import App_Logger
 import utils.common_utils as common_utils
+from training_data_scaling.dataScaling import DataScaling as TrainDataScaling
 
 
-class DataScaling:
+class DataScaling(TrainDataScaling):
     """
-        This class shall be used for hscaling the data.\n\n
+        This class shall be used for scaling the test/predection data with the scaler learned from the train data,
+        the details are logged in the testing logs.\n\n
 
         Written By: Dibyendu Biswas.\n\n
         Version: 0.0.1\n\n
     """
-    def __init__(self, config_path:str):
-        self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
-        self.file_path = self.config['execution_logs']['testing']['log_files']['data_scaling'] # this file path help to log the details
-        self.logger = App_Logger() # call the App_Logger() to log the details
+    log_section = 'testing'
 
-    def Standarization(self, data):
+    def Standarization(self, data, scaler=None):
         """
             **Method Name:** Standarization\n
-            **Description:** This method helps to standarized the data\n
+            **Description:** This method helps to standarized the test data with the train mean & std
+                             (the scaler of the fitted pipeline saved with the model, if not given)\n
             **Output:** data\n
             **On Failure:** Raise Error.\n
 
-            :param data: train.csv
+            :param data: test.csv
+            :param scaler: fitted scaler (optional)
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
-            self.stadarize = StandardScaler() # apply the standarization
-            self.scaled_data = self.stadarize.fit_transform(self.data)
-            self.logger.log(self.file, f"Standarized the data using StandardScaler() technique")
+            self.scaler = scaler if scaler is not None else common_utils.load_model_file(model_path=self.config['model']['pipeline_path']).scaler # learned from train data
+            if self.scaler is None:
+                raise ValueError("The model is trained without scaling, enable features_eng.scaling in params.yaml")
+            self.scaled_data = self.scaler.transform(self.data)
+            self.logger.log(self.file, f"Standarized the data of {self.scaler.cols} columns with the train mean & std")
             self.file.close()
-            return self.scaled_data # return the scaled data, where std:1, mean:0
+            return self.scaled_data # return the scaled data
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
-            raise ex
\ No newline at end of file
+            raise ex
@@ -1,9 +1,8 @@
-import pandas as pd
+import os
 import utils.common_utils as common_utils
 from application_logs.logger import App_Logger
-from testing_data_scaling.dataScaling import DataScaling
-from testing_features_engineering.featureEngineering import FeaturesEngineering
 from testing_raw_data_validation.rawdataValidation import RawDataValidation
+from utils.schema_contract import SchemaContract
 
 
 class Test_Validation:
@@ -19,7 +18,6 @@ class Test_Validation:
         self.logger = App_Logger()  # call the App_Logger() to log the details
         self.common_utils = common_utils
         self.raw_data = RawDataValidation(config_path=config_path) # validate the raw data
-        self.fea_eng = FeaturesEngineering(config_path=config_path) # apply the feature engineering
 
     def Test_Validation(self):
         """
@@ -31,57 +29,57 @@ class Test_Validation:
             :return:  test data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             """
                 step 1: load the data
             """
             self.test_data_path = self.config['artifacts']['split_data']['test_path'] # load the test data path
-            self.test_data = pd.read_csv(self.test_data_path, sep=',') # read the test data
+            self.test_data = self.common_utils.read_data(data_path=self.test_data_path) # read the test data
             self.logger.log(self.file, "read the test.csv data") # logs the details
 
             """
                 step 2: validate the test data
             """
-            self.neumeric_cols = self.raw_data.GetNeumericalFeatures(data=self.test_data)  # get the neumeric columns
+            self.schema_path = self.config['model']['schema_path'] # mention the schema contract path
+            self.schema = SchemaContract.Load(schema_path=self.schema_path) # learned from the train data
+            self.test_data, self.rejects = self.schema.Validate(data=self.test_data) # check the whole data at once
+            if len(self.rejects) > 0:
+                self.quarantine_path = self.config['schema']['test_quarantine_path'] # mention the quarantine path
+                self.common_utils.create_dir(dirs=[os.path.dirname(self.quarantine_path)]) # create the quarantine directory
+                self.common_utils.save_raw_local_data(data=self.rejects, new_data_path=self.quarantine_path) # keep the rejected rows
+                self.logger.log(self.file, f"Quarantine {len(self.rejects)} rows rejected by the schema contract in {self.quarantine_path}: {self.rejects[self.schema.reason_col].value_counts().to_dict()}") # logs the details
+            self.logger.log(self.file, f"Validate the test data with the schema contract, {len(self.test_data)} valid rows") # logs the details
+
+            self.output_col = self.config['data']['output_col'] # read the output column
+            self.profile = self.raw_data.GetProfile(data=self.test_data, ycol=self.output_col) # profile the test data once
+            self.logger.log(self.file, "Profile the test data") # logs the details
+
+            self.neumeric_cols = self.raw_data.GetNeumericalFeatures(data=self.test_data, profile=self.profile)  # get the neumeric columns
             self.logger.log(self.file, f"Get the neumeric columns {self.neumeric_cols}")  # logs the details
 
-            self.categorical_cols = self.raw_data.GetCatrgorycalFeatures(data=self.test_data)  # get the categorical columns
+            self.categorical_cols = self.raw_data.GetCatrgorycalFeatures(data=self.test_data, profile=self.profile)  # get the categorical columns
             self.logger.log(self.file, f"Get the categoricals columns {self.categorical_cols}")  # logs the details
 
-            self.row_length, self.col_length = self.raw_data.GetLengthofData(data=self.test_data)  # get the length of train.csv data
+            self.row_length, self.col_length = self.raw_data.GetLengthofData(data=self.test_data, profile=self.profile)  # get the length of train.csv data
             self.logger.log(self.file, f"Get the length of data {self.row_length, self.col_length}")  # logs the details
 
-            self.missing_value_cols = self.raw_data.IsMissingValuePresent(data=self.test_data)  # get the columns where missing value is present
+            self.missing_value_cols = self.raw_data.IsMissingValuePresent(data=self.test_data, profile=self.profile)  # get the columns where missing value is present
             self.logger.log(self.file, f"Get the columns where missing value is present {self.missing_value_cols}")  # logs the details
 
             """
-                step 3: apply the features engineering steps
+                step 3: apply the features engineering steps (learned from train data)
             """
-            self.output_col = self.config['data']['output_col']  # read the output column
-            self.label_enc = self.config['features_eng']['label_encoding']  # apply label encoding
-            self.salary = self.label_enc['salary_col']['col']  # apply label encoding on salary column
-            self.mapdct_salary_col = self.label_enc['salary_col']['mapdct_salary_col']  # get the mapping format
-            self.sex = self.label_enc['sex_col']['col']  # apply label encoding on sex column
-            self.mapdct_sex_col = self.label_enc['sex_col']['mapdct_sex_col']  # get the mapping format
-
-            self.mean_encoding = self.config['features_eng']['mean_encoding']  # apply mean encosing
-            self.mean_encoding_cols = self.mean_encoding['mean_encoding_cols']  # apply the mean encoding on particular columns
-            self.replace_zero_values_cols = self.config['features_eng']['replace_zero_values_cols']  # get the columns where zero value is present
-
-            self.test_data = self.fea_eng.LabelEncoding(data=self.test_data, col=self.salary, mapdct=self.mapdct_salary_col)  # apply the label encoding on salary column
-            self.test_data = self.fea_eng.LabelEncoding(data=self.test_data, col=self.sex, mapdct=self.mapdct_sex_col)  # apply the label encoding on sex column
-            self.logger.log(self.file, "Apply the label encoding on salary & sex column")  # logs the details
-
-            self.test_data = self.fea_eng.MeanEncoding(data=self.test_data, cols=self.mean_encoding_cols, ycol=self.output_col)  # apply the mean encoding
-            self.logger.log(self.file, f"Apply the mean encoding techniques on {self.mean_encoding_cols} columns")
-
-            self.test_data = self.fea_eng.ReplaceZeroValues(data=self.test_data, cols=self.replace_zero_values_cols)  # replace the zero value with mean value
-            self.logger.log(self.file, f"replace the zero values with mean value {self.replace_zero_values_cols} columns")  # logs the details
+            self.pipeline_path = self.config['model']['pipeline_path'] # mention the fitted pipeline path
+            self.pipeline = self.common_utils.load_model_file(model_path=self.pipeline_path) # load the fitted preprocessing pipeline
+            self.logger.log(self.file, f"load the fitted preprocessing pipeline from {self.pipeline_path}") # logs the details
 
+            self.test_data = self.pipeline.transform(data=self.test_data) # outliers, encoding & scaling (fused) & imputation, in one pass
+            self.logger.log(self.file, f"Apply the preprocessing pipeline: {self.pipeline.Steps()}") # logs the details
+            self.file.close()
             return self.test_data  # return test data after validation
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
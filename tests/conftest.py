@@ -0,0 +1,26 @@
+"""
+    Shared fixtures: a copy of the project trained once per test session (python main.py), so the tests which need
+    the fitted artifacts (model, pipeline) never touch the artifacts & the logs of the working tree.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def trained_project(tmp_path_factory):
+    project_dir = tmp_path_factory.mktemp('project') / 'package'
+    shutil.copytree(PROJECT_DIR, project_dir, ignore=shutil.ignore_patterns('.git', '__pycache__', '*.pdf', 'EDA',
+                                                                             'cache', 'tests', 'benchmarks'))
+    subprocess.run([sys.executable, '-W', 'ignore', 'main.py'], cwd=project_dir, check=True, capture_output=True)
+    return project_dir
+
+
+@pytest.fixture
+def in_trained_project(trained_project, monkeypatch):
+    monkeypatch.chdir(trained_project) # params.yaml uses relative paths
+    return trained_project
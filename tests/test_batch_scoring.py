@@ -0,0 +1,72 @@
+"""
+    BatchScoring: the output & the quarantine file don't depend on the chunk size, on the overlap of read, predict &
+    write or on the no of worker processes (byte-range shards).
+
+    Run from the project root:  python -m pytest tests
+"""
+import pandas as pd
+import pytest
+import yaml
+from batch_scoring import BatchScoring
+
+
+def make_dirty(data):
+    """
+        a few rows which break the schema contract: not a number, out of range & unknown category
+    """
+    data = data.astype({'age': object})
+    data.loc[data.index[5::397], 'age'] = 'abc'
+    data.loc[data.index[11::501], 'hours-per-week'] = 1000
+    data.loc[data.index[17::613], 'workclass'] = 'unknown_workclass'
+    return data
+
+
+@pytest.fixture
+def input_path(in_trained_project, tmp_path):
+    path = tmp_path / 'input.csv'
+    make_dirty(pd.read_csv('DATA/adult_new.csv', nrows=2000)).to_csv(path, index=False)
+    return path
+
+
+def score(input_path, output_path, config_path='params.yaml', **kwargs):
+    quarantine_path = output_path.with_name(f"{output_path.stem}_quarantine.csv")
+    BatchScoring(config_path=config_path).Score(input_path=str(input_path), output_path=str(output_path),
+                                                quarantine_path=str(quarantine_path), **kwargs)
+    return pd.read_csv(output_path), pd.read_csv(quarantine_path)
+
+
+def test_chunk_size_and_overlap_give_identical_output(input_path, tmp_path):
+    expected, expected_rejects = score(input_path, tmp_path / 'one_chunk.csv', chunk_size=10000, overlap=False)
+    assert len(expected) + len(expected_rejects) == 2000
+    assert len(expected_rejects) >= 5 + 4 + 4
+    assert set(expected['outcome']) <= {0, 1}
+    for chunk_size, overlap in [(333, False), (333, True), (7, True)]:
+        scored, rejects = score(input_path, tmp_path / f'scored_{chunk_size}_{overlap}.csv', chunk_size=chunk_size, overlap=overlap)
+        pd.testing.assert_frame_equal(scored, expected)
+        pd.testing.assert_frame_equal(rejects, expected_rejects)
+
+
+def test_error_in_a_chunk_is_raised(input_path, tmp_path):
+    batch = BatchScoring(config_path='params.yaml')
+    batch.ScoreChunk = lambda chunk: chunk.iloc[:, 1000] # IndexError in the predict thread
+    with pytest.raises(IndexError):
+        batch.Score(input_path=str(input_path), output_path=str(tmp_path / 'scored.csv'), chunk_size=100, overlap=True)
+
+
+def test_workers_give_identical_output(in_trained_project, tmp_path):
+    with open('params.yaml') as f:
+        config = yaml.safe_load(f)
+    config['batch_scoring']['shard_size_mb'] = 0.3
+    config_path = tmp_path / 'params.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+
+    input_path = tmp_path / 'input.csv' # about 4 MB, 13 shards of 0.3 MB
+    data = make_dirty(pd.read_csv('DATA/adult_new.csv'))
+    data.to_csv(input_path, index=False)
+    expected, expected_rejects = score(input_path, tmp_path / 'one_worker.csv', config_path=str(config_path), n_workers=1)
+    scored, rejects = score(input_path, tmp_path / 'three_workers.csv', config_path=str(config_path), n_workers=3)
+    assert len(expected) + len(expected_rejects) == len(data)
+    assert len(expected_rejects) > 100
+    pd.testing.assert_frame_equal(scored, expected)
+    pd.testing.assert_frame_equal(rejects, expected_rejects)
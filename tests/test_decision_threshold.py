@@ -0,0 +1,83 @@
+"""
+    Decision threshold: youden is tuned on the out-of-fold probabilities of the train data (never on the test data)
+    and the threshold is applied to binary models only.
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_curve
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from xgboost import XGBClassifier
+from find_best_model.findbestModel import FindBestModel
+from inference_engine.inferenceEngine import InferenceEngine
+
+
+def find_best_model(tmp_path, decision_threshold):
+    with open('params.yaml') as f:
+        config = yaml.safe_load(f)
+    config['model_selection'].update(decision_threshold=decision_threshold, threshold_folds=3)
+    config_path = tmp_path / 'params.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return FindBestModel(config_path=str(config_path)), config
+
+
+@pytest.fixture
+def train():
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame({'a': rng.normal(size=300), 'b': rng.normal(size=300)})
+    y = pd.Series((x['a'] + rng.normal(scale=1.0, size=300) > 0.8).astype(int))
+    return x, y
+
+
+def test_fixed_threshold(tmp_path, train):
+    model, _ = find_best_model(tmp_path, 0.3)
+    assert model.GetDecisionThreshold(model=None, x_train=None, y_train=None) == 0.3
+
+
+def test_youden_threshold_uses_out_of_fold_train_probabilities(tmp_path, train):
+    x, y = train
+    model, config = find_best_model(tmp_path, 'youden')
+    forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(x, y)
+    threshold = model.GetDecisionThreshold(model=forest, x_train=x, y_train=y)
+
+    folds = StratifiedKFold(n_splits=3, shuffle=True, random_state=config['base']['random_state'])
+    proba = cross_val_predict(RandomForestClassifier(n_estimators=10, random_state=0), x, y, cv=folds, method='predict_proba')[:, -1]
+    fpr, tpr, thresholds = roc_curve(y, proba)
+    assert threshold == thresholds[np.argmax(tpr - fpr)]
+    assert 0 < threshold < 1
+
+
+def test_youden_threshold_with_class_weights(tmp_path, train):
+    x, y = train
+    model, config = find_best_model(tmp_path, 'youden')
+    class_weights = {0: 0.6, 1: 3.0}
+    sample_weight = y.map(class_weights).to_numpy()
+    xgb = XGBClassifier(n_estimators=10, max_depth=2, n_jobs=1).fit(x, y, sample_weight=sample_weight)
+    threshold = model.GetDecisionThreshold(model=xgb, x_train=x, y_train=y, class_weights=class_weights)
+
+    folds = StratifiedKFold(n_splits=3, shuffle=True, random_state=config['base']['random_state'])
+    proba = cross_val_predict(XGBClassifier(n_estimators=10, max_depth=2, n_jobs=1), x, y, cv=folds, method='predict_proba',
+                              params={'sample_weight': sample_weight})[:, -1]
+    fpr, tpr, thresholds = roc_curve(y, proba)
+    assert threshold == pytest.approx(thresholds[np.argmax(tpr - fpr)])
+
+
+def test_youden_threshold_with_one_label(tmp_path, train):
+    x, _ = train
+    model, _ = find_best_model(tmp_path, 'youden')
+    assert model.GetDecisionThreshold(model=None, x_train=x, y_train=pd.Series(np.ones(len(x), dtype=int))) == 0.5
+
+
+def test_apply_threshold_needs_a_binary_model():
+    engine = InferenceEngine.__new__(InferenceEngine) # no trained artifacts needed
+    engine.decision_threshold = 0.3
+    engine.model = RandomForestClassifier().fit([[0], [1]], [0, 1])
+    assert engine.ApplyThreshold(proba=[0.1, 0.3, 0.9]).tolist() == [0, 1, 1]
+    engine.model = RandomForestClassifier().fit([[0], [1], [2]], [0, 1, 2])
+    with pytest.raises(ValueError, match='binary'):
+        engine.ApplyThreshold(proba=[0.1])
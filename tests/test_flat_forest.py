@@ -0,0 +1,57 @@
+"""
+    FlatForest: the flattened, vectorized RandomForest gives exactly the probabilities of scikit-learn, the values
+    at (& around) the split thresholds included.
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from inference_engine.mappedArtifacts import FlatForest
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame({'age': rng.integers(17, 90, 600).astype(float), 'hours': rng.normal(40, 12, 600),
+                      'gain': rng.exponential(1000, 600), 'sex': rng.integers(0, 2, 600).astype(float)})
+    y = ((x['age'] > 40) & (x['hours'] > 38) | (rng.random(600) < 0.15)).astype(int)
+    return x, y
+
+
+def threshold_rows(forest, x):
+    """
+        rows with every split feature set exactly at, just below & just above (+-1e-9) a split threshold
+    """
+    rows = []
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        for node in np.flatnonzero(tree.children_left >= 0)[:20]:
+            for delta in (-1e-9, 0.0, 1e-9):
+                row = np.asarray(x, dtype=float)[node % len(x)].copy()
+                row[tree.feature[node]] = tree.threshold[node] + delta
+                rows.append(row)
+    return np.array(rows)
+
+
+@pytest.mark.parametrize('fit_on', ['frame', 'array'])
+def test_predict_proba_equals_sklearn(data, fit_on):
+    x, y = data
+    forest = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0)
+    forest.fit(x if fit_on == 'frame' else x.to_numpy(), y)
+    flat = FlatForest.FromRandomForest(forest)
+    assert hasattr(flat, 'feature_names_in_') == (fit_on == 'frame')
+
+    test = np.vstack([x.to_numpy(), threshold_rows(forest, x)])
+    np.testing.assert_array_equal(flat.predict_proba(test), forest.predict_proba(test))
+    np.testing.assert_array_equal(flat.predict(test), forest.predict(test))
+
+
+def test_save_load_round_trip(data, tmp_path):
+    x, y = data
+    forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(x, y)
+    FlatForest.FromRandomForest(forest).Save(export_dir=str(tmp_path))
+    flat = FlatForest.Load(export_dir=str(tmp_path), classes=forest.classes_, feature_names=forest.feature_names_in_)
+    assert isinstance(flat.threshold, np.memmap)
+    np.testing.assert_array_equal(flat.predict_proba(x), forest.predict_proba(x))
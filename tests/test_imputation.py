@@ -0,0 +1,90 @@
+"""
+    MissingValueImputer: the statistics are learned from the train data & every strategy (median, group, chunked knn)
+    fills the missing values of new data with them.
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import KNNImputer
+from data_preprocessing.imputation import MissingValueImputer
+
+
+@pytest.fixture
+def train():
+    return pd.DataFrame({'sex': [0, 0, 0, 1, 1, 1],
+                         'age': [20.0, 30.0, 40.0, 50.0, 60.0, 70.0],
+                         'hours': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+                         'workclass': ['private', 'private', 'state', 'private', 'state', 'state']})
+
+
+def test_median_strategy(train):
+    imputer = MissingValueImputer(strategy='median').fit(train)
+    data = pd.DataFrame({'sex': [0, 1], 'age': [np.nan, 33.0], 'hours': [np.nan, np.nan], 'workclass': [None, 'state']})
+    imputed = imputer.transform(data)
+    assert imputed['age'].tolist() == [45.0, 33.0]
+    assert imputed['hours'].tolist() == [35.0, 35.0]
+    assert imputed['workclass'].tolist() == ['private', 'state'] # mode, the first one on a tie
+    assert data['age'].isna().iloc[0] # the input is not changed
+
+
+def test_nothing_missing_returns_the_data(train):
+    imputer = MissingValueImputer(strategy='median').fit(train)
+    assert imputer.transform(train) is train
+
+
+def test_group_strategy(train):
+    imputer = MissingValueImputer(strategy='group', group_col='sex').fit(train)
+    data = pd.DataFrame({'sex': [0, 1, 2], 'age': [np.nan, np.nan, np.nan], 'hours': [15.0, np.nan, np.nan],
+                         'workclass': ['private'] * 3})
+    imputed = imputer.transform(data)
+    assert imputed['age'].tolist() == [30.0, 60.0, 45.0] # an unseen group falls back to the column median
+    assert imputed['hours'].tolist() == [15.0, 50.0, 35.0]
+
+
+def test_knn_strategy_matches_sklearn_for_any_chunk_size():
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame(rng.normal(size=(300, 4)), columns=['a', 'b', 'c', 'd'])
+    data = pd.DataFrame(rng.normal(size=(50, 4)), columns=train.columns)
+    data = data.mask(rng.random(data.shape) < 0.2)
+    expected = KNNImputer(n_neighbors=3).fit(train.to_numpy()).transform(data.to_numpy())
+    for chunk_size in [1, 7, 10000]:
+        imputer = MissingValueImputer(strategy='knn', n_neighbors=3, chunk_size=chunk_size).fit(train)
+        np.testing.assert_allclose(imputer.transform(data).to_numpy(), expected)
+
+
+def test_knn_strategy_samples_the_reference_rows():
+    train = pd.DataFrame({'a': np.arange(100.0), 'b': np.arange(100.0) * 2})
+    imputer = MissingValueImputer(strategy='knn', max_reference_rows=10).fit(train)
+    assert imputer.reference.shape == (10, 2)
+    imputed = imputer.transform(pd.DataFrame({'a': [np.nan], 'b': [40.0]}))
+    assert not imputed.isna().any().any()
+
+
+@pytest.mark.parametrize('strategy', ['median', 'group', 'knn'])
+def test_transform_array_matches_transform(train, strategy):
+    train = train.drop(columns='workclass')
+    imputer = MissingValueImputer(strategy=strategy, group_col='sex', n_neighbors=2).fit(train)
+    data = pd.DataFrame({'sex': [0.0, 1.0, 1.0], 'age': [np.nan, 33.0, np.nan], 'hours': [np.nan, np.nan, 45.0]})
+    values = data.to_numpy(copy=True)
+    assert imputer.TransformArray(values, list(data.columns)) is values # in place
+    np.testing.assert_allclose(values, imputer.transform(data).to_numpy())
+
+
+def test_knn_reference_columns_must_be_present(train):
+    imputer = MissingValueImputer(strategy='knn').fit(train.drop(columns='workclass'))
+    data = pd.DataFrame({'age': [np.nan, 33.0], 'hours': [15.0, np.nan]}) # no sex column
+    with pytest.raises(ValueError, match=r"reference columns \['sex'\]"):
+        imputer.transform(data)
+    with pytest.raises(ValueError, match=r"reference columns \['sex'\]"):
+        imputer.TransformArray(data.to_numpy(copy=True), list(data.columns))
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        MissingValueImputer(strategy='mean')
+    with pytest.raises(ValueError):
+        MissingValueImputer(strategy='group')
+    with pytest.raises(ValueError):
+        MissingValueImputer().transform(pd.DataFrame({'a': [np.nan]}))
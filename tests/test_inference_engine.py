@@ -0,0 +1,62 @@
+"""
+    InferenceEngine: the memory-mapped export (mappedArtifacts) scores exactly like the pickled artifacts, and a
+    missing training gives a clear error.
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+import utils.common_utils as common_utils
+from inference_engine.inferenceEngine import InferenceEngine
+from training_features_engineering.featureEngineering import FeaturesTransformer
+
+
+def write_config(tmp_path, name, **sections):
+    with open('params.yaml') as f:
+        config = yaml.safe_load(f)
+    for section, settings in sections.items():
+        config[section].update(settings)
+    config_path = tmp_path / name
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return str(config_path)
+
+
+def test_mmap_and_pickle_artifacts_give_identical_scores(in_trained_project, tmp_path):
+    data = pd.read_csv('DATA/adult_new.csv', nrows=1000)
+    mapped = InferenceEngine(config_path=write_config(tmp_path, 'mmap.yaml', inference={'artifact_format': 'mmap'}))
+    pickled = InferenceEngine(config_path=write_config(tmp_path, 'pickle.yaml', inference={'artifact_format': 'pickle'}))
+    assert (mapped.artifact_format, pickled.artifact_format) == ('mmap', 'pickle')
+    pd.testing.assert_frame_equal(mapped.transform(data), pickled.transform(data))
+    np.testing.assert_allclose(mapped.predict_proba(data), pickled.predict_proba(data), rtol=0, atol=1e-6)
+    assert (mapped.predict(data) == pickled.predict(data)).all()
+
+
+def test_mmap_artifacts_dont_unpickle_the_lookup_tables(in_trained_project, tmp_path, monkeypatch):
+    loaded = []
+    load_model_file = common_utils.load_model_file
+    monkeypatch.setattr(common_utils, 'load_model_file', lambda model_path: loaded.append(model_path) or load_model_file(model_path))
+    engine = InferenceEngine(config_path=write_config(tmp_path, 'mmap.yaml', inference={'artifact_format': 'mmap'}))
+    assert engine.artifact_format == 'mmap'
+    assert loaded == [f"{engine.mmap_dir}/pipeline_steps.sav"] # never the full pipeline.sav
+    assert load_model_file(loaded[0]).encoder is None
+    assert engine.pipeline.encoder.mean_maps # rebuilt from the memory-mapped tables
+
+
+def test_features_transformer_state_round_trip(in_trained_project):
+    engine = InferenceEngine(config_path='params.yaml')
+    state = engine.features_transformer.ToState()
+    data = pd.read_csv('DATA/adult_new.csv', nrows=100)
+    pd.testing.assert_frame_equal(FeaturesTransformer.FromState(state).transform(data),
+                                  engine.features_transformer.transform(data))
+    with pytest.raises(ValueError, match='missing'):
+        FeaturesTransformer.FromState({name: value for name, value in state.items() if name != 'prior'})
+
+
+def test_missing_training_gives_a_clear_error(in_trained_project, tmp_path):
+    config_path = write_config(tmp_path, 'params.yaml', inference={'artifact_format': 'pickle'},
+                               model={'pipeline_path': str(tmp_path / 'missing.sav')})
+    with pytest.raises(FileNotFoundError, match='run the training first'):
+        InferenceEngine(config_path=config_path)
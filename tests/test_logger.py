@@ -0,0 +1,95 @@
+"""
+    App_Logger: the records are queued & written as json lines by one background writer per process, flushed on exit
+    (also by the worker processes) & the writer is restarted in a forked child.
+
+    Run from the project root:  python -m pytest tests
+"""
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import application_logs.logger as logger_module
+from application_logs.logger import App_Logger
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def log_and_exit(path, message):
+    logger = App_Logger()
+    logger.log(logger.open(path), message) # not flushed, the worker process exit flushes it
+
+
+def test_queue_writes_every_record_in_order(tmp_path):
+    logger = App_Logger()
+    paths = [str(tmp_path / 'a.jsonl'), str(tmp_path / 'sub' / 'b.jsonl')]
+
+    def worker(thread_id):
+        for i in range(200):
+            logger.log(logger.open(paths[i % 2]), f"{thread_id}-{i}", level='DEBUG' if i % 3 else 'INFO')
+
+    threads = [threading.Thread(target=worker, args=(thread_id,)) for thread_id in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.flush()
+    for j, path in enumerate(paths):
+        records = read_records(path)
+        assert len(records) == 400
+        assert {record['pid'] for record in records} == {os.getpid()}
+        for thread_id in range(4): # the order of each thread is kept
+            messages = [record['message'] for record in records if record['message'].startswith(f"{thread_id}-")]
+            assert messages == [f"{thread_id}-{i}" for i in range(j, 200, 2)]
+
+
+def test_flush_on_exit(tmp_path):
+    path = str(tmp_path / 'exit.jsonl')
+    code = f"from tests.test_logger import log_and_exit; log_and_exit({path!r}, 'bye')"
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.getcwd())
+    assert [record['message'] for record in read_records(path)] == ['bye']
+
+
+def test_flush_on_worker_process_exit(tmp_path):
+    path = str(tmp_path / 'worker.jsonl')
+    for method in ['fork', 'spawn']:
+        process = multiprocessing.get_context(method).Process(target=log_and_exit, args=(path, method))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+    assert [record['message'] for record in read_records(path)] == ['fork', 'spawn']
+
+
+def test_writer_reset_after_fork(tmp_path):
+    path = str(tmp_path / 'fork.jsonl')
+    logger = App_Logger()
+    logger.log(logger.open(path), 'parent')
+    logger.flush() # the parent writer is running
+    pid = os.fork()
+    if pid == 0: # child: a new writer is started on the first record
+        status = 0 if logger_module._writer is None else 1
+        logger.log(logger.open(path), 'child')
+        logger.flush()
+        os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    records = read_records(path)
+    assert [record['message'] for record in records] == ['parent', 'child']
+    assert records[1]['pid'] == pid
+
+
+def test_writer_error_is_logged_and_the_writer_keeps_running(tmp_path, caplog):
+    logger = App_Logger()
+    with caplog.at_level(logging.ERROR, logger=logger_module.__name__):
+        logger.log(logger.open(str(tmp_path)), 'a directory is not a log file')
+        logger.flush()
+    assert any('log writer error' in record.getMessage() for record in caplog.records)
+    path = str(tmp_path / 'after.jsonl')
+    logger.log(logger.open(path), 'still running')
+    logger.flush()
+    assert [record['message'] for record in read_records(path)] == ['still running']
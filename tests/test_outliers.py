@@ -0,0 +1,52 @@
+"""
+    ZScoreOutliers: the outliers are the values with |z| >= threshold, the same positions as scipy.stats.zscore, for
+    every policy (clip, drop & flag).
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from data_preprocessing.outliers import ZScoreOutliers
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'age': np.r_[rng.normal(40, 10, 198), [120.0, -30.0]],
+                         'gain': np.r_[rng.exponential(500, 198), [20000.0, 0.0]],
+                         'boundary': [0.0] * 9 * 20 + [10.0] * 20, # mean 1, std 3: |z| of 10 is exactly 3
+                         'constant': 5.0,
+                         'outcome': rng.integers(0, 2, 200)})
+
+
+def scipy_mask(data, cols, threshold=3):
+    return np.column_stack([np.nan_to_num(np.abs(stats.zscore(data[col])), nan=0.0) >= threshold for col in cols])
+
+
+@pytest.mark.parametrize('policy', ['clip', 'drop', 'flag'])
+def test_mask_matches_scipy(data, policy):
+    outliers = ZScoreOutliers(threshold=3, policy=policy)
+    transformed = outliers.fit_transform(data, exclude_cols=['outcome'])
+    assert outliers.cols == ['age', 'gain', 'boundary', 'constant']
+    expected = scipy_mask(data, outliers.cols)
+    np.testing.assert_array_equal(outliers.Mask(data), expected)
+    assert expected[:, outliers.cols.index('boundary')].any() # the |z| == 3 values are outliers
+
+    outlier_rows = expected.any(axis=1)
+    if policy == 'clip':
+        changed = (transformed[outliers.cols] != data[outliers.cols]).to_numpy()
+        at_limit = np.isclose(np.abs(stats.zscore(data[outliers.cols])), 3) # |z| == 3 is an outlier, already at the limit
+        np.testing.assert_array_equal(changed, expected & ~at_limit)
+    elif policy == 'drop':
+        pd.testing.assert_frame_equal(transformed, data[~outlier_rows])
+        pd.testing.assert_frame_equal(outliers.transform(data), data) # the new data is never dropped
+    else:
+        np.testing.assert_array_equal(transformed['is_outlier'].to_numpy(), outlier_rows.astype(np.int8))
+
+
+def test_missing_values_are_never_outliers(data):
+    outliers = ZScoreOutliers(threshold=3, policy='none').fit(data, exclude_cols=['outcome'])
+    missing = data.assign(age=np.nan)
+    assert not outliers.Mask(missing)[:, 0].any()
@@ -0,0 +1,62 @@
+"""
+    PreprocessingPipeline.TransformArray (the array path of the inference) must give the model input of transform
+    (the frame path) for every imputation strategy & scaling setting.
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+import utils.common_utils as common_utils
+from data_preprocessing.imputation import MissingValueImputer
+from data_preprocessing.pipeline import PreprocessingPipeline
+from data_preprocessing.rebalancing import Rebalancer
+
+DATA_PATH = 'DATA/adult_new.csv'
+CONFIG_PATH = 'params.yaml'
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return common_utils.to_categorical(pd.read_csv(DATA_PATH, sep=','))
+
+
+@pytest.fixture(scope='module')
+def batch(raw):
+    """
+        raw rows with 10% of the age, capital-gain & hours-per-week values missing
+    """
+    data = raw.sample(n=3000, random_state=1).reset_index(drop=True)
+    rng = np.random.default_rng(0)
+    for col in ['age', 'capital-gain', 'hours-per-week']:
+        data[col] = data[col].astype(np.float64)
+        data.loc[rng.random(len(data)) < 0.1, col] = np.nan
+    return data
+
+
+def fit_pipeline(tmp_path, raw, strategy, scaling):
+    config = common_utils.read_params(CONFIG_PATH)
+    config['preProcessing']['imputation']['strategy'] = strategy
+    config['features_eng']['scaling'].update(scaling)
+    config_path = tmp_path / 'params.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    pipeline = PreprocessingPipeline(config_path=str(config_path))
+    pipeline.rebalancer = Rebalancer(strategy='none')
+    return pipeline.fit(raw)
+
+
+@pytest.mark.parametrize('strategy', MissingValueImputer.strategies)
+@pytest.mark.parametrize('scaling', [{'enabled': False},
+                                     {'enabled': True, 'cols': None, 'dtype': 'float32'},
+                                     {'enabled': True, 'cols': None, 'dtype': 'float64'},
+                                     {'enabled': True, 'cols': ['age', 'hours-per-week'], 'dtype': 'float32'}],
+                         ids=['no_scaling', 'float32', 'float64', 'float32_some_cols'])
+def test_transform_array_equals_transform(tmp_path, raw, batch, strategy, scaling):
+    pipeline = fit_pipeline(tmp_path, raw, strategy, scaling)
+    cols = pipeline.feature_cols
+    array = pipeline.TransformArray(batch, cols=cols)
+    frame = pipeline.transform(batch)[cols].to_numpy(dtype=array.dtype)
+    assert not np.isnan(array).any()
+    np.testing.assert_array_equal(array, frame)
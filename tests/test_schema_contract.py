@@ -0,0 +1,94 @@
+"""
+    SchemaContract: the schema is learned from the train data, the incoming rows which break it are quarantined with
+    all their reject reasons & the good rows go on converted to the train dtypes.
+
+    Run from the project root:  python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from utils.schema_contract import SchemaContract
+
+
+@pytest.fixture
+def train():
+    return pd.DataFrame({'age': [20, 30, 40, 50, 60], 'hours': [10.0, 20.0, 30.0, 40.0, 50.0],
+                         'sex': ['Male', 'Female', 'Male', 'Female', 'Male'],
+                         'salary': ['<=50K', '>50K', '<=50K', '>50K', '<=50K']})
+
+
+@pytest.fixture
+def schema(train):
+    return SchemaContract(range_margin=0.1).fit(train, ycol='salary')
+
+
+def test_fit(schema):
+    assert schema.columns == ['age', 'hours', 'sex']
+    assert schema.optional_cols == ['salary']
+    assert schema.ranges == {'age': [20.0, 60.0], 'hours': [10.0, 50.0]}
+    assert schema.vocabularies == {'sex': ['Female', 'Male'], 'salary': ['<=50K', '>50K']}
+    assert schema.Limits('age') == pytest.approx((16.0, 64.0))
+
+
+def test_clean_batch_is_not_copied(schema, train):
+    data = train.drop(columns='salary')
+    valid, rejects = schema.Validate(data)
+    assert valid is data and len(rejects) == 0
+    assert list(rejects.columns) == ['age', 'hours', 'sex', 'reject_reason']
+
+
+def test_missing_column_rejects_every_row(schema, train):
+    valid, rejects = schema.Validate(train.drop(columns='hours'))
+    assert len(valid) == 0
+    assert rejects['reject_reason'].tolist() == ["missing columns ['hours']"] * 5
+
+
+def test_non_numeric_value(schema):
+    data = pd.DataFrame({'age': ['25', 'abc', None], 'hours': [15.0, 15.0, 15.0], 'sex': ['Male'] * 3})
+    valid, rejects = schema.Validate(data)
+    assert rejects['reject_reason'].tolist() == ['age: not a number']
+    assert rejects['age'].tolist() == ['abc'] # as received
+    assert valid['age'].iloc[0] == 25 and np.isnan(valid['age'].iloc[1]) # converted, a missing value is allowed
+    assert pd.api.types.is_numeric_dtype(valid['age'])
+
+
+def test_converted_column_gets_the_train_dtype(schema):
+    valid, _ = schema.Validate(pd.DataFrame({'age': ['25', '35'], 'hours': [15.0, 15.0], 'sex': ['Male'] * 2}))
+    assert valid['age'].dtype == np.int64
+
+
+def test_unknown_category(schema):
+    data = pd.DataFrame({'age': [25, 25], 'hours': [15.0, 15.0], 'sex': ['Male', 'Other'], 'salary': ['>50K', '>60K']})
+    valid, rejects = schema.Validate(data)
+    assert len(valid) == 1
+    assert rejects['reject_reason'].tolist() == ['sex: unknown category; salary: unknown category']
+
+
+def test_out_of_range(schema):
+    data = pd.DataFrame({'age': [16, 15, 64, 65], 'hours': [15.0] * 4, 'sex': ['Male'] * 4}) # accepted: [16, 64]
+    valid, rejects = schema.Validate(data)
+    assert valid['age'].tolist() == [16, 64]
+    assert rejects['age'].tolist() == [15, 65]
+    assert rejects['reject_reason'].tolist() == ['age: out of range [16, 64]'] * 2
+
+
+def test_combined_reject_reasons():
+    data = pd.DataFrame({'age': ['abc', '1000', '30', '30'], 'hours': [15.0, 1000.0, 15.0, None],
+                         'sex': ['Male', 'Other', 'Male', None]})
+    strict = SchemaContract(range_margin=0.1, allow_nulls=False).fit(pd.DataFrame(
+        {'age': [20, 60], 'hours': [10.0, 50.0], 'sex': ['Male', 'Female']}))
+    valid, rejects = strict.Validate(data)
+    assert len(valid) == 1
+    assert rejects['reject_reason'].tolist() == [
+        'age: not a number',
+        'age: out of range [16, 64]; hours: out of range [6, 54]; sex: unknown category',
+        'hours: missing value; sex: missing value']
+
+
+def test_save_load_round_trip(schema, tmp_path):
+    schema.Save(schema_path=str(tmp_path / 'schema.json'))
+    loaded = SchemaContract.Load(schema_path=str(tmp_path / 'schema.json'))
+    assert vars(loaded) == vars(schema)
+    data = pd.DataFrame({'age': [25, 99], 'hours': [15.0, 15.0], 'sex': ['Male', 'Other']})
+    for expected, result in zip(schema.Validate(data), loaded.Validate(data)):
+        pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,96 @@
+"""
+    StageCache: a stage output is reused only if the inputs, the params & the code version are unchanged, the least
+    recently used outputs are removed above max_size_mb.
+
+    Run from the project root:  python -m pytest tests
+"""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+import utils.common_utils as common_utils
+from utils.stage_cache import StageCache
+
+CONFIG_PATH = 'params.yaml'
+
+
+def make_cache(tmp_path, max_size_mb=1024, enabled=True):
+    config = common_utils.read_params(CONFIG_PATH)
+    config['stage_cache'] = {'enabled': enabled, 'cache_dir': str(tmp_path / 'stages'), 'max_size_mb': max_size_mb}
+    config['execution_logs']['training']['log_files']['model_training'] = str(tmp_path / 'model_training.txt')
+    config_path = tmp_path / 'params.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return StageCache(config_path=str(config_path))
+
+
+class Counter:
+    """
+        compute function which counts its calls
+    """
+    def __init__(self, output=None):
+        self.calls = 0
+        self.output = output
+
+    def __call__(self):
+        self.calls += 1
+        return self.output if self.output is not None else self.calls
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({'age': [39, 50, 38], 'sex': ['male', 'female', 'male']})
+
+
+def test_hit(tmp_path, data):
+    cache, compute = make_cache(tmp_path), Counter()
+    first = cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 1}, code='v1', compute=compute)
+    second = cache.GetOrCompute(stage='stage', inputs=[data.copy()], params={'a': 1}, code='v1', compute=compute)
+    assert compute.calls == 1
+    assert first == second == 1
+
+
+def test_miss_on_changed_param(tmp_path, data):
+    cache, compute = make_cache(tmp_path), Counter()
+    cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 1}, code='v1', compute=compute)
+    assert cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 2}, code='v1', compute=compute) == 2
+
+
+def test_miss_on_changed_code_version(tmp_path, data):
+    cache, compute = make_cache(tmp_path), Counter()
+    cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 1}, code='v1', compute=compute)
+    assert cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 1}, code='v2', compute=compute) == 2
+
+
+def test_miss_on_changed_input(tmp_path, data):
+    cache, compute = make_cache(tmp_path), Counter()
+    cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 1}, code='v1', compute=compute)
+    changed = data.assign(age=data['age'] + 1)
+    assert cache.GetOrCompute(stage='stage', inputs=[changed], params={'a': 1}, code='v1', compute=compute) == 2
+
+
+def test_disabled_cache_always_computes(tmp_path, data):
+    cache, compute = make_cache(tmp_path, enabled=False), Counter()
+    for _ in range(2):
+        cache.GetOrCompute(stage='stage', inputs=[data], params={'a': 1}, code='v1', compute=compute)
+    assert compute.calls == 2
+    assert not os.path.exists(tmp_path / 'stages')
+
+
+def test_eviction_by_size(tmp_path, data):
+    output = np.zeros(1000) # ~8 KB pickled, the cache holds two outputs
+    cache = make_cache(tmp_path, max_size_mb=20 / 1024)
+    path = lambda code: tmp_path / 'stages' / f"stage-{cache.GetKey(stage='stage', inputs=[data], params={}, code=code)}.pkl"
+    compute = Counter(output)
+    put = lambda code: cache.GetOrCompute(stage='stage', inputs=[data], params={}, code=code, compute=compute)
+    put('v1')
+    os.utime(path('v1'), (1000, 1000))
+    put('v2')
+    os.utime(path('v2'), (2000, 2000))
+    assert path('v1').exists() and path('v2').exists()
+
+    put('v1') # hit, v1 becomes the most recently used
+    assert compute.calls == 2
+    put('v3') # over the size, the least recently used (v2) is removed
+    assert path('v1').exists() and path('v3').exists() and not path('v2').exists()
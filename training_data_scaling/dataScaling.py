@@ -1,4 +1,5 @@
-from sklearn.preprocessing import StandardScaler
+import numpy as np
+import pandas as pd
 from application_logs.logger import App_Logger
 import utils.common_utils as common_utils
 
@@ -10,32 +11,149 @@ class DataScaling:
         Written By: Dibyendu Biswas.\n\n
         Version: 0.0.1\n\n
     """
+    log_section = 'training' # section of execution_logs where the details are logged
+
     def __init__(self, config_path:str):
         self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
-        self.file_path = self.config['execution_logs']['training']['log_files']['data_scaling'] # this file path help to log the details
+        self.file_path = self.config['execution_logs'][self.log_section]['log_files']['data_scaling'] # this file path help to log the details
         self.logger = App_Logger() # call the App_Logger() to log the details
 
-    def Standarization(self, data):
+    def Standarization(self, data, exclude_cols=()):
         """
             **Method Name:** Standarization\n
-            **Description:** This method helps to standarized the data\n
+            **Description:** This method helps to standarized the train data, the fitted scaler (train mean & std) is
+                             kept in self.scaler to transform the test/predection data\n
             **Output:** data\n
             **On Failure:** Raise Error.\n
 
             :param data: train.csv
+            :param exclude_cols: columns never scaled (like the output column)
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
-            self.stadarize = StandardScaler() # apply the standarization
-            self.scaled_data = self.stadarize.fit_transform(self.data)
-            self.logger.log(self.file, f"Standarized the data using StandardScaler() technique")
+            self.scaler = Standardizer() # learn the mean & std of the numeric columns
+            self.scaled_data = self.scaler.fit(self.data, exclude_cols=exclude_cols).transform(self.data)
+            self.logger.log(self.file, f"Standarized the data of {self.scaler.cols} columns with the train mean & std")
             self.file.close()
             return self.scaled_data # return the scaled data, where std:1, mean:0
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
-            raise ex
\ No newline at end of file
+            raise ex
+
+
+class Standardizer:
+    """
+        This class shall be used to learn the mean & std of the numeric columns from the train data once, and
+        standardize the train/test/predection data with them ((x - mean) / std, a constant column keeps std 1).
+        The arrays are transformed in place (float32 or float64), and the scaling can be fused with the encoding
+        step (see FeaturesTransformer.transform): the lookup tables are scaled once per category & the numeric
+        columns are scaled while they are written.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, cols=None, dtype='float64'):
+        self.cols = cols # numeric columns, None: all the numeric columns seen at fit time
+        self.dtype = np.dtype(dtype).name # float32 or float64 output
+        self.means = None # per column mean, learned from train data
+        self.scales = None # per column std (ddof=0, like StandardScaler), learned from train data
+
+    def fit(self, data, exclude_cols=()):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn the means & stds of the numeric columns in one numpy pass\n
+            **Output:** fitted scaler\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data
+            :param exclude_cols: columns never scaled (like the output column)
+            :return: fitted scaler
+        """
+        if self.cols is None:
+            self.cols = [col for col in data.select_dtypes(include='number').columns if col not in exclude_cols]
+        values = data[self.cols].to_numpy(dtype=np.float64)
+        self.means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0)
+        self.scales = np.where(stds > 0, stds, 1.0)
+        return self
+
+    def TransformArray(self, values, out=None):
+        """
+            **Method Name:** TransformArray\n
+            **Description:** This method helps to standardize a float32/float64 array (columns in the fitted order)
+                             without a temporary array, in place unless out is given\n
+            **Output:** scaled array\n
+            **On Failure:** Raise Error.\n
+
+            :param values: 2-D array (rows x fitted columns)
+            :param out: output array (default: values)
+            :return: scaled array
+        """
+        if self.means is None:
+            raise ValueError("Standardizer is not fitted yet, call fit() first")
+        out = values if out is None else out
+        np.subtract(values, self.means.astype(out.dtype), out=out)
+        np.divide(out, self.scales.astype(out.dtype), out=out)
+        return out
+
+    def ScaleColumn(self, col, values):
+        """
+            **Method Name:** ScaleColumn\n
+            **Description:** This method helps to standardize one column in place (fused stages)\n
+            **Output:** scaled values\n
+            **On Failure:** Raise Error.\n
+
+            :param col: fitted column
+            :param values: float array of the column
+            :return: scaled values
+        """
+        i = self.cols.index(col)
+        np.subtract(values, values.dtype.type(self.means[i]), out=values)
+        np.divide(values, values.dtype.type(self.scales[i]), out=values)
+        return values
+
+    def ScaleTable(self, col, table):
+        """
+            **Method Name:** ScaleTable\n
+            **Description:** This method helps to standardize a lookup table (once per category), so the encoding gathers
+                             scaled values\n
+            **Output:** scaled lookup table\n
+            **On Failure:** Raise Error.\n
+
+            :param col: fitted column (encoded column name)
+            :param table: lookup table (pandas Series)
+            :return: scaled lookup table
+        """
+        return pd.Series(self.ScaleColumn(col, table.to_numpy(dtype=self.dtype, copy=True)), index=table.index)
+
+    def transform(self, data):
+        """
+            **Method Name:** transform\n
+            **Description:** This method helps to standardize the fitted columns of a dataframe, the columns are copied
+                             once into a float block & scaled in place\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: data with the fitted columns
+            :return: data
+        """
+        values = self.TransformArray(data[self.cols].to_numpy(dtype=self.dtype, copy=True))
+        return data.assign(**{col: values[:, i] for i, col in enumerate(self.cols)})
+
+    def fit_transform(self, data, exclude_cols=()):
+        """
+            **Method Name:** fit_transform\n
+            **Description:** This method helps to learn the statistics & standardize the train data\n
+            **Output:** data\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data
+            :param exclude_cols: columns never scaled (like the output column)
+            :return: data
+        """
+        return self.fit(data, exclude_cols=exclude_cols).transform(data)
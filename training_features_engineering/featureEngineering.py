@@ -1,9 +1,9 @@
 import numpy as np
 import pandas as pd
-from scipy import stats
-from imblearn.over_sampling import BorderlineSMOTE
 from application_logs.logger import App_Logger
 import utils.common_utils as common_utils
+from data_preprocessing.outliers import ZScoreOutliers
+from data_preprocessing.rebalancing import Rebalancer
 
 
 class FeaturesEngineering:
@@ -13,16 +13,19 @@ class FeaturesEngineering:
         Written By: Dibyendu Biswas.\n\n
         Version: 0.0.1\n\n
     """
+    log_section = 'training' # section of execution_logs where the details are logged
+
     def __init__(self, config_path:str):
         self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
-        self.file_path = self.config['execution_logs']['training']['log_files']['features_engineering'] # this file path help to log the details
+        self.file_path = self.config['execution_logs'][self.log_section]['log_files']['features_engineering'] # this file path help to log the details
         self.logger = App_Logger() # call the App_Logger() to log the details
 
     def ToHandleImbalancedData(self, data, ycol:str):
         """
             **Method Name:** ToHandleImbalancedData\n
             **Description:** This method helps to handle the imbalanced data.
-                         Here, we use Borderline-SMOTE to handle the imbalance data.\n
+                         The strategy (class weights, random over/under-sampling, SMOTE or Borderline-SMOTE) is
+                         selected in params.yaml, under features_eng.rebalancing.\n
             **Output:** data (after balance).\n
             **On Failure:** Raise Error.\n
 
@@ -31,23 +34,22 @@ class FeaturesEngineering:
         :return: balanced data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data # mention the train.csv file
             self.output_col = ycol # mention the output_col
             self.random_state = self.config['base']['random_state']
-            self.bsmote = BorderlineSMOTE(random_state=self.random_state,
-                                          kind='borderline-1')  # use BorderLine SMOTE to oversample the data
-            self.X = self.data.drop(axis=1, columns=[self.output_col])  # drop the output columns
-            self.Y = data[self.output_col]
-            self.x, self.y = self.bsmote.fit_resample(self.X, self.Y)
-            self.data = self.x
-            self.data[self.output_col] = pd.DataFrame(self.y, columns=[self.output_col])
-            self.logger.log(self.file, "Handle the imbalanced data using Borderline-SMOTE")
+            self.rebalancing = self.config['features_eng']['rebalancing'] # get the rebalancing details
+            self.rebalancer = Rebalancer(strategy=self.rebalancing['strategy'], neighbors=self.rebalancing['neighbors'],
+                                         k_neighbors=self.rebalancing['k_neighbors'], m_neighbors=self.rebalancing['m_neighbors'],
+                                         max_reference_rows=self.rebalancing['max_reference_rows'], n_jobs=self.rebalancing['n_jobs'],
+                                         random_state=self.random_state, trace_memory=self.rebalancing['trace_memory'])
+            self.data = self.rebalancer.fit_resample(data=self.data, ycol=self.output_col)
+            self.logger.log(self.file, f"Handle the imbalanced data, {self.rebalancer.report}")
             self.file.close()
-            return self.data  # return data (with features & label/output) after oversampling
+            return self.data  # return data (with features & label/output) after rebalance
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -55,7 +57,7 @@ class FeaturesEngineering:
     def ToHandleOutliers(self, data, col:str, threshold=3):
         """
             **Method Name:** ToHandleOutliers\n
-            **Description:** This method helps to handle the outliers using Z-Score.\n
+            **Description:** This method helps to handle the outliers using Z-Score, the outliers become missing values.\n
             **Output:** data (after removing the outliers)\n
             **On Failure:** Raise Error.\n
 
@@ -65,20 +67,19 @@ class FeaturesEngineering:
             :return: data (without outliers)
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data # mention the train.csv data
             self.col = col # mention the column/columns
             self.threshold = threshold # bydefault we set the threshold value, i.e. 3
-            self.z_score = np.abs(stats.zscore(self.data[self.col]))  # to apply the Z-Score to handle the outliers
-            self.not_outliers_index = np.where(pd.DataFrame(self.z_score) < self.threshold)[0]  # get the indexes where outliers are not present or ignore outliers indexes
-            self.data[self.col] = pd.DataFrame(self.data[self.col]).iloc[
-                self.not_outliers_index]  # get the data without outliers
+            self.cols = [self.col] if isinstance(self.col, str) else list(self.col)
+            self.outliers_mask = ZScoreOutliers(threshold=self.threshold, policy='none', cols=self.cols).fit(self.data).Mask(self.data) # all the columns in one pass
+            self.data[self.cols] = self.data[self.cols].mask(self.outliers_mask) # the outliers become missing values
             self.logger.log(self.file, f"Successfully remove the outliers from data {self.col}")
             self.file.close()
             return self.data[self.col]  # return the data without outliers.
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -94,7 +95,7 @@ class FeaturesEngineering:
             :return: data (after removing the duplicate values)
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.logger.log(self.file, f"Before drop the duplicates values, the shape of data is {self.data.shape}")
             self.data = self.data.drop_duplicates()  # simple drop the duplicates values from the given dataset
@@ -104,7 +105,7 @@ class FeaturesEngineering:
             return self.data # return the data after removing the duplicate values.
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -123,7 +124,7 @@ class FeaturesEngineering:
             :return: cleaned data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.xcols = xcols
             if self.xcols is None:
@@ -146,7 +147,7 @@ class FeaturesEngineering:
             return self.data # return the cleaned data
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -163,17 +164,17 @@ class FeaturesEngineering:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.col = col
             self.mapdct = mapdct
-            self.data[self.col] = self.data[self.col].map(mapdct)
+            self.data[self.col] = FeaturesTransformer.Lookup(self.data[self.col], self.mapdct) # gather on the integer codes
             self.logger.log(self.file, "successfully apply the Label Encoding technique")
             self.file.close()
             return self.data # return data after apply label encoding.
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -191,20 +192,21 @@ class FeaturesEngineering:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.cols = cols
             self.output_col = ycol
+            encoded = {}
             for self.col in self.cols:
-                mean_nominal = self.data.groupby([self.col])[self.output_col].mean().to_dict()
-                data[self.col + '_mean_encoding'] = self.data[self.col].map(mean_nominal)
+                mean_nominal = self.data.groupby(self.col, observed=True)[self.output_col].mean() # mean per category
+                encoded[self.col + '_mean_encoding'] = FeaturesTransformer.Lookup(self.data[self.col], mean_nominal)
                 self.logger.log(self.file, f"Applying the mean encoding on column {self.col}")
-                data.drop(axis=1, columns=self.col, inplace=True)
+            self.data = self.data.drop(columns=self.cols).assign(**encoded) # the columns are dropped once, not one by one
             self.file.close()
             return self.data
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -221,7 +223,7 @@ class FeaturesEngineering:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.data = pd.get_dummies(self.data, drop_first=True) # applyt the onehot encosing
             self.logger.log(self.file, "Applying the onehot encoding")
@@ -229,7 +231,7 @@ class FeaturesEngineering:
             return self.data
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -246,7 +248,7 @@ class FeaturesEngineering:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.cols = cols
             for self.col in self.cols:
@@ -256,7 +258,237 @@ class FeaturesEngineering:
             return self.data
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
-            raise ex
\ No newline at end of file
+            raise ex
+
+
+class FeaturesTransformer:
+    """
+        This class shall be used for learn the features engineering steps (label encoding, mean encoding &
+        zero value replacement) from the train data once, and apply the same mapping to the test/predection data.
+        The label & mean encodings are lookup tables (pandas Series) indexed by the train vocabulary, the categorical
+        columns are encoded with a gather on their integer codes.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    STATE = ['features_eng', 'output_col', 'label_maps', 'mean_encoding_cols', 'replace_zero_values_cols', 'input_cols',
+             'mean_maps', 'prior', 'zero_means'] # everything the transformer needs after fit, see ToState & FromState
+
+    def __init__(self, config_path:str):
+        config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form (not kept, the transformer is pickled)
+        self.features_eng = config['features_eng'] # get the features engineering details
+        self.output_col = config['data']['output_col'] # get the output column
+        self.label_maps = {params['col']: pd.Series(params[f"mapdct_{name}"])
+                           for name, params in self.features_eng['label_encoding'].items()} # {column: label per category}
+        self.mean_encoding_cols = self.features_eng['mean_encoding']['mean_encoding_cols'] # mean encoding columns
+        self.replace_zero_values_cols = self.features_eng['replace_zero_values_cols'] # columns where zero value is present
+        self.input_cols = [] # raw columns (without output column) expected by the transformer, learned from train data
+        self.mean_maps = {} # {column: mean of output column per category}, learned from train data (the train vocabulary)
+        self.prior = None # mean of the output column, used for unseen categories
+        self.zero_means = {} # {column: mean value}, learned from train data
+
+    def fit(self, data):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn the mean encoding & zero replacement values from train data\n
+            **Output:** fitted transformer\n
+            **On Failure:** Raise Error\n
+
+            :param data: train.csv (with output column)
+            :return: fitted transformer
+        """
+        y = self.Lookup(data[self.output_col], self.label_maps[self.output_col]) if self.output_col in self.label_maps \
+            else data[self.output_col] # encoded output column
+        self.input_cols = [col for col in data.columns if col != self.output_col]
+        self.prior = float(y.mean())
+        self.mean_maps = {col: self._Table(y.groupby(data[col], observed=True).mean()) for col in self.mean_encoding_cols}
+        self.zero_means = {col: float(data[col].mean()) for col in self.replace_zero_values_cols}
+        return self
+
+    def transform(self, data, scaler=None):
+        """
+            **Method Name:** transform\n
+            **Description:** This method helps to apply the learned encodings on the data using the lookup tables,
+                             output column is optional. With a fitted scaler the standardization is fused with the
+                             encoding: the lookup tables are scaled once per category & the numeric columns are scaled
+                             while the zero values are replaced, so no scaled copy of the frame is made afterwards.\n
+            **Output:** data\n
+            **On Failure:** Raise Error\n
+
+            :param data: train.csv, test.csv or predection data
+            :param scaler: fitted Standardizer (optional), learned on the encoded train data
+            :return: data
+        """
+        if self.prior is None:
+            raise ValueError("FeaturesTransformer is not fitted yet, call fit() first")
+        scaled_cols = set(scaler.cols) if scaler is not None else set()
+        encoded = {}
+        for col, table in self.label_maps.items(): # label encoding
+            if col in data:
+                table = scaler.ScaleTable(col, self._Table(table)) if col in scaled_cols else table
+                encoded[col] = self.Lookup(data[col], table)
+        for col, means in self.zero_means.items():
+            if col in scaled_cols: # replace the zero with train mean & scale, in one float array
+                values = data[col].to_numpy(dtype=scaler.dtype, copy=True)
+                values[values == 0] = means
+                encoded[col] = pd.Series(scaler.ScaleColumn(col, values), index=data.index, name=col)
+            else:
+                encoded[col] = data[col].replace(0, means) # replace the zero with train mean
+        mean_encoded = {}
+        for col in self.mean_encoding_cols: # unseen categories get the train prior
+            name = col + '_mean_encoding'
+            if name in scaled_cols:
+                table = scaler.ScaleTable(name, self._Table(self.mean_maps[col]))
+                prior = scaler.ScaleColumn(name, np.array([self.prior], dtype=scaler.dtype))[0]
+                mean_encoded[name] = self.Lookup(data[col], table, default=prior)
+            else:
+                mean_encoded[name] = self.Lookup(data[col], self.mean_maps[col], default=self.prior).astype(float)
+        for col in scaled_cols.difference(encoded, mean_encoded).intersection(data.columns): # other scaled numeric columns
+            encoded[col] = pd.Series(scaler.ScaleColumn(col, data[col].to_numpy(dtype=scaler.dtype, copy=True)), index=data.index, name=col)
+        data = data.drop(columns=self.mean_encoding_cols).assign(**encoded)
+        return pd.concat([data, pd.DataFrame(mean_encoded, index=data.index)], axis=1)
+
+    def fit_transform(self, data):
+        """
+            **Method Name:** fit_transform\n
+            **Description:** This method helps to fit the transformer & transform the train data\n
+            **Output:** data\n
+            **On Failure:** Raise Error\n
+
+            :param data: train.csv
+            :return: data
+        """
+        return self.fit(data).transform(data)
+
+    def ToState(self):
+        """
+            **Method Name:** ToState\n
+            **Description:** This method helps to get the fitted state of the transformer (settings & lookup tables),
+                             so it can be exported without pickling the object\n
+            **Output:** state\n
+            **On Failure:** Raise Error\n
+
+            :return: state ({attribute: value})
+        """
+        return {name: getattr(self, name) for name in self.STATE}
+
+    @classmethod
+    def FromState(cls, state:dict):
+        """
+            **Method Name:** FromState\n
+            **Description:** This method helps to restore a fitted transformer from the state given by ToState (the
+                             lookup tables may be any mapping with a .get, e.g. memory-mapped pandas Series)\n
+            **Output:** fitted transformer\n
+            **On Failure:** Raise Error\n
+
+            :param state: state ({attribute: value})
+            :return: fitted transformer
+        """
+        if set(state) != set(cls.STATE):
+            raise ValueError(f"FeaturesTransformer state mismatch, missing: {sorted(set(cls.STATE) - set(state))}, "
+                             f"unknown: {sorted(set(state) - set(cls.STATE))}")
+        transformer = cls.__new__(cls) # no params.yaml needed, everything is in the state
+        for name in cls.STATE:
+            setattr(transformer, name, state[name])
+        return transformer
+
+    def Vocabularies(self):
+        """
+            **Method Name:** Vocabularies\n
+            **Description:** This method helps to get the train vocabulary of every encoded column\n
+            **Output:** {column: categories}\n
+            **On Failure:** Raise Error\n
+
+            :return: {column: categories}
+        """
+        return {col: self._Table(table).index for col, table in {**self.label_maps, **self.mean_maps}.items()}
+
+    @staticmethod
+    def _Table(table):
+        """
+            lookup table as a pandas Series indexed by the categories (a dict of an older transformer is converted)
+        """
+        if not isinstance(table, pd.Series):
+            return pd.Series(table)
+        if isinstance(table.index, pd.CategoricalIndex): # groupby on a categorical column
+            return pd.Series(table.to_numpy(), index=pd.Index(np.asarray(table.index)), name=table.name)
+        return table
+
+    @classmethod
+    def Lookup(cls, series, table, default=np.nan, out=None):
+        """
+            **Method Name:** Lookup\n
+            **Description:** This method helps to encode a column with a lookup table, the values become integer positions in
+                             the table vocabulary & the table values are gathered with numpy take. A categorical column is
+                             recoded once per category & gathered with its own (int8) codes, no work per row if its
+                             categories are the train vocabulary, other columns are hashed once. Unknown categories &
+                             missing values get the default. With out, the values are written in the given array\n
+            **Output:** encoded column (out, if given)\n
+            **On Failure:** Raise Error\n
+
+            :param series: column to encode
+            :param table: lookup table (pandas Series indexed by the vocabulary, or dict)
+            :param default: value of the unknown categories & missing values
+            :param out: output array (optional, like a column of a preallocated float matrix)
+            :return: encoded column
+        """
+        table = cls._Table(table)
+        vocabulary = table.index
+        values = table.to_numpy()
+        if out is not None:
+            values = values.astype(out.dtype, copy=False) # small table, cast once
+        categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        if categorical:
+            categories = series.cat.categories
+            positions = np.arange(len(vocabulary)) if categories.equals(vocabulary) else vocabulary.get_indexer(categories)
+            codes = series.cat.codes.to_numpy() # no copy, -1 for a missing value
+            unknown = (positions < 0).any() or (len(codes) > 0 and codes.min() < 0)
+        else:
+            codes = vocabulary.get_indexer(series)
+            unknown = (codes < 0).any()
+        if unknown:
+            dtype = np.promote_types(values.dtype, np.float32) # float32 tables stay float32
+            values = np.append(values.astype(dtype), dtype.type(default)) # position -1 (unknown or missing) picks the last item
+        if categorical:
+            values = values.take(np.append(positions, -1)) # value per category, the last item for code -1
+        values = values.take(codes, mode='wrap', out=out) # wrap: -1 picks the last item
+        return out if out is not None else pd.Series(values, index=series.index, name=series.name)
+
+    def EncodeColumn(self, data, col, out):
+        """
+            **Method Name:** EncodeColumn\n
+            **Description:** This method helps to write one encoded column (label or mean encoding) in the given array\n
+            **Output:** True if the column is encoded, False for the other columns\n
+            **On Failure:** Raise Error\n
+
+            :param data: raw data
+            :param col: encoded column name (like sex or workclass_mean_encoding)
+            :param out: output array (a column of a preallocated float matrix)
+            :return: True or False
+        """
+        if col in self.label_maps and col in data:
+            self.Lookup(data[col], self.label_maps[col], out=out)
+            return True
+        source = col[:-len('_mean_encoding')] if col.endswith('_mean_encoding') else None
+        if source in self.mean_maps and source in data:
+            self.Lookup(data[source], self.mean_maps[source], default=self.prior, out=out) # unseen categories get the train prior
+            return True
+        return False
+
+    def ReplaceZeroArray(self, col, values):
+        """
+            **Method Name:** ReplaceZeroArray\n
+            **Description:** This method helps to replace the zero values of one column with the train mean, in place\n
+            **Output:** values\n
+            **On Failure:** Raise Error\n
+
+            :param col: column
+            :param values: float array of the column
+            :return: values
+        """
+        if col in self.zero_means:
+            values[values == 0] = self.zero_means[col]
+        return values
@@ -1,8 +1,8 @@
-import numpy as np
 import pandas as pd
 from application_logs.logger import App_Logger
 import utils.common_utils as common_utils
-from scipy import stats
+from utils.data_profile import DataProfile
+from data_preprocessing.outliers import ZScoreOutliers
 
 class RawDataValidation:
     """
@@ -11,10 +11,11 @@ class RawDataValidation:
         Written By: Dibyendu Biswas.\n\n
         Version: 0.0.1\n\n
     """
+    log_section = 'training' # section of execution_logs where the details are logged
 
     def __init__(self, config_path:str):
         self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
-        self.file_path = self.config['execution_logs']['training']['log_files']['raw_data_validation'] # this file path help to log the details
+        self.file_path = self.config['execution_logs'][self.log_section]['log_files']['raw_data_validation'] # this file path help to log the details
         self.logger = App_Logger() # call the App_Logger() to log the details
 
     def CreateManualRegex(self):
@@ -29,7 +30,32 @@ class RawDataValidation:
         regex = "['train']+['\_'']+[\d_]+[\d]+\.csv"
         return regex
 
-    def GetNeumericalFeatures(self, data):
+    def GetProfile(self, data, ycol=None):
+        """
+            **Method Name:** GetProfile\n
+            **Description:** This method helps to profile the data once (dtypes, length, missing values, cardinalities,
+                             class distribution & numeric summary), the other methods accept it as profile\n
+            **Output:** data profile\n
+            **On Failure:** Raise Exception\n\n
+
+            :param data: train.csv
+            :param ycol: output column (optional)
+            :return: data profile
+        """
+        try:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.profile = DataProfile(data=data, ycol=ycol) # one scan of the data
+            self.logger.log(self.file, f"Profile the data, {self.profile.Summary()}")
+            self.file.close()
+            return self.profile
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+    def GetNeumericalFeatures(self, data, profile=None):
         """
             **Method Name:** GetNeumericalFeatures\n
             **Description:** This method helps to get the neumeric features \n
@@ -37,12 +63,14 @@ class RawDataValidation:
             **On Failure:** Raise Exception\n\n
 
             :param data: train.csv
+            :param profile: data profile (optional, see GetProfile)
             :return: neumeric columns/features
         """
         try:
-            self.file = open(self.file_path, 'a+') # open the file
+            self.file = self.logger.open(self.file_path) # open the file
             self.data =  data # read the train.csv file
-            self.neumeric_cols = self.data._get_numeric_data().columns # get the neumeric features
+            self.neumeric_cols = pd.Index(profile.numeric_cols) if profile is not None \
+                else self.data._get_numeric_data().columns # get the neumeric features
             if len(self.neumeric_cols) > 0:
                 self.logger.log(self.file, f"Get all Neumeric data type {self.neumeric_cols}")
                 self.file.close()
@@ -53,12 +81,12 @@ class RawDataValidation:
                 return self.neumeric_cols # if not present, then return empty list
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}") # logs the error, if error occurs
             self.file.close() # close the file
             raise ex
 
-    def GetCatrgorycalFeatures(self, data):
+    def GetCatrgorycalFeatures(self, data, profile=None):
         """
             **Method Name:** GetCatrgorycalFeatures\n
             **Description:** This method helps to get the categorical features \n
@@ -66,13 +94,14 @@ class RawDataValidation:
             **On Failure:** Raise Exception\n\n
 
             :param data: train.csv
+            :param profile: data profile (optional, see GetProfile)
             :return: categorical columns.
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data =  data # read the train.csv file
-            self.categorical = self.data.dtypes[
-                self.data.dtypes == 'object'].index  # return categorical columns from give dataset.
+            self.categorical = pd.Index(profile.categorical_cols) if profile is not None \
+                else self.data.select_dtypes(include=['object', 'category']).columns  # return categorical columns from give dataset.
             if len(self.categorical) > 0:
                 self.logger.log(self.file, f"Get all the Categorical data type: {self.categorical}")
                 self.file.close()
@@ -83,12 +112,12 @@ class RawDataValidation:
                 return self.categorical # if not present, then return empty list.
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
 
-    def GetLengthofData(self, data):
+    def GetLengthofData(self, data, profile=None):
         """
             **Method Name:** GetLengthofData\n
             **Description:** This method helps to get the length of data \n
@@ -96,13 +125,14 @@ class RawDataValidation:
             **On Failure:** Raise Exception\n\n
 
             :param data: train.csv
+            :param profile: data profile (optional, see GetProfile)
             :return: length(rows, columns)
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data =  data # read the train.csv file
-            self.row_length, self.col_length = self.data.shape[0], self.data.shape[
-                1]  # get the row length & column length
+            self.row_length, self.col_length = (profile.n_rows, profile.n_cols) if profile is not None \
+                else self.data.shape  # get the row length & column length
             if self.row_length > 0 or self.col_length > 0:
                 self.logger.log(self.file,
                                        f"Get the length of data, rows:  {self.row_length}, columns: {self.col_length}")
@@ -115,12 +145,12 @@ class RawDataValidation:
                 return False, False
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
 
-    def IsMissingValuePresent(self, data):
+    def IsMissingValuePresent(self, data, profile=None):
         """
             **Method Name:** IsMissingValuePresent\n
             **Description:** This method helps to check is their any missing value present or not. \n
@@ -128,19 +158,15 @@ class RawDataValidation:
             **On Failure:** Raise Exception\n\n
 
             :param data: train.csv
+            :param profile: data profile (optional, see GetProfile)
             :return: get the missing columns
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data =  data  # read the train.csv file
-            self.missing_dataCol = []  # here add only those columns where missing values are present
-            self.not_missing_dataCol = []  # here add only those columns where missing values are not present
-            for self.col in self.data.columns:
-                if self.data[self.col].isnull().sum() > 0:  # check (columns wise, one-by-one) if missing value present
-                    self.missing_dataCol.append(self.col)  # append those columns where missing values present.
-                else:
-                    self.not_missing_dataCol.append(
-                        self.col)  # append those columns where missing values are not present
+            self.null_counts = pd.Series(profile.null_counts) if profile is not None else self.data.isnull().sum() # null counts of all the columns in one pass
+            self.missing_dataCol = list(self.null_counts[self.null_counts > 0].index)  # here add only those columns where missing values are present
+            self.not_missing_dataCol = [col for col in self.data.columns if col not in self.missing_dataCol]  # columns where missing values are not present
 
             if len(self.missing_dataCol) > 0:
                 self.logger.log(self.file, f"Missing value are present at {self.missing_dataCol}")
@@ -150,12 +176,12 @@ class RawDataValidation:
                 self.logger.log(self.file, "missing values is not present")
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
 
-    def IsDataImbalanced(self, data, ycol:str):
+    def IsDataImbalanced(self, data, ycol:str, profile=None):
         """
             **Method Name:** IsDataImbalanced\n
             **Description:** This method helps to check is data balanced or not. \n
@@ -163,28 +189,27 @@ class RawDataValidation:
             **On Failure:** Raise Exception\n\n
 
             :param data: train.csv
+            :param ycol: output column
+            :param profile: data profile with the same output column (optional, see GetProfile)
             :return: True (if balanced), False (if not balanced)
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data  # read the train.csv file
             self.output_col = ycol # mentioned the output column
-            self.vals = [] # use fot store the values
-            for self.key, self.value in dict(self.data[self.output_col].value_counts()).items():
-                self.vals.append(self.value)
-            for self.i in range(len(self.vals)):
-                if self.vals[self.i] == self.vals[self.i + 1]:  # check the data is balance or not.
-                    self.logger.log(self.file, f'Dataset is balanced, {self.data[self.output_col].value_counts()}')
-                    return True  # if balance then return True
-                    break
-                else:
-                    self.logger.log(self.file, f'Dataset is not balanced, {self.data[self.output_col].value_counts()}')
-                    return False  # if not balance then return False
-                    break
+            self.profile = profile if profile is not None and profile.ycol == self.output_col \
+                else DataProfile(data=self.data[[self.output_col]], ycol=self.output_col) # only the output column is profiled
+            self.class_counts = self.profile.class_counts # class distribution
+            if self.profile.IsBalanced():  # check the data is balance or not.
+                self.logger.log(self.file, f'Dataset is balanced, {self.class_counts}')
+                self.file.close()
+                return True  # if balance then return True
+            self.logger.log(self.file, f'Dataset is not balanced, {self.class_counts}')
             self.file.close()
+            return False  # if not balance then return False
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
@@ -193,7 +218,7 @@ class RawDataValidation:
         """
             **Method Name:** IsOutliersPresent\n
             **Description:** This method helps to check is outliers present in a particular column.
-                             Here I use Z-Score method. \n
+                             Here I use Z-Score method (all the columns are checked together). \n
             **Output:** outliers_col\n
             **On Failure:** Raise Exception\n\n
 
@@ -203,25 +228,23 @@ class RawDataValidation:
             :return: outliers_col
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.data = data
             self.cols = cols
             self.threshold = threshold
-            self.outliers_col = []  # this is used to append the outliers columns.
+            self.outliers = ZScoreOutliers(threshold=self.threshold, policy='none', cols=list(self.cols)).fit(self.data) # means & stds of all the columns in one pass
+            self.outliers_index = self.outliers.OutlierColumns(self.data) # {column: outliers positions}
+            self.outliers_col = list(self.outliers_index) # columns where outliers are present
             for self.col in self.cols:
-                self.z = np.abs(stats.zscore(self.data[self.col]))  # to apply the Z-Score for getting the outliers one-by-one columns.
-                self.outliers_index = np.where(pd.DataFrame(self.z) > self.threshold)  # get the outliers indexs.
-                if len(self.outliers_index[0]) > 0:
-                    self.outliers_col.append(self.col)  # appen the columns where outliers are present.
-                    self.logger.log(self.file, f"Outliers are present at: {self.col} {self.outliers_index[0]}")
+                if self.col in self.outliers_index:
+                    self.logger.log(self.file, f"Outliers are present at: {self.col} {self.outliers_index[self.col]}")
                 else:
-                    self.logger.log(self.file,
-                                           f"Outliers are not present in dataset at: {self.col} {self.outliers_index[0]}")
+                    self.logger.log(self.file, f"Outliers are not present in dataset at: {self.col} []")
             self.file.close()
             return self.outliers_col  # return only those columns where outliers are present.
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
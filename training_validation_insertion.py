@@ -1,10 +1,17 @@
-import pandas as pd
+import sys
 import utils.common_utils as common_utils
+from utils.stage_cache import StageCache, code_version
 from application_logs.logger import App_Logger
 from load_and_split_data.load_split import load_split
-from training_data_scaling.dataScaling import DataScaling
+from training_data_scaling.dataScaling import DataScaling, Standardizer
 from training_raw_data_validation.rawdataValidation import RawDataValidation
-from training_features_engineering.featureEngineering import FeaturesEngineering
+from training_features_engineering.featureEngineering import FeaturesEngineering, FeaturesTransformer
+from data_preprocessing.outliers import ZScoreOutliers
+from data_preprocessing.imputation import MissingValueImputer
+from data_preprocessing.rebalancing import Rebalancer
+from data_preprocessing.pipeline import PreprocessingPipeline
+from utils.data_profile import DataProfile
+from utils.schema_contract import SchemaContract
 
 
 
@@ -16,6 +23,7 @@ class Train_Validation:
         Version: 0.0.1\n\n
     """
     def __init__(self, config_path:str):
+        self.config_path = config_path # keep the config path, the features transformer reads its own params
         self.config = common_utils.read_params(config_path)  # read the information from params.yaml file as dict form
         self.file_path = self.config['execution_logs']['training']['log_files']['training_main_logs']  # this file path help to log the details
         self.logger = App_Logger()  # call the App_Logger() to log the details
@@ -24,6 +32,7 @@ class Train_Validation:
         self.raw_data = RawDataValidation(config_path=config_path)
         self.fea_eng = FeaturesEngineering(config_path=config_path)
         self.data_scaling = DataScaling(config_path=config_path)
+        self.stage_cache = StageCache(config_path=config_path) # reuse the stage outputs, if nothing is changed
 
     def TrainValidation(self):
         """
@@ -35,7 +44,7 @@ class Train_Validation:
             :return: data
         """
         try:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             """
                 step 1: load & split data
             """
@@ -48,69 +57,96 @@ class Train_Validation:
                 step 2: read the data
             """
             self.train_path = self.config['artifacts']['split_data']['train_path'] # get the train.csv data path
-            self.train_data = pd.read_csv(self.train_path, sep=',') # read the data
+            self.train_data = self.common_utils.read_data(data_path=self.train_path) # read the data
             self.logger.log(self.file, "read the data") # logs the details
 
+            self.schema_config = self.config['schema'] # get the schema contract details
+            self.schema = SchemaContract(range_margin=self.schema_config['range_margin'], allow_nulls=self.schema_config['allow_nulls'])
+            self.schema.fit(data=self.train_data, ycol=self.config['data']['output_col']) # learn the columns, dtypes, vocabularies & ranges
+            self.logger.log(self.file, f"Learn the schema contract of {self.schema.columns} columns, numeric ranges {self.schema.ranges}") # logs the details
+
+            """
+                step 3 & 4: validate the raw data & fit the preprocessing pipeline, the output is reused
+                from the stage cache if the train data, the params & the code are unchanged
+            """
+            self.train_data, self.pipeline = self.stage_cache.GetOrCompute(
+                stage='train_validation', inputs=[self.train_data],
+                params={key: self.config[key] for key in ['base', 'data', 'features_eng', 'preProcessing']},
+                code=code_version(sys.modules[__name__], sys.modules[RawDataValidation.__module__], sys.modules[PreprocessingPipeline.__module__],
+                                  sys.modules[FeaturesTransformer.__module__], sys.modules[ZScoreOutliers.__module__],
+                                  sys.modules[MissingValueImputer.__module__], sys.modules[DataProfile.__module__],
+                                  sys.modules[Rebalancer.__module__], sys.modules[Standardizer.__module__]),
+                compute=lambda: self.ValidateTrainData(data=self.train_data))
+
+            self.file = self.logger.open(self.file_path)  # open the file (ValidateTrainData closes it)
+            self.model_dir = self.config['model']['model_dir'] # mention the model directory
+            self.pipeline_path = self.config['model']['pipeline_path'] # mention the fitted pipeline path
+            self.common_utils.create_dir(dirs=[self.model_dir]) # create the model directory
+            self.common_utils.save_model(model=self.pipeline, model_path=self.pipeline_path) # save the fitted pipeline next to the model
+            self.logger.log(self.file, f"save the fitted preprocessing pipeline in {self.pipeline_path}") # logs the details
+            self.schema_path = self.config['model']['schema_path'] # mention the schema contract path
+            self.schema.Save(schema_path=self.schema_path) # the incoming data is checked against the train schema
+            self.logger.log(self.file, f"save the schema contract in {self.schema_path}") # logs the details
+            self.file.close()
+            return self.train_data # return data
+
+        except Exception as ex:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
+            self.file.close()  # close the file
+            raise ex
+
+    def ValidateTrainData(self, data):
+        """
+            **Method Name:** ValidateTrainData\n
+            **Description:** This method helps to validate the train data & fit the preprocessing pipeline
+                             (remove duplicates, handle the outliers, encode, scale, impute & balance the data)\n
+            **Output:** data, fitted preprocessing pipeline\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data
+            :return: data, fitted preprocessing pipeline
+        """
+        try:
+            self.file = self.logger.open(self.file_path)  # open the file
+            self.train_data = data
             """
                 step 3: validate the raw data
             """
-            self.neumeric_cols = self.raw_data.GetNeumericalFeatures(data=self.train_data) # get the neumeric columns
+            self.output_col = self.config['data']['output_col'] # read the output column
+            self.profile = self.raw_data.GetProfile(data=self.train_data, ycol=self.output_col) # profile the train data once
+            self.logger.log(self.file, "Profile the train data") # logs the details
+
+            self.neumeric_cols = self.raw_data.GetNeumericalFeatures(data=self.train_data, profile=self.profile) # get the neumeric columns
             self.logger.log(self.file, f"Get the neumeric columns {self.neumeric_cols}") # logs the details
 
-            self.categorical_cols = self.raw_data.GetCatrgorycalFeatures(data=self.train_data) # get the categorical columns
+            self.categorical_cols = self.raw_data.GetCatrgorycalFeatures(data=self.train_data, profile=self.profile) # get the categorical columns
             self.logger.log(self.file, f"Get the categoricals columns {self.categorical_cols}")  # logs the details
 
-            self.row_length, self.col_length = self.raw_data.GetLengthofData(data=self.train_data) # get the length of train.csv data
+            self.row_length, self.col_length = self.raw_data.GetLengthofData(data=self.train_data, profile=self.profile) # get the length of train.csv data
             self.logger.log(self.file, f"Get the length of data {self.row_length, self.col_length}")  # logs the details
 
-            self.missing_value_cols = self.raw_data.IsMissingValuePresent(data=self.train_data) # get the columns where missing value is present
+            self.missing_value_cols = self.raw_data.IsMissingValuePresent(data=self.train_data, profile=self.profile) # get the columns where missing value is present
             self.logger.log(self.file, f"Get the columns where missing value is present {self.missing_value_cols}") # logs the details
 
-            self.output_col = self.config['data']['output_col'] # read the output column
-            self.status = self.raw_data.IsDataImbalanced(data=self.train_data, ycol=self.output_col) # get the status is data is balanced or not
+            self.status = self.raw_data.IsDataImbalanced(data=self.train_data, ycol=self.output_col, profile=self.profile) # get the status is data is balanced or not
             if self.status: # if True
                 self.logger.log(self.file, "Data is balanced") # logs the details
             else: # if False
                 self.logger.log(self.file, "Data is not balanced") # logs the details
 
             """
-                step 4: apply the features engineering steps
+                step 4: fit the preprocessing pipeline (remove duplicates, outliers, encoding, scaling, imputation & rebalancing)
             """
-            self.label_enc = self.config['features_eng']['label_encoding'] # apply label encoding
-            self.salary = self.label_enc['salary_col']['col'] # apply label encoding on salary column
-            self.mapdct_salary_col = self.label_enc['salary_col']['mapdct_salary_col'] # get the mapping format
-            self.sex = self.label_enc['sex_col']['col'] # apply label encoding on sex column
-            self.mapdct_sex_col = self.label_enc['sex_col']['mapdct_sex_col'] # get the mapping format
-
-            self.mean_encoding = self.config['features_eng']['mean_encoding'] # apply mean encosing
-            self.mean_encoding_cols = self.mean_encoding['mean_encoding_cols'] # apply the mean encoding on particular columns
-            self.replace_zero_values_cols = self.config['features_eng']['replace_zero_values_cols'] # get the columns where zero value is present
-
-            self.train_data = self.fea_eng.ToRemoveDuplicateValues(data=self.train_data) # remove the duplicate values
-            self.logger.log(self.file, "Remove the duplicate values from data set") # logs the details
-
-            self.train_data = self.fea_eng.LabelEncoding(data=self.train_data, col=self.salary, mapdct=self.mapdct_salary_col) # apply the label encoding on salary column
-            self.train_data = self.fea_eng.LabelEncoding(data=self.train_data, col=self.sex, mapdct=self.mapdct_sex_col) # apply the label encoding on sex column
-            self.logger.log(self.file, "Apply the label encoding on salary & sex column") # logs the details
-
-            self.train_data = self.fea_eng.MeanEncoding(data=self.train_data, cols=self.mean_encoding_cols, ycol=self.output_col) # apply the mean encoding
-            self.logger.log(self.file, f"Apply the mean encoding techniques on {self.mean_encoding_cols} columns")
-
-            # if len(self.missing_value_cols) > 0:
-            #     self.data = self.fea_eng.ToHandleAllMissingValues(data=self.data,
-            #                                                       xcols=self.missing_value_cols)  # handle the missing values
-            #     self.logger.log(self.file, "Handle the missing values")  # logs the details
-
-            self.train_data = self.fea_eng.ReplaceZeroValues(data=self.train_data, cols=self.replace_zero_values_cols) # replace the zero value with mean value
-            self.logger.log(self.file, f"replace the zero values with mean value {self.replace_zero_values_cols} columns") # logs the details
-
-            self.train_data = self.fea_eng.ToHandleImbalancedData(data=self.train_data, ycol=self.output_col)  # balanced the data
-            self.logger.log(self.file, "Balanced the data")  # logs the details
-            return self.train_data # return data
+            self.pipeline = PreprocessingPipeline(config_path=self.config_path) # the steps are built from params.yaml
+            self.train_data = self.pipeline.fit_transform(data=self.train_data) # learn every step from the train data, in one pass
+            self.logger.log(self.file, f"Fit the preprocessing pipeline: {self.pipeline.Steps()}") # logs the details
+            self.logger.log(self.file, f"Balanced the data ({self.pipeline.rebalancer.strategy}), {self.pipeline.rebalancer.report}") # logs the details
+            self.file.close()
+            return self.train_data, self.pipeline # return data & fitted pipeline
 
         except Exception as ex:
-            self.file = open(self.file_path, 'a+')  # open the file
+            self.file = self.logger.open(self.file_path)  # open the file
             self.logger.log(self.file, f"Error: {ex}")  # logs the error, if error occurs
             self.file.close()  # close the file
             raise ex
-
@@ -1,8 +1,11 @@
+import json
 import pickle
 
 import yaml
 import os
 import shutil
+import numpy as np
+import pandas as pd
 
 
 
@@ -74,6 +77,108 @@ def save_raw_local_data(data, new_data_path, header=False):
     else:
         data.to_csv(new_data_path, index=False)
 
+def to_categorical(data, cols=None):
+    """
+        **Method Name:** to_categorical\n
+        **Description:** This method helps to store the string columns as pandas category (integer codes & one copy of
+                         each distinct value), the census string columns take a few times less memory\n
+        **On Failure:** Raise Exception\n\n
+
+        :param data: data
+        :param cols: columns to convert (default: all the object columns)
+        :return: data
+    """
+    cols = list(data.select_dtypes(include='object').columns) if cols is None else [col for col in cols if col in data]
+    return data.astype({col: 'category' for col in cols}) if cols else data
+
+def _write_csv(data, data_path):
+    data.to_csv(data_path, index=False)
+
+def _read_csv(data_path):
+    return to_categorical(pd.read_csv(data_path, sep=','))
+
+def _write_npz(data, data_path):
+    """
+        one uncompressed .npy member per column & a json schema member, the object/categorical columns are
+        stored as integer codes with their categories
+    """
+    arrays, schema = {}, {'columns': [str(col) for col in data.columns], 'dtypes': {}, 'categories': {}}
+    for i, col in enumerate(data.columns):
+        values = data[col]
+        if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+            schema['categories'][str(col)] = values.cat.categories.astype(str).tolist()
+            arrays[f"c{i}"] = values.cat.codes.to_numpy() # smallest integer type that fits, -1: missing value
+            schema['dtypes'][str(col)] = 'category'
+        else:
+            arrays[f"c{i}"] = values.to_numpy()
+            schema['dtypes'][str(col)] = str(values.dtype)
+    arrays['__schema__'] = np.frombuffer(json.dumps(schema).encode(), dtype=np.uint8)
+    with open(data_path, 'wb') as f: # np.savez would add .npz to the path
+        np.savez(f, **arrays)
+
+def _read_npz(data_path):
+    with np.load(data_path, allow_pickle=False) as arrays:
+        schema = json.loads(arrays['__schema__'].tobytes())
+        columns = {}
+        for i, col in enumerate(schema['columns']):
+            values = arrays[f"c{i}"]
+            if col in schema['categories']:
+                values = pd.Categorical.from_codes(values, categories=schema['categories'][col])
+            columns[col] = values
+    return pd.DataFrame(columns, columns=schema['columns'])
+
+# data file extension -> (writer, reader), the artifact store picks the format from the path extension
+DATA_FORMATS = {
+    '.csv': (_write_csv, _read_csv),
+    '.npz': (_write_npz, _read_npz),
+    '.parquet': (lambda data, data_path: data.to_parquet(data_path, index=False), pd.read_parquet), # needs pyarrow
+    '.feather': (lambda data, data_path: data.reset_index(drop=True).to_feather(data_path), pd.read_feather), # needs pyarrow
+}
+
+def register_data_format(extension:str, writer, reader):
+    """
+        **Method Name:** register_data_format\n
+        **Description:** This method helps to add (or replace) a data format in the artifact store\n
+        **On Failure:** Raise Exception\n\n
+
+        :param extension: data file extension, like .npz
+        :param writer: function(data, data_path), save the data
+        :param reader: function(data_path), return the data
+        :return: None
+    """
+    DATA_FORMATS[extension.lower()] = (writer, reader)
+
+def _get_data_format(data_path:str):
+    extension = os.path.splitext(data_path)[1].lower()
+    if extension not in DATA_FORMATS:
+        raise ValueError(f"Unknown data format {extension} for {data_path}, use one of {list(DATA_FORMATS)}")
+    return DATA_FORMATS[extension]
+
+def save_data(data, data_path:str):
+    """
+        **Method Name:** save_data\n
+        **Description:** This method helps to save the stage output (artifact) in the format given by the path
+                         extension (.npz: typed columnar, categorical columns kept as codes, .csv, .parquet, .feather)\n
+        **On Failure:** Raise Exception\n\n
+
+        :param data: data
+        :param data_path: mention data path, where you can store the data
+        :return: save the data
+    """
+    _get_data_format(data_path)[0](data, data_path)
+
+def read_data(data_path:str):
+    """
+        **Method Name:** read_data\n
+        **Description:** This method helps to read the stage output (artifact) saved by save_data\n
+        **On Failure:** Raise Exception\n\n
+
+        :param data_path: data path
+        :return: data
+    """
+    return _get_data_format(data_path)[1](data_path)
+
 def save_model(model, model_path:str):
     """
         **Method Name:** save_model\n
@@ -97,9 +202,23 @@ def load_model(model_path):
         :return: model
     """
     for file in os.listdir(model_path):
+        if not os.path.isfile(model_path + '/' + file + '/' + file + '.sav'):
+            continue # skip the other artifacts (like fitted transformers) saved in model directory
         with open(model_path + '/' + file + '/' + file + '.sav', 'rb') as f:
             return pickle.load(f)
 
+def load_model_file(model_path:str):
+    """
+        **Method Name:** load_model_file\n
+        **Description:** This method helps to load a saved model/artifact from a particular file\n
+        **On Failure:** Raise Exception\n\n
+
+        :param model_path: model/artifact file path
+        :return: model/artifact
+    """
+    with open(model_path, 'rb') as f:
+        return pickle.load(f)
+
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,81 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+
+class DataProfile:
+    """
+        This class shall be used to profile a dataset once: dtypes, row/column counts, per-column null counts,
+        cardinalities of the categorical columns, class distribution of the output column & numeric summary
+        statistics. The numeric columns are converted to one float matrix & summarized with numpy reductions,
+        the RawDataValidation methods read their answer from the profile instead of scanning the data again.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, data, ycol=None):
+        self.n_rows, self.n_cols = data.shape
+        self.dtypes = {col: str(dtype) for col, dtype in data.dtypes.items()}
+        self.numeric_cols = list(data._get_numeric_data().columns) # numeric & boolean columns
+        self.categorical_cols = list(data.select_dtypes(include=['object', 'category']).columns)
+        self.ycol = ycol
+
+        values = data[self.numeric_cols].to_numpy(dtype=np.float64) # one matrix for all the numeric columns
+        missing = np.isnan(values)
+        null_counts = dict(zip(self.numeric_cols, missing.sum(axis=0).tolist()))
+        self.cardinality, self.class_counts = {}, {} # distinct values of the categorical columns (without missing values)
+        for col in data.columns:
+            if col in null_counts and col != ycol:
+                continue
+            codes, uniques = pd.factorize(data[col]) # one hash pass gives the nulls (code -1), the cardinality & the classes
+            null_counts[col] = int((codes < 0).sum())
+            if col in self.categorical_cols:
+                self.cardinality[col] = len(uniques)
+            if col == ycol:
+                counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+                order = np.argsort(-counts, kind='stable') # most frequent first, like value_counts
+                self.class_counts = {uniques[i]: int(counts[i]) for i in order}
+        self.null_counts = {col: int(null_counts[col]) for col in data.columns} # in the columns order
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning) # an all missing column gives nan
+            self.numeric_stats = pd.DataFrame({
+                'count': (~missing).sum(axis=0),
+                'mean': np.nanmean(values, axis=0),
+                'std': np.nanstd(values, axis=0, ddof=1),
+                'min': np.nanmin(values, axis=0) if len(values) else np.full(len(self.numeric_cols), np.nan),
+                'max': np.nanmax(values, axis=0) if len(values) else np.full(len(self.numeric_cols), np.nan),
+            }, index=self.numeric_cols)
+
+    @property
+    def missing_cols(self):
+        """
+            columns where the missing values are present
+        """
+        return [col for col, count in self.null_counts.items() if count > 0]
+
+    def IsBalanced(self):
+        """
+            **Method Name:** IsBalanced\n
+            **Description:** This method helps to check the output column is balanced (the two most frequent classes
+                             have the same count)\n
+            **Output:** True (if balanced), False (if not balanced)\n
+            **On Failure:** Raise Error.\n
+
+            :return: True (if balanced), False (if not balanced)
+        """
+        counts = sorted(self.class_counts.values(), reverse=True)
+        return len(counts) > 1 and counts[0] == counts[1]
+
+    def Summary(self):
+        """
+            **Method Name:** Summary\n
+            **Description:** This method helps to get a compact text report of the profile (for the logs)\n
+            **Output:** report\n
+            **On Failure:** Raise Error.\n
+
+            :return: report
+        """
+        return (f"rows: {self.n_rows}, columns: {self.n_cols}, numeric: {self.numeric_cols}, categorical: {self.categorical_cols}, "
+                f"missing: { {col: self.null_counts[col] for col in self.missing_cols} }, cardinality: {self.cardinality}, "
+                f"classes: {self.class_counts}")
@@ -0,0 +1,147 @@
+import json
+import numpy as np
+import pandas as pd
+
+
+class SchemaContract:
+    """
+        This class shall be used to learn the schema of the raw data from the train data (column names, dtypes,
+        categorical vocabularies & numeric ranges) and check the incoming batches against it. Every check runs on a whole
+        column at once, the failed checks of a row are kept as bits of one integer code, so the reject reasons are
+        built once per distinct combination instead of once per row. The bad rows are returned (quarantined) with
+        their reason, the good rows go on to the model.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    reason_col = 'reject_reason'
+
+    def __init__(self, range_margin=0.1, allow_nulls=True):
+        self.range_margin = range_margin # the numeric ranges are widened by margin * (max - min) on both sides
+        self.allow_nulls = allow_nulls # False: missing values in the input columns are rejected
+        self.columns = [] # required input columns, in the train order
+        self.optional_cols = [] # checked only if present (like the output column)
+        self.dtypes = {} # {column: train dtype}
+        self.vocabularies = {} # {categorical column: allowed values}
+        self.ranges = {} # {numeric column: [train min, train max]}
+
+    def fit(self, data, ycol=None):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn the schema from the train data\n
+            **Output:** fitted schema contract\n
+            **On Failure:** Raise Error.\n
+
+            :param data: train data
+            :param ycol: output column (optional in the incoming data)
+            :return: fitted schema contract
+        """
+        self.columns = [col for col in data.columns if col != ycol]
+        self.optional_cols = [ycol] if ycol in data else []
+        self.dtypes = {col: str(dtype) for col, dtype in data.dtypes.items()}
+        numeric_cols = list(data._get_numeric_data().columns)
+        values = data[numeric_cols].to_numpy(dtype=np.float64)
+        self.ranges = {col: [float(low), float(high)] for col, low, high in
+                       zip(numeric_cols, np.nanmin(values, axis=0), np.nanmax(values, axis=0))} if len(data) else {}
+        self.vocabularies = {col: sorted(str(value) for value in pd.unique(data[col].dropna()))
+                             for col in data.columns if col not in self.ranges}
+        return self
+
+    def Limits(self, col):
+        """
+            **Method Name:** Limits\n
+            **Description:** This method helps to get the accepted range of a numeric column (train range & margin)\n
+            **Output:** low, high\n
+            **On Failure:** Raise Error.\n
+
+            :param col: numeric column
+            :return: low, high
+        """
+        low, high = self.ranges[col]
+        margin = self.range_margin * (high - low)
+        return low - margin, high + margin
+
+    def Validate(self, data):
+        """
+            **Method Name:** Validate\n
+            **Description:** This method helps to check a batch against the schema. A missing required column rejects
+                             every row, a row is rejected if a value can't be converted to the train dtype, is missing
+                             (allow_nulls False), is an unknown category or is out of the numeric range\n
+            **Output:** valid rows (numeric columns converted), rejected rows (as received, with the reject_reason column)\n
+            **On Failure:** Raise Error.\n
+
+            :param data: raw data
+            :return: valid rows, rejected rows
+        """
+        codes = np.zeros(len(data), dtype=np.int64) # bit i set: check i failed
+        reasons = [] # reason of each bit
+        converted = {} # numeric columns read as text, converted to numbers
+
+        def check(failed, reason):
+            if failed.any():
+                codes[np.asarray(failed)] |= np.int64(1) << len(reasons)
+                reasons.append(reason)
+
+        missing_cols = [col for col in self.columns if col not in data]
+        if missing_cols:
+            check(np.ones(len(data), dtype=bool), f"missing columns {missing_cols}")
+        for col in self.columns + [col for col in self.optional_cols if col in data]:
+            if col not in data:
+                continue
+            column = data[col]
+            missing = column.isna().to_numpy()
+            if col in self.ranges:
+                if not pd.api.types.is_numeric_dtype(column.dtype):
+                    column = converted[col] = pd.to_numeric(column, errors='coerce')
+                    check(column.isna().to_numpy() & ~missing, f"{col}: not a number")
+                low, high = self.Limits(col)
+                values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+                with np.errstate(invalid='ignore'): # missing values are checked separately
+                    check((values < low) | (values > high), f"{col}: out of range [{low:g}, {high:g}]")
+            elif col in self.vocabularies:
+                check(~missing & ~column.isin(self.vocabularies[col]).to_numpy(), f"{col}: unknown category")
+            if not self.allow_nulls and col in self.columns:
+                check(missing, f"{col}: missing value")
+
+        bad = codes != 0
+        valid = data[~bad] if bad.any() else data # no copy for a clean batch
+        for col, column in converted.items():
+            column = column[~bad]
+            if not column.isna().any() and np.issubdtype(np.dtype(self.dtypes[col]), np.integer):
+                column = column.astype(self.dtypes[col]) # back to the train dtype
+            valid = valid.assign(**{col: column})
+        bad_codes = codes[bad]
+        combinations, inverse = np.unique(bad_codes, return_inverse=True) # one reason string per combination of failed checks
+        messages = np.array(['; '.join(reason for i, reason in enumerate(reasons) if code >> i & 1) for code in combinations], dtype=object)
+        rejects = data[bad].assign(**{self.reason_col: messages[inverse.reshape(-1)] if len(bad_codes) else np.array([], dtype=object)})
+        return valid, rejects
+
+    def Save(self, schema_path:str):
+        """
+            **Method Name:** Save\n
+            **Description:** This method helps to save the schema contract as a json file\n
+            **Output:** None\n
+            **On Failure:** Raise Error.\n
+
+            :param schema_path: schema path (.json)
+            :return: None
+        """
+        with open(schema_path, 'w') as f:
+            json.dump(vars(self), f, indent=1)
+
+    @classmethod
+    def Load(cls, schema_path:str):
+        """
+            **Method Name:** Load\n
+            **Description:** This method helps to load a saved schema contract\n
+            **Output:** schema contract\n
+            **On Failure:** Raise Error.\n
+
+            :param schema_path: schema path (.json)
+            :return: schema contract
+        """
+        with open(schema_path) as f:
+            state = json.load(f)
+        schema = cls()
+        schema.__dict__.update(state)
+        return schema
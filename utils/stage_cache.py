@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from application_logs.logger import App_Logger
+import utils.common_utils as common_utils
+
+
+def fingerprint(obj):
+    """
+        **Method Name:** fingerprint\n
+        **Description:** This method helps to get the content hash of a stage input (dataframe, series, array,
+                         file path or any picklable object)\n
+        **On Failure:** Raise Exception\n\n
+
+        :param obj: stage input
+        :return: sha256 hex digest
+    """
+    sha = hashlib.sha256()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        sha.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        sha.update(repr(obj.dtypes.to_dict() if isinstance(obj, pd.DataFrame) else (obj.name, obj.dtype)).encode())
+    elif isinstance(obj, np.ndarray):
+        sha.update(np.ascontiguousarray(obj).tobytes())
+        sha.update(repr((obj.dtype, obj.shape)).encode())
+    elif isinstance(obj, str) and os.path.isfile(obj):
+        with open(obj, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+    else:
+        sha.update(pickle.dumps(obj))
+    return sha.hexdigest()
+
+
+def code_version(*modules):
+    """
+        **Method Name:** code_version\n
+        **Description:** This method helps to get the hash of the source code of the modules used by a stage\n
+        **On Failure:** Raise Exception\n\n
+
+        :param modules: modules
+        :return: sha256 hex digest
+    """
+    sha = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+class StageCache:
+    """
+        This class shall be used to reuse the output of a pipeline stage, when the stage input, the related
+        params & the code are unchanged. The outputs are saved on disk (keyed by the content hash), the least
+        recently used ones are removed when the cache is bigger than max_size_mb.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, config_path:str):
+        self.config = common_utils.read_params(config_path) # read the information from params.yaml file as dict form
+        self.file_path = self.config['execution_logs']['training']['log_files']['model_training'] # this file path help to log the details
+        self.logger = App_Logger() # call the App_Logger() to log the details
+        self.stage_cache = self.config['stage_cache'] # get the stage cache details
+        self.enabled = self.stage_cache['enabled']
+        self.cache_dir = self.stage_cache['cache_dir'] # mention the stage cache directory
+        self.max_bytes = int(self.stage_cache['max_size_mb'] * 1024 * 1024)
+
+    def GetKey(self, stage:str, inputs:list, params, code:str):
+        """
+            **Method Name:** GetKey\n
+            **Description:** This method helps to get the cache key of a stage\n
+            **Output:** key\n
+            **On Failure:** Raise Exception\n\n
+
+            :param stage: stage name
+            :param inputs: stage inputs
+            :param params: related params (subtree of params.yaml)
+            :param code: code version of the stage
+            :return: key
+        """
+        sha = hashlib.sha256(stage.encode())
+        for obj in inputs:
+            sha.update(fingerprint(obj).encode())
+        sha.update(json.dumps(params, sort_keys=True, default=str).encode())
+        sha.update(code.encode())
+        return sha.hexdigest()
+
+    def GetOrCompute(self, stage:str, inputs:list, params, code:str, compute):
+        """
+            **Method Name:** GetOrCompute\n
+            **Description:** This method helps to get the cached output of a stage, or compute & cache it\n
+            **Output:** stage output\n
+            **On Failure:** Raise Exception\n\n
+
+            :param stage: stage name
+            :param inputs: stage inputs
+            :param params: related params (subtree of params.yaml)
+            :param code: code version of the stage
+            :param compute: function without arguments, returns the stage output
+            :return: stage output
+        """
+        if not self.enabled:
+            return compute()
+        self.file = self.logger.open(self.file_path) # open the file
+        key = self.GetKey(stage=stage, inputs=inputs, params=params, code=code)
+        path = os.path.join(self.cache_dir, f"{stage}-{key}.pkl")
+        if os.path.isfile(path):
+            os.utime(path) # most recently used
+            self.logger.log(self.file, f"stage {stage}: reuse the cached output {path}")
+            self.file.close()
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        self.file.close()
+
+        output = compute()
+        common_utils.create_dir(dirs=[self.cache_dir])
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path) # a killed run never leaves a broken entry
+        self.file = self.logger.open(self.file_path) # open the file
+        self.logger.log(self.file, f"stage {stage}: cache the output in {path}")
+        self.Evict()
+        self.file.close()
+        return output
+
+    def Evict(self):
+        """
+            **Method Name:** Evict\n
+            **Description:** This method helps to remove the least recently used outputs, until the cache fits in max_size_mb\n
+            **Output:** None\n
+            **On Failure:** Raise Exception\n\n
+
+            :return: None
+        """
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.pkl')]
+        entries = sorted(((os.path.getmtime(path), os.path.getsize(path), path) for path in entries), reverse=True)
+        total = 0
+        for _, size, path in entries: # most recently used first
+            total += size
+            if total > self.max_bytes:
+                os.remove(path)
+                self.logger.log(self.file, f"remove the least recently used stage output {path}")
+
+
+if __name__ == "__main__":
+    pass
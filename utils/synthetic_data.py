@@ -0,0 +1,236 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import utils.common_utils as common_utils
+
+
+class SyntheticCensus:
+    """
+        This class shall be used to learn the census data once (per-column marginals & a simple joint structure) and
+        generate arbitrarily large datasets with the same columns, dtypes, categories & value ranges, to load-test the
+        training & the scoring offline. Every column (numeric ones too, their distinct values are kept) is a
+        categorical variable conditioned on the output column & on one parent column: the earlier column which
+        explains it best (conditional mutual information given the output column, with a BIC penalty for the size of
+        the table), like a small Bayesian network. The conditional tables are smoothed towards the per-class marginals,
+        so an unseen (class, parent value) combination still gets a valid distribution.\n
+        The rows are generated chunk by chunk (numpy inverse-CDF sampling, vectorized per column), chunk i uses its
+        own random generator seeded with (seed, i): the same seed & chunk size always give the same rows, and the
+        memory is bounded by the chunk size whatever the number of rows.\n\n
+
+        Written By: Dibyendu Biswas.\n\n
+        Version: 0.0.1\n\n
+    """
+    def __init__(self, ycol, seed=42, chunk_size=100000, smoothing=1.0):
+        self.ycol = ycol # output column, the root of the joint structure
+        self.seed = seed
+        self.chunk_size = chunk_size # rows per generated chunk (also the unit of the random generators)
+        self.smoothing = smoothing # weight (in rows) of the per-class marginal mixed into each conditional table
+        self.columns = [] # columns in the source order
+        self.dtypes = {} # {column: source dtype}
+        self.values = {} # {column: distinct values, the generated codes index them}
+        self.parents = {} # {column: parent column or None}
+        self.tables = {} # {column: flat cumulative table, group g (class, parent value) holds g + cdf}
+
+    def fit(self, data):
+        """
+            **Method Name:** fit\n
+            **Description:** This method helps to learn the distinct values, the parent & the conditional distribution
+                             (given the output column & the parent) of every column\n
+            **Output:** fitted generator\n
+            **On Failure:** Raise Error.\n
+
+            :param data: source data (raw, with output column)
+            :return: fitted generator
+        """
+        if self.ycol not in data:
+            raise ValueError(f"Output column {self.ycol} is not in the data")
+        self.columns = list(data.columns)
+        self.dtypes = {col: data[col].dtype for col in self.columns}
+        codes = {}
+        for col in self.columns:
+            codes[col], uniques = pd.factorize(data[col], sort=True)
+            values = np.asarray(uniques)
+            if (codes[col] < 0).any(): # missing values are one more value
+                codes[col] = np.where(codes[col] < 0, len(values), codes[col])
+                values = np.append(values.astype(object if values.dtype == object else np.float64), np.nan)
+            self.values[col] = values
+
+        y, n_classes = codes[self.ycol], len(self.values[self.ycol])
+        self.parents, self.tables = {self.ycol: None}, {self.ycol: self._Table(np.bincount(y, minlength=n_classes)[None, :])}
+        marginals = {} # per class distribution of each column, the smoothing prior
+        for i, col in enumerate(self.columns):
+            if col == self.ycol:
+                continue
+            k = len(self.values[col])
+            marginals[col] = np.bincount(y * k + codes[col], minlength=n_classes * k).reshape(n_classes, k)
+            candidates = [parent for parent in self.columns[:i] if parent != self.ycol]
+            scores = {parent: self._Score(y, n_classes, codes[parent], len(self.values[parent]), codes[col], k) for parent in candidates}
+            parent = max(scores, key=scores.get) if scores and max(scores.values()) > 0 else None
+            self.parents[col] = parent
+            prior = marginals[col] / np.maximum(marginals[col].sum(axis=1, keepdims=True), 1)
+            if parent is None:
+                counts, group_class = marginals[col], np.arange(n_classes)
+            else:
+                kp = len(self.values[parent])
+                groups = y * kp + codes[parent]
+                counts = np.bincount(groups * k + codes[col], minlength=n_classes * kp * k).reshape(n_classes * kp, k)
+                group_class = np.arange(n_classes * kp) // kp
+            self.tables[col] = self._Table(counts + self.smoothing * prior[group_class])
+        return self
+
+    @staticmethod
+    def _Score(y, n_classes, parent, kp, child, k):
+        """
+            conditional mutual information (in rows x nats) of child & parent given the output column, minus the BIC
+            penalty of the extra table entries
+        """
+        joint = np.bincount((y * kp + parent) * k + child, minlength=n_classes * kp * k).reshape(n_classes, kp, k).astype(np.float64)
+        n = joint.sum()
+        class_parent = joint.sum(axis=2, keepdims=True)
+        class_child = joint.sum(axis=1, keepdims=True)
+        classes = joint.sum(axis=(1, 2), keepdims=True)
+        nonzero = joint > 0
+        expected = (class_parent * class_child / np.maximum(classes, 1))[nonzero]
+        information = (joint[nonzero] * np.log(joint[nonzero] / expected)).sum()
+        return information - 0.5 * np.log(n) * n_classes * (kp - 1) * (k - 1)
+
+    @staticmethod
+    def _Table(weights):
+        """
+            flat cumulative table of the (groups x values) weights: group g holds g + its cdf, so one searchsorted of
+            g + u samples every row from its own group. An all zero group gets the uniform distribution
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        totals = weights.sum(axis=1, keepdims=True)
+        weights = np.where(totals > 0, weights, 1.0)
+        cdf = np.cumsum(weights, axis=1) / weights.sum(axis=1, keepdims=True)
+        cdf[:, -1] = 1.0
+        return (np.arange(len(cdf))[:, None] + cdf).ravel()
+
+    def _Sample(self, col, groups, rng):
+        """
+            codes of col for the rows of the given groups (inverse-CDF sampling)
+        """
+        k = len(self.values[col])
+        index = np.searchsorted(self.tables[col], groups + rng.random(len(groups)), side='right')
+        return np.minimum(index - groups * k, k - 1) # g + u can round up to g + 1
+
+    def GenerateChunk(self, index, n_rows=None):
+        """
+            **Method Name:** GenerateChunk\n
+            **Description:** This method helps to generate one chunk, chunk index has its own random generator (seed,
+                             index), so any chunk can be generated alone (like a shard of a big dataset)\n
+            **Output:** data (source columns & dtypes, the string columns are categoricals)\n
+            **On Failure:** Raise Error.\n
+
+            :param index: chunk index
+            :param n_rows: no of rows (default chunk_size)
+            :return: data
+        """
+        if not self.columns:
+            raise ValueError("SyntheticCensus is not fitted yet, call fit() first")
+        n_rows = self.chunk_size if n_rows is None else n_rows
+        rng = np.random.default_rng([self.seed, index])
+        y = self._Sample(self.ycol, np.zeros(n_rows, dtype=np.int64), rng)
+        codes = {self.ycol: y}
+        for col in self.columns:
+            if col == self.ycol:
+                continue
+            parent = self.parents[col]
+            groups = y if parent is None else y * len(self.values[parent]) + codes[parent]
+            codes[col] = self._Sample(col, groups, rng)
+        return pd.DataFrame({col: self._Decode(col, codes[col]) for col in self.columns})
+
+    def _Decode(self, col, codes):
+        """
+            values of the generated codes, in the source dtype (string columns as categoricals)
+        """
+        values = self.values[col]
+        if self.dtypes[col] == object or isinstance(self.dtypes[col], pd.CategoricalDtype):
+            has_missing = len(values) and not isinstance(values[-1], str) and pd.isna(values[-1])
+            categories = values[:-1] if has_missing else values
+            if has_missing:
+                codes = np.where(codes == len(categories), -1, codes)
+            return pd.Categorical.from_codes(codes, categories=categories)
+        return values[codes].astype(self.dtypes[col], copy=False)
+
+    def Generate(self, n_rows):
+        """
+            **Method Name:** Generate\n
+            **Description:** This method helps to generate n_rows rows lazily, chunk by chunk\n
+            **Output:** iterator of data chunks\n
+            **On Failure:** Raise Error.\n
+
+            :param n_rows: total no of rows
+            :return: iterator of data chunks
+        """
+        for index, start in enumerate(range(0, n_rows, self.chunk_size)):
+            yield self.GenerateChunk(index=index, n_rows=min(self.chunk_size, n_rows - start))
+
+    def Write(self, output_path, n_rows):
+        """
+            **Method Name:** Write\n
+            **Description:** This method helps to stream n_rows generated rows to a file, the format is given by the
+                             extension: .csv (appended chunk by chunk) or .parquet (columnar, one row group per chunk,
+                             needs pyarrow)\n
+            **Output:** no of rows written\n
+            **On Failure:** Raise Error.\n
+
+            :param output_path: output path (.csv or .parquet)
+            :param n_rows: total no of rows
+            :return: no of rows written
+        """
+        if output_path.endswith('.parquet'):
+            import pyarrow as pa # optional dependency, only the parquet output needs it
+            import pyarrow.parquet as pq
+            writer, n_written = None, 0
+            try:
+                for chunk in self.Generate(n_rows):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = writer or pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                    n_written += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return n_written
+        if not output_path.endswith('.csv'):
+            raise ValueError(f"Unsupported synthetic data format: {output_path} (use .csv or .parquet)")
+        n_written = 0
+        with open(output_path, 'w', newline='') as f:
+            for chunk in self.Generate(n_rows):
+                chunk.to_csv(f, header=n_written == 0, index=False)
+                n_written += len(chunk)
+        return n_written
+
+    def Structure(self):
+        """
+            **Method Name:** Structure\n
+            **Description:** This method helps to get a compact text report of the learned structure (for the logs)\n
+            **Output:** report\n
+            **On Failure:** Raise Error.\n
+
+            :return: report
+        """
+        return ", ".join(f"{col} <- {self.ycol}" + (f" & {parent}" if parent else '') for col, parent in self.parents.items() if col != self.ycol)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="generate a synthetic census dataset (same schema as the source data) chunk by chunk")
+    parser.add_argument('--config', default='params.yaml', help="params.yaml path")
+    parser.add_argument('--source', default=None, help="source data path (csv), default synthetic_data.source_path")
+    parser.add_argument('--output', default=None, help="output path (.csv or .parquet), default synthetic_data.output_path")
+    parser.add_argument('--rows', type=int, default=None, help="no of rows, default synthetic_data.n_rows")
+    parser.add_argument('--seed', type=int, default=None, help="random seed, default synthetic_data.seed")
+    parser.add_argument('--chunk-size', type=int, default=None, help="no of rows per chunk, default synthetic_data.chunk_size")
+    args = parser.parse_args()
+
+    config = common_utils.read_params(args.config)
+    synthetic = config['synthetic_data']
+    generator = SyntheticCensus(ycol=config['data']['output_col'], seed=args.seed if args.seed is not None else synthetic['seed'],
+                                chunk_size=args.chunk_size or synthetic['chunk_size'], smoothing=synthetic['smoothing'])
+    generator.fit(pd.read_csv(args.source or synthetic['source_path'], sep=','))
+    output_path = args.output or synthetic['output_path']
+    common_utils.create_dir([os.path.dirname(output_path) or '.'])
+    print(f"{generator.Write(output_path=output_path, n_rows=args.rows or synthetic['n_rows'])} rows written in {output_path}")